@@ -0,0 +1,522 @@
+import asyncio  # Execução assíncrona (vários alvos no mesmo processo)
+import heapq    # Fila de próximas checagens
+import inspect  # Detecta buscadores assíncronos
+import logging  # Registro de logs
+import random   # Jitter dos intervalos
+import time     # Marcação de horário dos eventos
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple, Union
+from urllib.parse import urlparse
+
+from metricas import METRICAS  # Latência e erros por alvo
+from estado_persistente import EstadoPersistente  # Retomada sem redescoberta após reiniciar
+from resiliencia import Disjuntor  # Hosts em falha não ocupam vagas de busca
+
+
+class Alvo:
+    """
+    Valor monitorado: URL, seletor CSS ou XPath e intervalo de checagem (em segundos).
+
+    `intervalo` é o ponto de partida; o agendador o adapta ao ritmo de mudança do alvo
+    entre `intervalo_min` e `intervalo_max` (iguais = intervalo fixo).
+
+    Com `campos` ({nome: seletor CSS ou XPath}), vários valores da mesma página são lidos
+    de uma vez, e cada campo tem sua própria detecção de mudança (chave "id.campo").
+    `recursos` escolhe o que não carregar na página (ver bloqueio_recursos.PERFIS).
+    `rede` captura o valor do tráfego da página (ver captura_rede.FiltroRede); o seletor
+    ou XPath continua sendo lido quando nenhum frame casa.
+    """
+    def __init__(self, id: str, url: str, seletor: Optional[str] = None,
+                 xpath: Optional[str] = None, intervalo: float = 60, usuario: str = "",
+                 intervalo_min: Optional[float] = None, intervalo_max: Optional[float] = None,
+                 campos: Optional[Dict[str, str]] = None, recursos: Union[None, str, Dict] = None,
+                 rede: Optional[Dict[str, Any]] = None):
+        if not seletor and not xpath and not campos:
+            raise ValueError(f"Alvo '{id}' precisa de um seletor CSS, de um XPath ou de campos.")
+        self.id = id
+        self.url = url
+        self.seletor = seletor
+        self.xpath = xpath
+        self.intervalo = intervalo
+        self.usuario = usuario
+        self.intervalo_min = intervalo_min
+        self.intervalo_max = intervalo_max
+        self.campos = dict(campos) if campos else None
+        self.recursos = recursos  # Perfil de bloqueio de recursos (None = o padrão do backend)
+        self.rede = dict(rede) if rede else None  # Matcher e caminho do valor no tráfego da página
+
+    @property
+    def localizador(self) -> Tuple:
+        """
+        O que identifica o elemento lido; mudou, o último valor deixa de valer.
+        """
+        return self.seletor, self.xpath, tuple(sorted(self.campos.items())) if self.campos else None
+
+    def chave(self, campo: Optional[str] = None) -> str:
+        return f"{self.id}.{campo}" if campo else self.id
+
+    @property
+    def host(self) -> str:
+        # Sem a porta padrão: "site.com:443" e "site.com" são o mesmo host (e o mesmo trabalhador no supervisor)
+        partes = urlparse(self.url)
+        host = (partes.hostname or "").lower()
+        if partes.port and partes.port != {"http": 80, "https": 443}.get(partes.scheme.lower()):
+            host = f"{host}:{partes.port}"
+        return host
+
+    def __repr__(self):
+        return f"Alvo({self.id!r}, {self.url!r})"
+
+
+class EventoAlteracao:
+    """
+    Mudança de valor detectada em um alvo (em um dos campos, para alvos com `campos`).
+    """
+    def __init__(self, alvo: Alvo, valor_anterior: Optional[str], valor_atual: str,
+                 instante: Optional[float] = None, campo: Optional[str] = None):
+        self.alvo = alvo
+        self.valor_anterior = valor_anterior
+        self.valor_atual = valor_atual
+        self.instante = instante if instante is not None else time.time()
+        self.campo = campo
+
+    @property
+    def chave(self) -> str:
+        return self.alvo.chave(self.campo)
+
+    def __repr__(self):
+        return f"EventoAlteracao({self.chave!r}, {self.valor_anterior!r} -> {self.valor_atual!r})"
+
+
+class IntervaloAdaptativo:
+    """
+    Calcula o próximo intervalo de checagem a partir das mudanças observadas.
+
+    Mantém a média móvel exponencial (EWMA) do tempo entre mudanças e consulta o alvo
+    `fator` vezes esse tempo (0.5 = duas checagens por mudança esperada). Enquanto o
+    alvo não muda, o tempo desde a última mudança entra na estimativa e o intervalo
+    cresce até `maximo`. Erros dobram o intervalo (backoff) e o jitter espalha as
+    checagens de alvos do mesmo host.
+    """
+    def __init__(self, inicial: float, minimo: float = 1.0, maximo: float = 600.0, alfa: float = 0.3,
+                 fator: float = 0.5, jitter: float = 0.1):
+        self.minimo = min(minimo, inicial)
+        self.maximo = max(maximo, inicial)
+        self.inicial = inicial
+        self.alfa = alfa
+        self.fator = fator
+        self.jitter = jitter
+        self.media_mudancas: Optional[float] = None
+        self.ultima_mudanca: Optional[float] = None
+        self.erros_seguidos = 0
+        self.atual = inicial
+
+    def _limitar(self, intervalo: float) -> float:
+        return min(self.maximo, max(self.minimo, intervalo))
+
+    def _espalhar(self, intervalo: float) -> float:
+        if not self.jitter:
+            return intervalo
+        return intervalo * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def registrar(self, mudou: bool, erro: bool = False, instante: Optional[float] = None) -> float:
+        """
+        Atualiza as estatísticas com o resultado da checagem e devolve a espera até a próxima.
+        """
+        agora = instante if instante is not None else time.monotonic()
+        if erro:
+            self.erros_seguidos += 1
+            return self._espalhar(min(self.maximo, self.atual * 2 ** self.erros_seguidos))
+        self.erros_seguidos = 0
+
+        if mudou:
+            if self.ultima_mudanca is not None:
+                decorrido = agora - self.ultima_mudanca
+                if self.media_mudancas is None:
+                    self.media_mudancas = decorrido
+                else:
+                    self.media_mudancas += self.alfa * (decorrido - self.media_mudancas)
+            self.ultima_mudanca = agora
+
+        if self.media_mudancas is None:
+            sem_mudar = agora - self.ultima_mudanca if self.ultima_mudanca is not None else 0.0
+            self.atual = self._limitar(max(self.inicial, self.fator * sem_mudar))
+        else:
+            estimativa = max(self.media_mudancas, agora - self.ultima_mudanca)
+            self.atual = self._limitar(self.fator * estimativa)
+        return self._espalhar(self.atual)
+
+    def exportar(self) -> Dict[str, Any]:
+        """
+        Estatísticas serializáveis; o instante da última mudança vai como horário de parede.
+        """
+        ultima = None if self.ultima_mudanca is None else time.time() - (time.monotonic() - self.ultima_mudanca)
+        return {"atual": self.atual, "media_mudancas": self.media_mudancas,
+                "ultima_mudanca": ultima, "erros_seguidos": self.erros_seguidos}
+
+    def restaurar(self, dados: Dict[str, Any]):
+        self.atual = self._limitar(dados.get("atual", self.atual))
+        self.media_mudancas = dados.get("media_mudancas")
+        ultima = dados.get("ultima_mudanca")
+        self.ultima_mudanca = None if ultima is None else time.monotonic() - max(0.0, time.time() - ultima)
+        self.erros_seguidos = dados.get("erros_seguidos", 0)
+
+
+# Um buscador recebe o alvo e devolve o texto atual (ou None em caso de falha).
+# Pode ser síncrono (executado em thread) ou uma corrotina.
+# Texto do alvo, ou {campo: texto} para alvos com `campos`
+Valor = Union[None, str, Dict[str, Optional[str]]]
+Buscador = Callable[[Alvo], Union[Valor, Awaitable[Valor]]]
+Ouvinte = Callable[[EventoAlteracao], Union[None, Awaitable[None]]]
+
+
+class Agendador:
+    """
+    Monitora vários alvos em um único processo, com limite global de concorrência
+    e limite de buscas simultâneas por host.
+
+    As próximas checagens ficam em um heap (instante, sequência, alvo): um único laço
+    despacha as vencidas, então milhares de alvos não custam uma tarefa parada cada.
+
+    Cada host tem um disjuntor: após `falhas_por_host` buscas seguidas sem valor, os alvos
+    do host deixam de ocupar vagas de busca por `espera_disjuntor` segundos (dobrando a cada
+    teste que falha). Com 0, os disjuntores ficam desligados.
+
+    Com `estado`, o último valor, as estatísticas de intervalo e a próxima checagem de cada
+    alvo são salvos a cada busca; ao reiniciar, o alvo com o mesmo localizador retoma de
+    onde parou (sem "mudança" falsa na primeira leitura) em no máximo um intervalo.
+    """
+    def __init__(self, buscador: Buscador, max_concorrencia: int = 10, max_por_host: int = 2,
+                 intervalo_min: float = 1.0, intervalo_max: float = 600.0, jitter: float = 0.1,
+                 falhas_por_host: int = 5, espera_disjuntor: float = 30.0,
+                 estado: Optional[EstadoPersistente] = None):
+        self.buscador = buscador
+        self.max_concorrencia = max_concorrencia
+        self.max_por_host = max_por_host
+        self.intervalo_min = intervalo_min
+        self.intervalo_max = intervalo_max
+        self.jitter = jitter
+        self.falhas_por_host = falhas_por_host
+        self.espera_disjuntor = espera_disjuntor
+        self.estado = estado
+        self.ultimos_valores: Dict[str, str] = {}
+        self.espera_media = 0.0  # Média móvel (s) do atraso entre o horário previsto e o início da busca: indica sobrecarga
+        self._alvos: Dict[str, Alvo] = {}
+        self._intervalos: Dict[str, IntervaloAdaptativo] = {}
+        self._fila: List[Tuple[float, int, str]] = []
+        self._versoes: Dict[str, int] = {}  # Entrada válida do alvo no heap; as demais são descartadas
+        self._sequencia = 0
+        self._em_andamento: Set[asyncio.Task] = set()
+        self._ouvintes: List[Ouvinte] = []
+        self._semaforo: Optional[asyncio.Semaphore] = None
+        self._semaforos_host: Dict[str, asyncio.Semaphore] = {}
+        self._disjuntores: Dict[str, Disjuntor] = {}
+        self._parada: Optional[asyncio.Event] = None
+        self._acordar: Optional[asyncio.Event] = None
+
+    @property
+    def alvos(self) -> List[Alvo]:
+        return list(self._alvos.values())
+
+    @property
+    def pendentes(self) -> int:
+        """
+        Entradas na fila de checagens (inclui entradas antigas ainda não descartadas).
+        """
+        return len(self._fila)
+
+    @property
+    def em_andamento(self) -> int:
+        return len(self._em_andamento)
+
+    def intervalo(self, alvo_id: str) -> Optional[IntervaloAdaptativo]:
+        return self._intervalos.get(alvo_id)
+
+    def disjuntor(self, host: str) -> Optional[Disjuntor]:
+        if not self.falhas_por_host:
+            return None
+        disjuntor = self._disjuntores.get(host)
+        if disjuntor is None:
+            disjuntor = self._disjuntores[host] = Disjuntor(
+                self.falhas_por_host, self.espera_disjuntor, max(self.espera_disjuntor, self.intervalo_max)
+            )
+        return disjuntor
+
+    def ao_alterar(self, ouvinte: Ouvinte):
+        """
+        Registra uma função chamada a cada alteração detectada.
+        """
+        self._ouvintes.append(ouvinte)
+        return ouvinte
+
+    def adicionar(self, alvo: Alvo):
+        if alvo.id in self._alvos:
+            raise ValueError(f"Alvo '{alvo.id}' já está registrado.")
+        self._alvos[alvo.id] = alvo
+        self._intervalos[alvo.id] = IntervaloAdaptativo(
+            alvo.intervalo,
+            alvo.intervalo_min if alvo.intervalo_min is not None else self.intervalo_min,
+            alvo.intervalo_max if alvo.intervalo_max is not None else self.intervalo_max,
+            jitter=self.jitter,
+        )
+        espera = self._restaurar(alvo)
+        if espera is None:
+            # A primeira checagem também recebe jitter para não acumular todos os alvos no mesmo instante
+            espera = random.uniform(0, self.jitter * min(alvo.intervalo, self.intervalo_max))
+        self._agendar(alvo.id, espera)
+
+    def atualizar(self, alvo: Alvo):
+        """
+        Substitui a configuração de um alvo já registrado mantendo o último valor e as
+        estatísticas de mudança; alvos novos são simplesmente adicionados.
+        """
+        anterior = self._alvos.get(alvo.id)
+        if anterior is None:
+            self.adicionar(alvo)
+            return
+        self._alvos[alvo.id] = alvo
+        if (alvo.url, alvo.localizador) != (anterior.url, anterior.localizador):
+            self._esquecer_valores(anterior)  # Outro elemento: o próximo valor é um novo começo
+        intervalo = self._intervalos[alvo.id]
+        intervalo.inicial = alvo.intervalo
+        intervalo.minimo = min(alvo.intervalo_min if alvo.intervalo_min is not None else self.intervalo_min,
+                               alvo.intervalo)
+        intervalo.maximo = max(alvo.intervalo_max if alvo.intervalo_max is not None else self.intervalo_max,
+                               alvo.intervalo)
+        intervalo.atual = min(intervalo.maximo, max(intervalo.minimo, intervalo.atual))
+        self._agendar(alvo.id, 0)  # Checa logo com a nova configuração
+
+    def renomear(self, anterior_id: str, alvo: Alvo):
+        """
+        Registra `alvo` no lugar de `anterior_id` (mesmo elemento, outro id), levando os
+        últimos valores e o ritmo aprendido: a troca não gera alteração falsa.
+        """
+        anterior = self._alvos.get(anterior_id)
+        if anterior is None:
+            self.adicionar(alvo)
+            return
+        valores = {campo: self.ultimos_valores.get(anterior.chave(campo)) for campo in (anterior.campos or [None])}
+        ritmo = self._intervalos[anterior_id].exportar()
+        self.remover(anterior_id)
+        self.adicionar(alvo)
+        for campo, valor in valores.items():
+            if valor is not None:
+                self.ultimos_valores.setdefault(alvo.chave(campo), valor)
+        self._intervalos[alvo.id].restaurar(ritmo)
+
+    def remover(self, alvo_id: str, esquecer_estado: bool = True):
+        """
+        Remove o alvo. Com `esquecer_estado=False` (alvo cedido a outro processo, que o
+        restaura do mesmo banco) o estado salvo é mantido.
+        """
+        alvo = self._alvos.pop(alvo_id, None)
+        self._intervalos.pop(alvo_id, None)
+        self._versoes.pop(alvo_id, None)
+        if alvo is not None:
+            self._esquecer_valores(alvo)
+        METRICAS.remover_rotulo("alvo", alvo_id)
+        if self.estado is not None and esquecer_estado:
+            self.estado.remover(f"agendador:{alvo_id}")
+
+    def receber(self, alvo_id: str, valor: Optional[str]):
+        """
+        Valor empurrado pelo backend entre as checagens (ex: frame capturado da rede):
+        a mudança é emitida na hora, sem esperar a próxima busca. Chamar no loop do agendador.
+        """
+        alvo = self._alvos.get(alvo_id)
+        if alvo is None or alvo.campos or not valor:
+            return
+        anterior = self.ultimos_valores.get(alvo.id)
+        if valor == anterior:
+            return
+        self.ultimos_valores[alvo.id] = valor
+        tarefa = asyncio.get_running_loop().create_task(self._emitir(EventoAlteracao(alvo, anterior, valor)))
+        self._em_andamento.add(tarefa)
+        tarefa.add_done_callback(self._em_andamento.discard)
+
+    @staticmethod
+    def _assinatura(alvo: Alvo) -> str:
+        return repr((alvo.url,) + alvo.localizador)
+
+    def _chaves(self, alvo: Alvo) -> List[str]:
+        return [alvo.chave(campo) for campo in alvo.campos] if alvo.campos else [alvo.id]
+
+    def _restaurar(self, alvo: Alvo) -> Optional[float]:
+        """
+        Recupera o estado salvo do alvo; devolve a espera até a checagem que estava prevista.
+        """
+        if self.estado is None:
+            return None
+        dados = self.estado.ler(f"agendador:{alvo.id}")
+        if not dados or dados.get("localizador") != self._assinatura(alvo):
+            return None  # Alvo novo ou com outro elemento: começa do zero
+        for chave in self._chaves(alvo):
+            if chave in dados.get("valores", {}):
+                self.ultimos_valores[chave] = dados["valores"][chave]
+        intervalo = self._intervalos[alvo.id]
+        intervalo.restaurar(dados.get("intervalo", {}))
+        return min(max(0.0, dados.get("proxima", 0.0) - time.time()), intervalo.atual)
+
+    def _salvar(self, alvo: Alvo, intervalo: IntervaloAdaptativo, espera: float):
+        valores = {chave: self.ultimos_valores[chave] for chave in self._chaves(alvo) if chave in self.ultimos_valores}
+        self.estado.gravar(f"agendador:{alvo.id}", {
+            "localizador": self._assinatura(alvo),
+            "valores": valores,
+            "intervalo": intervalo.exportar(),
+            "proxima": time.time() + espera,
+        })
+
+    def _esquecer_valores(self, alvo: Alvo):
+        self.ultimos_valores.pop(alvo.id, None)
+        for campo in alvo.campos or ():
+            self.ultimos_valores.pop(alvo.chave(campo), None)
+
+    def _agendar(self, alvo_id: str, espera: float):
+        self._sequencia += 1
+        self._versoes[alvo_id] = self._sequencia
+        heapq.heappush(self._fila, (time.monotonic() + espera, self._sequencia, alvo_id))
+        if self._acordar is not None:
+            self._acordar.set()
+
+    def _semaforo_host(self, host: str) -> asyncio.Semaphore:
+        semaforo = self._semaforos_host.get(host)
+        if semaforo is None:
+            semaforo = self._semaforos_host[host] = asyncio.Semaphore(self.max_por_host)
+        return semaforo
+
+    async def _buscar(self, alvo: Alvo) -> Tuple[Valor, bool]:
+        """
+        Valor do alvo e se a busca falhou (exceção do buscador). Um elemento ausente na página
+        devolve None sem falha: não conta contra o disjuntor do host.
+        """
+        async with self._semaforo_host(alvo.host):
+            inicio = time.perf_counter()
+            falhou = False
+            try:
+                if inspect.iscoroutinefunction(self.buscador):
+                    valor = await self.buscador(alvo)
+                else:
+                    valor = await asyncio.to_thread(self.buscador, alvo)
+            except Exception as e:
+                logging.error(f"Erro ao buscar alvo '{alvo.id}': {e}")
+                valor, falhou = None, True
+            METRICAS.observar("busca_segundos", time.perf_counter() - inicio, "Duração das buscas", alvo=alvo.id)
+            if not valor or (isinstance(valor, dict) and not any(valor.values())):  # Nenhum campo encontrado
+                valor = None
+                METRICAS.incrementar("erros_total", 1, "Buscas sem valor", alvo=alvo.id)
+            return valor, falhou
+
+    def _registrar_host(self, host: str, sucesso: bool):
+        disjuntor = self.disjuntor(host)
+        if disjuntor is None:
+            return
+        mudanca = disjuntor.registrar(sucesso)
+        if mudanca == "aberto":
+            logging.warning(f"Disjuntor aberto para {host} após {disjuntor.falhas} falha(s) seguida(s); "
+                            f"nova tentativa em {disjuntor.espera_atual:.0f}s.")
+        elif mudanca == "fechado":
+            logging.info(f"Disjuntor fechado para {host}: buscas retomadas.")
+            for alvo in self._alvos.values():  # Alvos adiados pelo disjuntor voltam já
+                if alvo.host == host:
+                    self._agendar(alvo.id, random.uniform(0, self.jitter * alvo.intervalo))
+        if mudanca:
+            METRICAS.definir("disjuntor_aberto", 1 if mudanca == "aberto" else 0,
+                             "Disjuntor do host aberto (1) ou fechado (0)", host=host)
+
+    async def _emitir(self, evento: EventoAlteracao):
+        for ouvinte in self._ouvintes:
+            try:
+                resultado = ouvinte(evento)
+                if inspect.isawaitable(resultado):
+                    await resultado
+            except Exception as e:
+                logging.error(f"Erro no tratamento do evento {evento}: {e}")
+
+    async def _checar(self, alvo: Alvo):
+        try:
+            valor, falhou = await self._buscar(alvo)
+            self._registrar_host(alvo.host, not falhou)
+            mudou = False
+            valores = valor if isinstance(valor, dict) else {None: valor}
+            for campo, atual in valores.items():
+                chave = alvo.chave(campo)
+                anterior = self.ultimos_valores.get(chave)
+                if atual is None or atual == anterior or self._alvos.get(alvo.id) is not alvo:
+                    continue  # Campo ausente nesta leitura não conta como mudança
+                mudou = True
+                self.ultimos_valores[chave] = atual
+                await self._emitir(EventoAlteracao(alvo, anterior, atual, campo=campo))
+        finally:
+            self._semaforo.release()
+        intervalo = self._intervalos.get(alvo.id)
+        if intervalo is not None and self._alvos.get(alvo.id) is alvo:  # Removido durante a busca: não reagenda
+            espera = intervalo.registrar(mudou, erro=valor is None)
+            self._agendar(alvo.id, espera)
+            if self.estado is not None:
+                self._salvar(alvo, intervalo, espera)
+
+    async def _despachar(self):
+        while not self._parada.is_set():  # wait_for engole o cancelamento se _acordar disparar junto
+            self._acordar.clear()
+            if not self._fila:
+                await self._acordar.wait()
+                continue
+            instante, sequencia, alvo_id = self._fila[0]
+            espera = instante - time.monotonic()
+            if espera > 0:
+                try:
+                    await asyncio.wait_for(self._acordar.wait(), espera)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._fila)
+            if self._versoes.get(alvo_id) != sequencia:
+                continue  # Alvo removido ou reagendado
+            alvo = self._alvos.get(alvo_id)
+            disjuntor = self.disjuntor(alvo.host) if alvo else None
+            if disjuntor is not None and disjuntor.restante() > 0:
+                self._agendar(alvo_id, disjuntor.restante())  # Host em falha: não ocupa vaga de busca
+                continue
+            await self._semaforo.acquire()
+            self.espera_media += 0.1 * ((time.monotonic() - instante) - self.espera_media)
+            alvo = self._alvos.get(alvo_id)
+            if alvo is None:
+                self._semaforo.release()
+                continue
+            # A busca de teste do disjuntor só é marcada com a vaga garantida e o alvo ainda registrado
+            disjuntor = self.disjuntor(alvo.host)
+            if disjuntor is not None and not disjuntor.permite():
+                self._semaforo.release()
+                self._agendar(alvo_id, disjuntor.restante())
+                continue
+            tarefa = asyncio.create_task(self._checar(alvo), name=f"alvo:{alvo_id}")
+            self._em_andamento.add(tarefa)
+            tarefa.add_done_callback(self._em_andamento.discard)
+
+    async def executar(self):
+        """
+        Inicia o monitoramento de todos os alvos e aguarda até `parar()` ser chamado.
+        """
+        self._semaforo = asyncio.Semaphore(self.max_concorrencia)
+        self._parada = asyncio.Event()
+        self._acordar = asyncio.Event()
+        logging.info(f"Agendador iniciado com {len(self._alvos)} alvo(s).")
+        despachante = asyncio.create_task(self._despachar(), name="agendador")
+        gravador = asyncio.create_task(self.estado.descarregar_periodicamente()) if self.estado is not None else None
+        try:
+            await self._parada.wait()
+        finally:
+            despachante.cancel()
+            for tarefa in self._em_andamento:
+                tarefa.cancel()
+            await asyncio.gather(despachante, *self._em_andamento, return_exceptions=True)
+            self._em_andamento.clear()
+            self._parada = None
+            self._acordar = None
+            if gravador is not None:
+                gravador.cancel()
+                await asyncio.gather(gravador, return_exceptions=True)
+                await asyncio.to_thread(self.estado.descarregar)
+
+    def parar(self):
+        if self._parada is not None:
+            self._parada.set()
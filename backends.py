@@ -0,0 +1,175 @@
+import asyncio  # Páginas fechadas fora da busca
+import inspect  # Encerramentos assíncronos
+import threading  # Monitores do backend selenium criados a partir das threads do Agendador
+from typing import Any, Callable, Dict, List, Optional
+
+from agendador import Alvo, Valor
+from bloqueio_recursos import PoliticaRecursos, politica_recursos
+
+# Cada backend importa Selenium, Playwright ou requests só quando é criado: quem usa
+# apenas HTTP não paga a importação (nem precisa ter instalados) os navegadores.
+
+
+class Backend:
+    """
+    Buscador para o Agendador com o ciclo de vida dos recursos por trás dele.
+
+    - buscar(alvo): texto atual do alvo (função comum ou corrotina);
+    - esquecer(alvo_id): libera o que foi reservado para o alvo (alvo removido ou alterado);
+    - encerrar(): fecha navegadores e conexões;
+    - pids(): processos dos navegadores, para a amostragem de recursos;
+    - ao_receber(alvo_id, valor): definido por quem executa o Agendador (ver Agendador.receber),
+      recebe valores que o backend obtém sozinho entre as buscas (captura de rede).
+    """
+    def __init__(self, buscar: Callable, encerrar: Optional[Callable[[], Any]] = None,
+                 esquecer: Optional[Callable[[str], Any]] = None,
+                 pids: Optional[Callable[[], List[int]]] = None):
+        self.buscar = buscar
+        self._encerrar = encerrar
+        self._esquecer = esquecer
+        self._pids = pids
+        self.ao_receber: Optional[Callable[[str, str], None]] = None
+
+    def pids(self) -> List[int]:
+        return self._pids() if self._pids else []
+
+    def esquecer(self, alvo_id: str):
+        if self._esquecer:
+            self._esquecer(alvo_id)
+
+    async def encerrar(self):
+        if self._encerrar:
+            resultado = self._encerrar()
+            if inspect.isawaitable(resultado):
+                await resultado
+
+
+def criar_backend_http(opcoes: Dict[str, Any]) -> Backend:
+    """
+    Só HTML estático (requests + lxml), sem navegador.
+    """
+    from busca_http import BuscadorHTTP
+    http = BuscadorHTTP(tamanho_pool=opcoes.get("max_concorrencia", 10), timeout=opcoes.get("timeout", 10))
+
+    def buscar(alvo: Alvo) -> Valor:
+        if alvo.campos:
+            return http.buscar_campos(alvo.url, alvo.campos)
+        return http.buscar(alvo.url, alvo.seletor, alvo.xpath)
+
+    return Backend(buscar)
+
+
+def _politica(alvo: Alvo, opcoes: Dict[str, Any]) -> PoliticaRecursos:
+    # O perfil do alvo tem precedência sobre o `recursos` geral
+    return politica_recursos(alvo.recursos if alvo.recursos is not None else opcoes.get("recursos", "padrao"))
+
+
+def criar_backend_selenium(opcoes: Dict[str, Any]) -> Backend:
+    """
+    PaginaMonitorada com um pool de Chrome; com `camada_http`, tenta o HTML estático antes.
+    Com `captura_rede` (e `persistente`), os alvos com `rede` usam um pool à parte, cujos drivers
+    registram os eventos de rede; os demais drivers não acumulam um log que ninguém lê.
+    """
+    from captura_rede import filtro_rede
+    from pagina_monitorada import SELETOR_PRECO, PaginaMonitorada
+    from pool_navegadores import caminho_chromedriver, pool_chrome
+
+    persistente = opcoes.get("persistente", False)
+    caminho = opcoes.get("caminho_driver") or caminho_chromedriver()
+    tamanho = opcoes.get("tamanho_pool", opcoes.get("max_concorrencia", 4))
+    pool = pool_chrome(tamanho=tamanho, caminho_driver=caminho)
+    # Os navegadores só são criados no primeiro empréstimo: sem alvos com `rede`, este pool fica vazio
+    pool_rede = pool_chrome(tamanho=tamanho, caminho_driver=caminho, log_rede=True) \
+        if persistente and opcoes.get("captura_rede", False) else None
+    monitores: Dict[str, PaginaMonitorada] = {}
+    trava = threading.Lock()  # `navegar` roda nas threads do Agendador
+
+    def esquecer(alvo_id: str):
+        with trava:
+            monitor = monitores.pop(alvo_id, None)
+        if monitor:
+            monitor.fechar()  # No modo persistente, devolve o navegador reservado ao pool
+
+    def navegar(alvo: Alvo) -> Valor:
+        monitor = monitores.get(alvo.id)
+        seletor = alvo.seletor or SELETOR_PRECO
+        recursos = _politica(alvo, opcoes)
+        rede = filtro_rede(alvo.rede)
+        if monitor and (monitor.url, monitor.seletor, monitor.xpath, monitor.recursos, monitor.rede) != \
+                (alvo.url, seletor, alvo.xpath, recursos, rede):
+            esquecer(alvo.id)  # Alvo alterado: a página reservada não serve mais
+            monitor = None
+        if monitor is None:
+            pool_alvo = pool_rede if rede and pool_rede else pool
+            with trava:
+                monitor = monitores[alvo.id] = PaginaMonitorada(
+                    alvo.url, seletor, pool=pool_alvo, persistente=persistente,
+                    xpath=alvo.xpath, recursos=recursos, rede=rede
+                )
+                if persistente:  # Cada alvo reserva um navegador: o pool cresce com os alvos, inclusive os recarregados
+                    pool_alvo.garantir_tamanho(sum(1 for m in monitores.values() if m.pool is pool_alvo))
+        valor = monitor.buscar_campos(alvo.campos) if alvo.campos else monitor.buscar_numero()
+        if monitor.erro is not None:
+            raise monitor.erro  # Falha do navegador conta para o disjuntor do host; elemento ausente não
+        return valor
+
+    buscar = navegar
+    if opcoes.get("camada_http", True):
+        from busca_http import BuscadorEmCamadas, BuscadorHTTP
+        buscar = BuscadorEmCamadas(BuscadorHTTP(tamanho_pool=opcoes.get("max_concorrencia", 10)), navegar)
+
+    def encerrar():
+        for alvo_id in list(monitores):
+            esquecer(alvo_id)
+        pool.encerrar()
+        if pool_rede:
+            pool_rede.encerrar()
+
+    def pids() -> List[int]:
+        return pool.pids() + (pool_rede.pids() if pool_rede else [])
+
+    return Backend(buscar, encerrar, esquecer, pids)
+
+
+def criar_backend_playwright(opcoes: Dict[str, Any]) -> Backend:
+    """
+    Chromium via Playwright assíncrono, com uma página aberta por alvo (lida sem recarregar),
+    todas no loop do Agendador e distribuídas entre `contextos` contextos do mesmo navegador.
+    O navegador só é iniciado na primeira busca, já dentro do loop do Agendador.
+    Cada página intercepta as próprias requisições conforme a política de recursos do alvo.
+    """
+    from captura_rede import filtro_rede
+    from paginas_playwright import GrupoPaginasPlaywright
+    grupo = GrupoPaginasPlaywright(
+        contextos=opcoes.get("contextos", 4),
+        max_simultaneas=opcoes.get("max_concorrencia", 10),
+        timeout=opcoes.get("timeout", 10),
+        ao_receber=lambda alvo_id, valor: backend.ao_receber and backend.ao_receber(alvo_id, valor),
+    )
+
+    async def buscar(alvo: Alvo) -> Valor:
+        localizador = f"xpath={alvo.xpath}" if alvo.xpath else alvo.seletor
+        return await grupo.ler(alvo.id, alvo.url, localizador, alvo.campos, _politica(alvo, opcoes),
+                               filtro_rede(alvo.rede))
+
+    def esquecer(alvo_id: str):
+        if alvo_id in grupo.paginas:
+            asyncio.get_running_loop().create_task(grupo.fechar_pagina(alvo_id))
+
+    backend = Backend(buscar, grupo.encerrar, esquecer)
+    return backend
+
+
+CriadorBackend = Callable[[Dict[str, Any]], Backend]
+
+BACKENDS: Dict[str, CriadorBackend] = {
+    "http": criar_backend_http,
+    "selenium": criar_backend_selenium,
+    "playwright": criar_backend_playwright,
+}
+
+
+def criar_backend(nome: str, opcoes: Optional[Dict[str, Any]] = None) -> Backend:
+    if nome not in BACKENDS:
+        raise ValueError(f"Backend desconhecido: '{nome}'. Opções: {', '.join(sorted(BACKENDS))}.")
+    return BACKENDS[nome](opcoes or {})
@@ -0,0 +1,436 @@
+"""
+Benchmark dos monitores contra uma página de cotação local.
+
+A página falsa expõe `[data-test="instrument-price-last"]` e troca o valor a cada
+`periodo` segundos (no HTML servido e, via JavaScript, no DOM já carregado). Como o
+valor do tick k é conhecido, cada leitura diz exatamente qual mudança foi vista e
+quanto tempo depois ela aconteceu.
+
+Uso:
+    python benchmark.py --competidores base_http pagina_monitorada --duracao 30 --periodo 1
+    python benchmark.py --comparar benchmark_base.json   # Compara com um baseline anterior
+"""
+import argparse   # Linha de comando
+import json       # Baseline em JSON
+import logging    # Registro de logs
+import os         # PID do processo
+import re         # Preço no texto da página
+import statistics # Percentis de latência
+import sys        # Código de saída
+import threading  # Servidor e amostragem em segundo plano
+import time       # Relógio dos ticks
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config_log import configurar_log
+from numeros import interpretar_numero
+
+SELETOR = '[data-test="instrument-price-last"]'
+BASE_CENTAVOS = 5_000_000  # 50.000,00
+
+
+def formatar_centavos(centavos: int) -> str:
+    inteiro, fracao = divmod(centavos, 100)
+    return f"{inteiro:,}".replace(",", ".") + f",{fracao:02d}"
+
+
+class PaginaFalsa:
+    """
+    Servidor HTTP local com a página de cotação. O tick k começa em `t0 + k * periodo`
+    e exibe BASE_CENTAVOS + k.
+    """
+    def __init__(self, periodo: float = 1.0, tamanho_dom: int = 1000, porta: int = 0):
+        self.periodo = periodo
+        self.tamanho_dom = tamanho_dom
+        self.t0 = time.time()
+        self._preenchimento = "\n".join(
+            f'<div class="linha"><span>Ativo {i}</span><span>{i},{i % 100:02d}</span></div>'
+            for i in range(tamanho_dom)
+        )
+        pagina = self
+
+        class _Tratador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                corpo = pagina.html().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.send_header("Cache-Control", "no-store")
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, formato, *args):
+                pass
+
+        self._servidor = ThreadingHTTPServer(("127.0.0.1", porta), _Tratador)
+        self._servidor.daemon_threads = True
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._servidor.server_address[1]}/"
+
+    def tick(self, instante: Optional[float] = None) -> int:
+        return int(((instante if instante is not None else time.time()) - self.t0) // self.periodo)
+
+    def inicio_tick(self, k: int) -> float:
+        return self.t0 + k * self.periodo
+
+    def tick_do_texto(self, texto: Optional[str]) -> Optional[int]:
+        valor = interpretar_numero(texto or "")
+        if valor is None:
+            return None
+        return int(round(valor * 100)) - BASE_CENTAVOS
+
+    def html(self) -> str:
+        valor = formatar_centavos(BASE_CENTAVOS + self.tick())
+        return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Cotação</title></head>
+<body>
+<h1>Bitcoin</h1>
+<p>Último: <span data-test="instrument-price-last">{valor}</span></p>
+<div id="tabela">
+{self._preenchimento}
+</div>
+<script>
+(function () {{
+    var t0 = {self.t0 * 1000:.3f}, periodo = {self.periodo * 1000:.3f}, base = {BASE_CENTAVOS};
+    var el = document.querySelector('{SELETOR}');
+    function formatar(c) {{
+        var inteiro = String(Math.floor(c / 100)).replace(/\\B(?=(\\d{{3}})+(?!\\d))/g, '.');
+        var fracao = String(c % 100).padStart(2, '0');
+        return inteiro + ',' + fracao;
+    }}
+    function atualizar() {{
+        var decorrido = Date.now() - t0;
+        el.textContent = formatar(base + Math.floor(decorrido / periodo));
+        setTimeout(atualizar, periodo - (decorrido % periodo) + 1);
+    }}
+    atualizar();
+}})();
+</script>
+</body></html>"""
+
+    def iniciar(self) -> "PaginaFalsa":
+        threading.Thread(target=self._servidor.serve_forever, name="pagina-falsa", daemon=True).start()
+        return self
+
+    def parar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
+
+
+# === Competidores ===
+# Cada competidor lê a página até `ativo()` ficar falso e chama `registrar(texto)` a cada leitura.
+
+Registrar = Callable[[Optional[str]], None]
+
+
+def _sondar(ler: Callable[[], Optional[str]], ativo: Callable[[], bool], registrar: Registrar, intervalo: float):
+    while ativo():
+        registrar(ler())
+        time.sleep(intervalo)
+
+
+def competidor_base_http(url: str, ativo, registrar: Registrar, intervalo: float, opcoes: dict):
+    """
+    Caminho HTTP do script `Base` (requests + lxml, sem navegador).
+    """
+    from busca_http import BuscadorHTTP
+    http = BuscadorHTTP()
+    _sondar(lambda: http.buscar(url, SELETOR), ativo, registrar, intervalo)
+
+
+def _pool(opcoes: dict):
+    from pool_navegadores import pool_chrome
+    return pool_chrome(tamanho=1, caminho_driver=opcoes.get("caminho_driver"))
+
+
+def competidor_pagina_monitorada(url: str, ativo, registrar: Registrar, intervalo: float, opcoes: dict):
+    """
+    `pagina_monitorada.PaginaMonitorada` (recarrega a página a cada leitura, ou persistente com `--persistente`).
+    """
+    from pagina_monitorada import PaginaMonitorada
+    pool = _pool(opcoes)
+    monitor = PaginaMonitorada(url, SELETOR, pool=pool, persistente=opcoes.get("persistente", False))
+    try:
+        _sondar(monitor.buscar_numero, ativo, registrar, intervalo)
+    finally:
+        monitor.fechar()
+        pool.encerrar()
+
+
+def competidor_monitor_html(url: str, ativo, registrar: Registrar, intervalo: float, opcoes: dict):
+    """
+    `monitor_site.MonitorHTML`: lê o corpo inteiro e procura o texto; o preço é extraído do corpo.
+    """
+    from monitor_site import MonitorHTML
+    pool = _pool(opcoes)
+    monitor = MonitorHTML(url, "Último:", pool=pool, persistente=opcoes.get("persistente", False))
+
+    def ler():
+        corpo = monitor.buscar_numero()
+        encontrado = re.search(r"Último:\s*([\d.,]+)", corpo or "")
+        return encontrado.group(1) if encontrado else None
+
+    try:
+        _sondar(ler, ativo, registrar, intervalo)
+    finally:
+        monitor.finalizar()
+        pool.encerrar()
+
+
+def competidor_ultimo_xpath(url: str, ativo, registrar: Registrar, intervalo: float, opcoes: dict):
+    """
+    Fluxo do `ultimo.py`: acha o elemento pelo valor exibido, gera o XPath absoluto e relê por ele.
+    Com `--push`, usa o MutationObserver (`monitorar_xpath_por_mutacao`).
+    """
+    from selenium.webdriver.common.by import By
+    from observador_mutacao import ObservadorSelenium
+    from pagina_persistente import LeitorPersistente, PoliticaRecarga
+    from pool_navegadores import criar_driver_chrome
+    from ultimo import encontrar_elemento_por_valor, gerar_xpath_completo
+
+    driver = criar_driver_chrome(opcoes.get("caminho_driver"))
+    try:
+        driver.get(url)
+        texto_inicial = driver.find_element(By.CSS_SELECTOR, SELETOR).text.strip()
+        elemento = encontrar_elemento_por_valor(driver, texto_inicial)
+        xpath = gerar_xpath_completo(driver, elemento) if elemento else None
+        if not xpath:
+            raise RuntimeError("Elemento não encontrado pelo valor (o tick mudou durante a busca?)")
+        if opcoes.get("push"):
+            observador = ObservadorSelenium(driver, xpath=xpath)
+            observador.instalar()
+            while ativo():
+                for texto, _ in observador.aguardar(timeout=1.0):
+                    registrar(texto)
+        else:
+            leitor = LeitorPersistente(driver, url, By.XPATH, xpath, PoliticaRecarga(erros_para_recarregar=3),
+                                       ja_carregada=True)
+            _sondar(leitor.ler, ativo, registrar, intervalo)
+    finally:
+        driver.quit()
+
+
+def competidor_playwright(url: str, ativo, registrar: Registrar, intervalo: float, opcoes: dict):
+    """
+    Laço do `codigo2.py` (Playwright, página aberta); com `--push`, via MutationObserver.
+    """
+    from playwright.sync_api import sync_playwright
+    from observador_mutacao import ObservadorPlaywright
+
+    with sync_playwright() as p:
+        navegador = p.chromium.launch(headless=True)
+        try:
+            pagina = navegador.new_page()
+            pagina.goto(url, wait_until="domcontentloaded")
+            if opcoes.get("push"):
+                observador = ObservadorPlaywright(pagina, seletor=SELETOR)
+                observador.instalar()
+                while ativo():
+                    for texto, _ in observador.aguardar(timeout=1.0):
+                        registrar(texto)
+            else:
+                localizador = pagina.locator(SELETOR)
+                _sondar(lambda: localizador.inner_text(timeout=10000).strip(), ativo, registrar, intervalo)
+        finally:
+            navegador.close()
+
+
+COMPETIDORES: Dict[str, Callable] = {
+    "base_http": competidor_base_http,
+    "pagina_monitorada": competidor_pagina_monitorada,
+    "monitor_html": competidor_monitor_html,
+    "ultimo_xpath": competidor_ultimo_xpath,
+    "playwright": competidor_playwright,
+}
+
+
+# === Medição ===
+
+class _Recursos:
+    """
+    Amostra CPU e RSS do processo e dos filhos (navegadores) durante a execução.
+    Sem psutil, usa os tempos de CPU do próprio processo e dos filhos já encerrados.
+    """
+    def __init__(self, intervalo: float = 0.5):
+        self.intervalo = intervalo
+        self.amostras: List[Tuple[float, float]] = []
+        self._parada = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._tempos_inicio = os.times()
+        self._inicio = time.monotonic()
+
+    def _rodar(self):
+        from metricas import amostrar_arvore
+        while not self._parada.wait(self.intervalo):
+            rss, cpu, _ = amostrar_arvore(os.getpid())
+            self.amostras.append((rss, cpu))
+
+    def iniciar(self):
+        try:
+            import psutil  # noqa: F401
+        except ImportError:
+            return self
+        self._thread = threading.Thread(target=self._rodar, daemon=True)
+        self._thread.start()
+        return self
+
+    def parar(self) -> dict:
+        self._parada.set()
+        if self._thread:
+            self._thread.join()
+        if self.amostras:
+            return {
+                "cpu_medio_percentual": round(statistics.fmean(c for _, c in self.amostras), 1),
+                "rss_pico_mb": round(max(r for r, _ in self.amostras), 1),
+                "rss_medio_mb": round(statistics.fmean(r for r, _ in self.amostras), 1),
+            }
+        fim, decorrido = os.times(), time.monotonic() - self._inicio
+        cpu = sum(fim[:4]) - sum(self._tempos_inicio[:4])
+        return {"cpu_medio_percentual": round(100 * cpu / decorrido, 1) if decorrido else None,
+                "rss_pico_mb": None, "rss_medio_mb": None}
+
+
+def _percentil(valores: List[float], p: float) -> Optional[float]:
+    if not valores:
+        return None
+    ordenados = sorted(valores)
+    return ordenados[min(len(ordenados) - 1, int(round(p / 100 * (len(ordenados) - 1))))]
+
+
+def medir(nome: str, pagina: PaginaFalsa, duracao: float, intervalo: float, opcoes: dict,
+          aquecimento: float = 3.0) -> dict:
+    """
+    Executa um competidor por `aquecimento + duracao` segundos e compara o que ele viu
+    com os ticks que a página realmente exibiu na janela medida.
+    """
+    deteccoes: Dict[int, float] = {}
+    leituras = falhas = 0
+    inicio_janela = time.time() + aquecimento
+    fim_janela = inicio_janela + duracao
+
+    def registrar(texto: Optional[str]):
+        nonlocal leituras, falhas
+        agora = time.time()
+        leituras += 1
+        k = pagina.tick_do_texto(texto)
+        if k is None:
+            falhas += 1
+        elif k not in deteccoes:
+            deteccoes[k] = agora
+
+    recursos = _Recursos()
+    erro = None
+    parar_em = fim_janela + pagina.periodo  # Margem para detectar o último tick da janela
+    recursos.iniciar()
+    try:
+        COMPETIDORES[nome](pagina.url, lambda: time.time() < parar_em, registrar, intervalo, opcoes)
+    except Exception as e:
+        erro = str(e)
+        logging.error(f"Competidor {nome} falhou: {e}")
+    uso = recursos.parar()
+
+    primeiro, ultimo = pagina.tick(inicio_janela) + 1, pagina.tick(fim_janela)  # Ticks iniciados na janela
+    esperados = max(0, ultimo - primeiro + 1)
+    latencias = [deteccoes[k] - pagina.inicio_tick(k) for k in range(primeiro, ultimo + 1) if k in deteccoes]
+    return {
+        "competidor": nome,
+        "erro": erro,
+        "ticks_esperados": esperados,
+        "ticks_capturados": len(latencias),
+        "ticks_perdidos": esperados - len(latencias),
+        "taxa_captura": round(len(latencias) / esperados, 3) if esperados else None,
+        "leituras": leituras,
+        "leituras_sem_valor": falhas,
+        "latencia_ms": {
+            "p50": _ms(_percentil(latencias, 50)),
+            "p95": _ms(_percentil(latencias, 95)),
+            "max": _ms(max(latencias) if latencias else None),
+            "media": _ms(statistics.fmean(latencias) if latencias else None),
+        },
+        **uso,
+    }
+
+
+def _ms(segundos: Optional[float]) -> Optional[float]:
+    return round(segundos * 1000, 1) if segundos is not None else None
+
+
+def comparar(atual: dict, baseline: dict, tolerancia: float) -> List[str]:
+    """
+    Regressões em relação ao baseline: queda na taxa de captura ou alta na latência p50
+    maior que `tolerancia` (fração, ex: 0.2 = 20%).
+    """
+    anteriores = {r["competidor"]: r for r in baseline.get("resultados", [])}
+    regressoes = []
+    for resultado in atual["resultados"]:
+        anterior = anteriores.get(resultado["competidor"])
+        if not anterior or resultado["erro"] or anterior["erro"]:
+            continue
+        nome = resultado["competidor"]
+        if anterior["taxa_captura"] and resultado["taxa_captura"] is not None \
+                and resultado["taxa_captura"] < anterior["taxa_captura"] * (1 - tolerancia):
+            regressoes.append(f"{nome}: taxa de captura {anterior['taxa_captura']} -> {resultado['taxa_captura']}")
+        p50_antes, p50_agora = anterior["latencia_ms"]["p50"], resultado["latencia_ms"]["p50"]
+        if p50_antes and p50_agora and p50_agora > p50_antes * (1 + tolerancia):
+            regressoes.append(f"{nome}: latência p50 {p50_antes}ms -> {p50_agora}ms")
+    return regressoes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dos monitores contra uma página de cotação local.")
+    parser.add_argument("--competidores", nargs="+", choices=sorted(COMPETIDORES), default=sorted(COMPETIDORES))
+    parser.add_argument("--duracao", type=float, default=30, help="Segundos medidos por competidor")
+    parser.add_argument("--periodo", type=float, default=1.0, help="Segundos entre mudanças do valor")
+    parser.add_argument("--tamanho-dom", type=int, default=1000, help="Linhas extras na página")
+    parser.add_argument("--intervalo", type=float, default=0.5, help="Intervalo de leitura dos competidores")
+    parser.add_argument("--persistente", action="store_true", help="Mantém a página aberta (Selenium)")
+    parser.add_argument("--push", action="store_true", help="Usa MutationObserver quando disponível")
+    parser.add_argument("--caminho-driver", help="chromedriver já instalado")
+    parser.add_argument("--saida", default="benchmark_resultados.json")
+    parser.add_argument("--comparar", help="Baseline JSON para detectar regressões")
+    parser.add_argument("--tolerancia", type=float, default=0.2)
+    args = parser.parse_args()
+
+    configurar_log("benchmark.log", nivel=logging.WARNING)  # Só avisos: o log não pesa na medição
+    opcoes = {"persistente": args.persistente, "push": args.push, "caminho_driver": args.caminho_driver}
+    pagina = PaginaFalsa(args.periodo, args.tamanho_dom).iniciar()
+    try:
+        resultados = []
+        for nome in args.competidores:
+            print(f"Medindo {nome}...", flush=True)
+            resultado = medir(nome, pagina, args.duracao, args.intervalo, opcoes)
+            resultados.append(resultado)
+            print(f"  captura {resultado['ticks_capturados']}/{resultado['ticks_esperados']}, "
+                  f"latência p50 {resultado['latencia_ms']['p50']}ms, "
+                  f"CPU {resultado['cpu_medio_percentual']}%, RSS pico {resultado['rss_pico_mb']}MB"
+                  + (f", erro: {resultado['erro']}" if resultado["erro"] else ""))
+    finally:
+        pagina.parar()
+
+    relatorio = {
+        "configuracao": {
+            "duracao": args.duracao, "periodo": args.periodo, "tamanho_dom": args.tamanho_dom,
+            "intervalo": args.intervalo, "persistente": args.persistente, "push": args.push,
+        },
+        "python": sys.version.split()[0],
+        "instante": time.time(),
+        "resultados": resultados,
+    }
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    print(f"Resultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as f:
+            regressoes = comparar(relatorio, json.load(f), args.tolerancia)
+        for regressao in regressoes:
+            print(f"REGRESSÃO: {regressao}")
+        if regressoes:
+            sys.exit(1)
+        print("Sem regressões em relação ao baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Bloqueio de recursos pesados (imagens, fontes, mídia, anúncios e rastreadores) nas
+páginas monitoradas: o valor lido não depende deles, mas eles dominam o tempo de
+carregamento, o tráfego e a memória do renderizador.
+
+- Playwright: `page.route`/`context.route`, com bloqueio por tipo de recurso e domínio;
+- Selenium: `Network.setBlockedURLs` via CDP, com os tipos traduzidos em extensões de arquivo.
+
+Uso para medir a economia em uma página real:
+    python bloqueio_recursos.py https://br.investing.com/crypto/bitcoin --perfil padrao
+"""
+import argparse  # Linha de comando da medição
+import json      # Resultado da medição
+import logging   # Registro de logs
+import time      # Tempo de carregamento
+import weakref   # Padrões já aplicados em cada driver
+from typing import Any, Dict, Iterable, List, Optional, Union
+from urllib.parse import urlparse
+
+from metricas import METRICAS
+
+# Tipos de recurso do Playwright (request.resource_type) que nunca carregam o valor
+TIPOS_PESADOS = ("image", "media", "font")
+
+# Anúncios, analytics e rastreadores comuns em sites de cotação
+DOMINIOS_RASTREAMENTO = (
+    "doubleclick.net", "googlesyndication.com", "googleadservices.com", "google-analytics.com",
+    "googletagmanager.com", "googletagservices.com", "adservice.google.com", "amazon-adsystem.com",
+    "adnxs.com", "criteo.com", "criteo.net", "taboola.com", "outbrain.com", "scorecardresearch.com",
+    "quantserve.com", "moatads.com", "facebook.net", "connect.facebook.net", "hotjar.com",
+    "chartbeat.com", "nr-data.net", "pubmatic.com", "rubiconproject.com", "casalemedia.com",
+)
+
+# Sem acesso ao tipo do recurso no Selenium, os tipos viram padrões de extensão
+EXTENSOES = {
+    "image": ("png", "jpg", "jpeg", "gif", "webp", "avif", "svg", "ico", "bmp"),
+    "media": ("mp4", "webm", "mp3", "ogg", "m4a", "m3u8", "ts"),
+    "font": ("woff", "woff2", "ttf", "otf", "eot"),
+    "stylesheet": ("css",),
+}
+
+
+def _no_dominio(host: str, dominio: str) -> bool:
+    return host == dominio or host.endswith("." + dominio)
+
+
+class PoliticaRecursos:
+    """
+    O que não deve ser carregado: tipos de recurso e domínios (incluindo subdomínios).
+    `permitidos` tem precedência sobre os bloqueios (ex: o CDN que entrega o valor).
+    """
+    def __init__(self, tipos: Iterable[str] = (), dominios: Iterable[str] = (),
+                 permitidos: Iterable[str] = ()):
+        self.tipos = frozenset(tipos)
+        self.dominios = tuple(dominios)
+        self.permitidos = tuple(permitidos)
+
+    @property
+    def vazia(self) -> bool:
+        return not self.tipos and not self.dominios
+
+    def bloqueia(self, tipo: str, url: str) -> bool:
+        host = (urlparse(url).hostname or "").lower()
+        if any(_no_dominio(host, dominio) for dominio in self.permitidos):
+            return False
+        return tipo in self.tipos or any(_no_dominio(host, dominio) for dominio in self.dominios)
+
+    def padroes_url(self) -> List[str]:
+        """
+        Padrões para `Network.setBlockedURLs` (os domínios permitidos não têm equivalente ali).
+        """
+        padroes = []
+        for dominio in self.dominios:
+            padroes += [f"*://{dominio}/*", f"*://*.{dominio}/*"]
+        for tipo in sorted(self.tipos):
+            for extensao in EXTENSOES.get(tipo, ()):
+                padroes += [f"*.{extensao}", f"*.{extensao}?*"]
+        return padroes
+
+    def __eq__(self, outra):
+        return isinstance(outra, PoliticaRecursos) and \
+            (self.tipos, self.dominios, self.permitidos) == (outra.tipos, outra.dominios, outra.permitidos)
+
+    def __hash__(self):
+        return hash((self.tipos, self.dominios, self.permitidos))
+
+    def __repr__(self):
+        return f"PoliticaRecursos(tipos={sorted(self.tipos)}, dominios={len(self.dominios)}, permitidos={list(self.permitidos)})"
+
+
+PERFIS: Dict[str, PoliticaRecursos] = {
+    "nenhum": PoliticaRecursos(),
+    # Padrão seguro: scripts, XHR, fetch e websockets do site continuam (é por eles que o valor chega)
+    "padrao": PoliticaRecursos(TIPOS_PESADOS, DOMINIOS_RASTREAMENTO),
+    # Também sem CSS: elementos escondidos por estilo passam a ter texto visível
+    "minimo": PoliticaRecursos(TIPOS_PESADOS + ("stylesheet", "texttrack", "manifest"), DOMINIOS_RASTREAMENTO),
+}
+
+Recursos = Union[None, str, Dict[str, Any], PoliticaRecursos]
+
+
+def politica_recursos(recursos: Recursos, padrao: str = "padrao") -> PoliticaRecursos:
+    """
+    Nome de perfil, ou mapa {perfil, tipos, dominios, permitidos} que estende um perfil.
+    """
+    if isinstance(recursos, PoliticaRecursos):
+        return recursos
+    if recursos is None:
+        recursos = padrao
+    if isinstance(recursos, str):
+        if recursos not in PERFIS:
+            raise ValueError(f"Perfil de recursos desconhecido: '{recursos}'. Opções: {', '.join(sorted(PERFIS))}.")
+        return PERFIS[recursos]
+    if not isinstance(recursos, dict):
+        raise ValueError("'recursos' deve ser o nome de um perfil ou um mapa com tipos/dominios/permitidos.")
+    desconhecidas = set(recursos) - {"perfil", "tipos", "dominios", "permitidos"}
+    if desconhecidas:
+        raise ValueError(f"Chave(s) desconhecida(s) em 'recursos': {', '.join(sorted(desconhecidas))}.")
+    base = politica_recursos(recursos.get("perfil", padrao))
+    return PoliticaRecursos(
+        base.tipos | set(recursos.get("tipos", ())),
+        base.dominios + tuple(recursos.get("dominios", ())),
+        base.permitidos + tuple(recursos.get("permitidos", ())),
+    )
+
+
+# ---------- Selenium (CDP) ----------
+
+_aplicadas_selenium: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def aplicar_selenium(driver, politica: PoliticaRecursos):
+    """
+    Configura o bloqueio no driver. Chamadas repetidas com a mesma política não custam nada,
+    então pode ser chamada antes de cada navegação com drivers compartilhados entre alvos.
+    """
+    try:
+        if _aplicadas_selenium.get(driver) == politica:
+            return
+    except TypeError:  # Driver sem suporte a referência fraca
+        pass
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": politica.padroes_url()})
+    except Exception as e:  # Navegador sem CDP (Firefox, Remote sem Chromium)
+        logging.warning(f"Bloqueio de recursos indisponível neste navegador: {e}")
+        return
+    try:
+        _aplicadas_selenium[driver] = politica
+    except TypeError:
+        pass
+
+
+# ---------- Playwright (route) ----------
+
+def _registrar_bloqueio(tipo: str):
+    METRICAS.incrementar("recursos_bloqueados_total", 1, "Requisições bloqueadas pela política de recursos", tipo=tipo)
+
+
+async def aplicar_playwright(alvo, politica: PoliticaRecursos):
+    """
+    Intercepta as requisições de uma página ou contexto do Playwright assíncrono.
+    Sem nada a bloquear, não instala a rota (cada requisição roteada passa pelo Python).
+    """
+    if politica.vazia:
+        return
+
+    async def tratar(route):
+        requisicao = route.request
+        if politica.bloqueia(requisicao.resource_type, requisicao.url):
+            _registrar_bloqueio(requisicao.resource_type)
+            await route.abort("blockedbyclient")
+        else:
+            await route.continue_()
+
+    await alvo.route("**/*", tratar)
+
+
+def aplicar_playwright_sync(alvo, politica: PoliticaRecursos):
+    """
+    Mesma interceptação para o Playwright síncrono.
+    """
+    if politica.vazia:
+        return
+
+    def tratar(route):
+        requisicao = route.request
+        if politica.bloqueia(requisicao.resource_type, requisicao.url):
+            _registrar_bloqueio(requisicao.resource_type)
+            route.abort("blockedbyclient")
+        else:
+            route.continue_()
+
+    alvo.route("**/*", tratar)
+
+
+# ---------- Medição da economia ----------
+
+def _carregar_medindo(navegador, url: str, politica: Optional[PoliticaRecursos], espera: float) -> Dict[str, Any]:
+    contexto = navegador.new_context()
+    try:
+        pagina = contexto.new_page()
+        if politica is not None:
+            aplicar_playwright_sync(pagina, politica)
+        cdp = contexto.new_cdp_session(pagina)
+        cdp.send("Network.enable")
+        medida = {"bytes": 0, "requisicoes": 0, "bloqueadas": 0}
+
+        def concluida(parametros):
+            medida["bytes"] += parametros.get("encodedDataLength", 0)
+            medida["requisicoes"] += 1
+
+        def falhou(parametros):
+            if parametros.get("blockedReason") or "BLOCKED" in parametros.get("errorText", "").upper():
+                medida["bloqueadas"] += 1
+
+        cdp.on("Network.loadingFinished", concluida)
+        cdp.on("Network.loadingFailed", falhou)
+        inicio = time.perf_counter()
+        pagina.goto(url, wait_until="load", timeout=60000)
+        medida["carregamento_ms"] = round((time.perf_counter() - inicio) * 1000, 1)
+        pagina.wait_for_timeout(espera * 1000)  # Scripts que continuam baixando depois do load
+        return medida
+    finally:
+        contexto.close()
+
+
+def medir_economia(url: str, recursos: Recursos = "padrao", espera: float = 3.0) -> Dict[str, Any]:
+    """
+    Carrega a página sem e com a política e compara os bytes recebidos (CDP, Chromium).
+    """
+    from playwright.sync_api import sync_playwright
+
+    politica = politica_recursos(recursos)
+    with sync_playwright() as p:
+        navegador = p.chromium.launch(headless=True)
+        try:
+            sem = _carregar_medindo(navegador, url, None, espera)
+            com = _carregar_medindo(navegador, url, politica, espera)
+        finally:
+            navegador.close()
+    economia = sem["bytes"] - com["bytes"]
+    return {
+        "url": url,
+        "sem_politica": sem,
+        "com_politica": com,
+        "bytes_economizados": economia,
+        "economia_percentual": round(100 * economia / sem["bytes"], 1) if sem["bytes"] else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Mede os bytes economizados pela política de recursos.")
+    parser.add_argument("url")
+    parser.add_argument("--perfil", default="padrao", choices=sorted(PERFIS))
+    parser.add_argument("--espera", type=float, default=3.0, help="Segundos extras após o load")
+    args = parser.parse_args()
+    print(json.dumps(medir_economia(args.url, args.perfil, args.espera), indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+import logging    # Registro de logs
+import threading  # O cache é compartilhado entre as threads do Agendador
+import time       # Validade da decisão de camada
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+import requests
+from requests.adapters import HTTPAdapter
+from lxml import etree, html
+
+from campos import Campos, extrair_campos_html
+from metricas import METRICAS
+
+try:
+    import brotli  # noqa: F401 - habilita a decodificação "br" no urllib3
+    CODIFICACOES = "gzip, deflate, br"
+except ImportError:
+    CODIFICACOES = "gzip, deflate"
+
+try:
+    from cssselect import SelectorError  # Seletor CSS inválido ou sem tradução para XPath
+except ImportError:
+    SelectorError = ValueError
+
+CAMADA_HTTP = "http"
+CAMADA_NAVEGADOR = "navegador"
+
+
+@lru_cache(maxsize=1024)
+def compilar_xpath(xpath: str) -> etree.XPath:
+    return etree.XPath(xpath)
+
+
+@lru_cache(maxsize=1024)
+def compilar_css(seletor: str) -> etree.XPath:
+    from lxml.cssselect import CSSSelector  # Requer o pacote cssselect
+    return CSSSelector(seletor)
+
+
+def extrair_valor(arvore, seletor: Optional[str] = None, xpath: Optional[str] = None) -> Optional[str]:
+    """
+    Retorna o texto do primeiro elemento que casa com o seletor CSS ou o XPath.
+    """
+    encontrados = compilar_css(seletor)(arvore) if seletor else compilar_xpath(xpath)(arvore)
+    for item in encontrados:
+        texto = item if isinstance(item, str) else item.text_content()
+        texto = texto.strip()
+        if texto:
+            return texto
+    return None
+
+
+class _Pagina:
+    __slots__ = ("etag", "modificada_em", "conteudo", "valores")
+
+    def __init__(self, etag: Optional[str], modificada_em: Optional[str], conteudo: bytes):
+        self.etag = etag
+        self.modificada_em = modificada_em
+        self.conteudo = conteudo
+        self.valores: Dict[Tuple, Any] = {}  # Extrações já feitas sobre este conteúdo
+
+
+class BuscadorHTTP:
+    """
+    Busca valores em HTML estático sem navegador: sessão com keep-alive,
+    requisições condicionais (ETag/If-Modified-Since) e compressão gzip/brotli.
+    """
+    def __init__(self, tamanho_pool: int = 20, timeout: int = 10, cabecalhos: Optional[Dict[str, str]] = None):
+        self.timeout = timeout
+        self.sessao = requests.Session()
+        adaptador = HTTPAdapter(pool_connections=tamanho_pool, pool_maxsize=tamanho_pool)
+        self.sessao.mount("http://", adaptador)
+        self.sessao.mount("https://", adaptador)
+        self.sessao.headers.update({
+            "Accept-Encoding": CODIFICACOES,
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                          "(KHTML, like Gecko) Chrome/113 Safari/537.36",
+        })
+        if cabecalhos:
+            self.sessao.headers.update(cabecalhos)
+        self.estatisticas = {"requisicoes": 0, "nao_modificadas": 0}
+        self._paginas: Dict[str, _Pagina] = {}
+        self._trava = threading.Lock()
+
+    def baixar(self, url: str) -> _Pagina:
+        """
+        Baixa a página; se o servidor responder 304, reaproveita o conteúdo em cache.
+        """
+        with self._trava:
+            anterior = self._paginas.get(url)
+        cabecalhos = {}
+        if anterior:
+            if anterior.etag:
+                cabecalhos["If-None-Match"] = anterior.etag
+            if anterior.modificada_em:
+                cabecalhos["If-Modified-Since"] = anterior.modificada_em
+
+        resposta = self.sessao.get(url, headers=cabecalhos, timeout=self.timeout)
+        self.estatisticas["requisicoes"] += 1
+        if resposta.status_code == 304 and anterior:
+            self.estatisticas["nao_modificadas"] += 1
+            return anterior
+        resposta.raise_for_status()
+
+        pagina = _Pagina(resposta.headers.get("ETag"), resposta.headers.get("Last-Modified"), resposta.content)
+        with self._trava:
+            self._paginas[url] = pagina
+        return pagina
+
+    def buscar(self, url: str, seletor: Optional[str] = None, xpath: Optional[str] = None) -> Optional[str]:
+        """
+        Retorna o texto do elemento no HTML estático, ou None se ele não estiver lá.
+        Erros de rede são propagados para quem chamou.
+        """
+        pagina = self.baixar(url)
+        chave = (seletor, xpath)
+        if chave not in pagina.valores:  # Página nova: extrai uma vez e guarda até a próxima mudança
+            with METRICAS.cronometrar("extracao_segundos", "Tempo de extração do valor", origem=CAMADA_HTTP):
+                pagina.valores[chave] = extrair_valor(html.fromstring(pagina.conteudo), seletor, xpath)
+        return pagina.valores[chave]
+
+    def buscar_campos(self, url: str, campos: Campos) -> Dict[str, Optional[str]]:
+        """
+        Vários campos do mesmo HTML estático, com uma única análise da página.
+        """
+        pagina = self.baixar(url)
+        chave = ("campos",) + tuple(sorted(campos.items()))
+        if chave not in pagina.valores:
+            with METRICAS.cronometrar("extracao_segundos", "Tempo de extração do valor", origem=CAMADA_HTTP):
+                pagina.valores[chave] = extrair_campos_html(html.fromstring(pagina.conteudo), campos)
+        return pagina.valores[chave]
+
+
+class BuscadorEmCamadas:
+    """
+    Tenta primeiro o HTML estático e só recorre ao navegador quando a extração falha.
+    A decisão é guardada por URL e reavaliada depois de `reavaliar_apos` segundos.
+
+    Pode ser usado diretamente como buscador do Agendador.
+    """
+    def __init__(self, http: BuscadorHTTP, navegador: Callable, reavaliar_apos: float = 3600):
+        self.http = http
+        self.navegador = navegador
+        self.reavaliar_apos = reavaliar_apos
+        self._camadas: Dict[str, Tuple[str, float]] = {}
+
+    def camada(self, url: str) -> Optional[str]:
+        decisao = self._camadas.get(url)
+        if decisao is None or time.monotonic() - decisao[1] > self.reavaliar_apos:
+            return None
+        return decisao[0]
+
+    def _decidir(self, url: str, camada: str):
+        if self.camada(url) != camada:
+            logging.info(f"Camada de busca para {url}: {camada}")
+        self._camadas[url] = (camada, time.monotonic())
+
+    def __call__(self, alvo) -> Union[None, str, Dict[str, Optional[str]]]:
+        if self.camada(alvo.url) != CAMADA_NAVEGADOR:
+            try:
+                if alvo.campos:
+                    # Só fica no HTTP se todos os campos estiverem no HTML estático
+                    valor = self.http.buscar_campos(alvo.url, alvo.campos)
+                    valor = valor if all(valor.values()) else None
+                else:
+                    valor = self.http.buscar(alvo.url, alvo.seletor, alvo.xpath)
+                if valor:
+                    self._decidir(alvo.url, CAMADA_HTTP)
+                    return valor
+                self._decidir(alvo.url, CAMADA_NAVEGADOR)  # Valor renderizado por JavaScript
+            except requests.RequestException as e:
+                logging.warning(f"Falha na busca HTTP de {alvo.url}, usando navegador: {e}")
+            except (etree.LxmlError, SelectorError, ValueError) as e:
+                # Corpo vazio ou só JavaScript, ou localizador que o lxml não avalia: o navegador resolve
+                logging.warning(f"HTML de {alvo.url} não pôde ser lido sem navegador: {e}")
+                self._decidir(alvo.url, CAMADA_NAVEGADOR)
+        return self.navegador(alvo)
@@ -0,0 +1,190 @@
+import json       # Persistência do cache em disco
+import logging    # Registro de logs
+import os         # Escrita atômica do arquivo
+import threading  # Cache compartilhado entre monitores
+import time       # Data de atualização de cada entrada
+from typing import Dict, List, Optional, Tuple
+
+from selenium.webdriver.common.by import By
+
+ARQUIVO_PADRAO = "localizadores.json"
+
+# Gera localizadores candidatos para o elemento, do mais barato/robusto ao mais frágil:
+# atributo data-test, id, XPath curto relativo ao ancestral identificável mais próximo
+# e, por último, o XPath absoluto (mesmo formato de gerar_xpath_completo).
+SCRIPT_CANDIDATOS = """
+function (el) {
+    var escapar = function (s) { return window.CSS && CSS.escape ? CSS.escape(s) : s; };
+    var literal = function (s) { return s.indexOf('"') < 0 ? '"' + s + '"' : "'" + s + "'"; };
+    var unico = function (seletor) {
+        try { return document.querySelectorAll(seletor).length === 1; } catch (e) { return false; }
+    };
+    var passo = function (n) {
+        var pos = 1;
+        for (var s = n.previousElementSibling; s; s = s.previousElementSibling) {
+            if (s.nodeName === n.nodeName) { pos++; }
+        }
+        return n.nodeName.toLowerCase() + '[' + pos + ']';
+    };
+    var ancora = function (n) {
+        var teste = n.getAttribute('data-test');
+        if (teste && unico('[data-test="' + escapar(teste) + '"]')) { return '//*[@data-test=' + literal(teste) + ']'; }
+        if (n.id && unico('#' + escapar(n.id))) { return '//*[@id=' + literal(n.id) + ']'; }
+        return null;
+    };
+
+    var candidatos = [];
+    var teste = el.getAttribute('data-test');
+    if (teste && unico('[data-test="' + escapar(teste) + '"]')) {
+        candidatos.push({tipo: 'css', valor: '[data-test="' + escapar(teste) + '"]'});
+    }
+    if (el.id && unico('#' + escapar(el.id))) {
+        candidatos.push({tipo: 'css', valor: '#' + escapar(el.id)});
+    }
+
+    var relativo = [], absoluto = [], base = null, n;
+    for (n = el; n && n.nodeType === 1; n = n.parentElement) {
+        if (!base && n !== el) { base = ancora(n); }
+        if (!base) { relativo.unshift(passo(n)); }
+        absoluto.unshift(passo(n));
+    }
+    if (base) {
+        candidatos.push({tipo: 'xpath', valor: base + '/' + relativo.join('/'), ancora: base});
+    }
+    candidatos.push({tipo: 'xpath', valor: '/' + absoluto.join('/')});
+    return candidatos;
+}
+"""
+
+# Testa os candidatos em ordem em uma única chamada e devolve [índice, elemento] do primeiro
+# que localiza exatamente um elemento.
+SCRIPT_RESOLVER = """
+function (candidatos) {
+    for (var i = 0; i < candidatos.length; i++) {
+        var c = candidatos[i], el = null;
+        try {
+            if (c.tipo === 'css') {
+                var lista = document.querySelectorAll(c.valor);
+                el = lista.length === 1 ? lista[0] : null;
+            } else {
+                var r = document.evaluate(c.valor, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+                el = r.snapshotLength === 1 ? r.snapshotItem(0) : null;
+            }
+        } catch (e) { el = null; }
+        if (el) { return [i, el]; }
+    }
+    return null;
+}
+"""
+
+
+def _literal_xpath(texto: str) -> str:
+    if "'" not in texto:
+        return f"'{texto}'"
+    if '"' not in texto:
+        return f'"{texto}"'
+    partes = texto.split("'")
+    return "concat(" + ", \"'\", ".join(f"'{parte}'" for parte in partes) + ")"
+
+
+def gerar_candidatos(driver, elemento) -> List[dict]:
+    return driver.execute_script(f"return ({SCRIPT_CANDIDATOS})(arguments[0]);", elemento)
+
+
+def por_candidato(candidato: dict) -> Tuple[str, str]:
+    """
+    Converte um candidato em (By, localizador) para uso com find_element/LeitorPersistente.
+    """
+    return (By.CSS_SELECTOR if candidato["tipo"] == "css" else By.XPATH), candidato["valor"]
+
+
+class CacheLocalizadores:
+    """
+    Cache persistente de localizadores por (URL, valor/rótulo monitorado).
+
+    Cada entrada guarda vários candidatos em ordem de custo; na falha de todos, o elemento
+    é procurado primeiro dentro do ancestral identificável conhecido e só então no DOM inteiro.
+    """
+    def __init__(self, arquivo: Optional[str] = ARQUIVO_PADRAO):
+        self.arquivo = arquivo
+        self.acertos = 0
+        self.falhas = 0
+        self._entradas: Dict[str, Dict[str, dict]] = {}
+        self._trava = threading.Lock()
+        if arquivo and os.path.exists(arquivo):
+            try:
+                with open(arquivo, encoding="utf-8") as f:
+                    self._entradas = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Cache de localizadores ignorado ({arquivo}): {e}")
+
+    @property
+    def taxa_acerto(self) -> float:
+        total = self.acertos + self.falhas
+        return self.acertos / total if total else 0.0
+
+    def estatisticas(self) -> dict:
+        return {"acertos": self.acertos, "falhas": self.falhas, "taxa_acerto": round(self.taxa_acerto, 3)}
+
+    def obter(self, url: str, chave: str) -> Optional[dict]:
+        with self._trava:
+            return self._entradas.get(url, {}).get(chave)
+
+    def guardar(self, url: str, chave: str, candidatos: List[dict], texto: Optional[str] = None):
+        with self._trava:
+            self._entradas.setdefault(url, {})[chave] = {
+                "candidatos": candidatos,
+                "ultimo_texto": texto,
+                "atualizado_em": time.time(),
+            }
+        self.salvar()
+
+    def esquecer(self, url: str, chave: str):
+        with self._trava:
+            self._entradas.get(url, {}).pop(chave, None)
+        self.salvar()
+
+    def salvar(self):
+        if not self.arquivo:
+            return
+        with self._trava:
+            conteudo = json.dumps(self._entradas, ensure_ascii=False, indent=1)
+        temporario = f"{self.arquivo}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            f.write(conteudo)
+        os.replace(temporario, self.arquivo)  # Nunca deixa o cache pela metade
+
+    def _redescobrir(self, driver, entrada: Optional[dict], chave: str):
+        textos = [chave]
+        if entrada and entrada.get("ultimo_texto") and entrada["ultimo_texto"] != chave:
+            textos.append(entrada["ultimo_texto"])
+        ancoras = [c["ancora"] for c in (entrada or {}).get("candidatos", []) if c.get("ancora")]
+        escopos = ancoras + [""]  # "" = documento inteiro, o caminho mais caro
+        for escopo in escopos:
+            for texto in textos:
+                for elemento in driver.find_elements(By.XPATH, f"{escopo}//*[text()={_literal_xpath(texto)}]"):
+                    if elemento.text.strip() == texto:
+                        return elemento
+        return None
+
+    def resolver(self, driver, url: str, chave: str):
+        """
+        Localiza o elemento monitorado na página já carregada.
+        Retorna (elemento, candidatos) ou (None, None) quando ele não pôde ser encontrado.
+        """
+        entrada = self.obter(url, chave)
+        if entrada:
+            resultado = driver.execute_script(f"return ({SCRIPT_RESOLVER})(arguments[0]);", entrada["candidatos"])
+            if resultado:
+                indice, elemento = resultado
+                self.acertos += 1
+                logging.info(f"Localizador em cache reutilizado ({entrada['candidatos'][indice]['valor']}).")
+                return elemento, entrada["candidatos"]
+
+        self.falhas += 1
+        elemento = self._redescobrir(driver, entrada, chave)
+        if elemento is None:
+            return None, None
+        candidatos = gerar_candidatos(driver, elemento)
+        self.guardar(url, chave, candidatos, elemento.text.strip())
+        return elemento, candidatos
@@ -0,0 +1,81 @@
+import time  # Espera pelos campos após carregar a página
+from typing import Dict, Optional, Tuple
+
+# Alvos com vários campos: nome do campo -> localizador. Localizadores que começam com
+# "/" ou "(" (ou com o prefixo "xpath=") são XPath; os demais, seletores CSS.
+Campos = Dict[str, str]
+
+# Lê todos os campos em uma única chamada ao navegador e devolve {nome: texto ou null}
+FUNCAO_EXTRAIR = """
+function (campos) {
+    var resultado = {};
+    for (var nome in campos) {
+        var tipo = campos[nome][0], localizador = campos[nome][1], el = null;
+        try {
+            el = tipo === 'xpath'
+                ? document.evaluate(localizador, document, null,
+                                    XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+                : document.querySelector(localizador);
+        } catch (e) {
+            el = null;
+        }
+        var texto = el ? (el.innerText || el.textContent || '').trim() : '';
+        resultado[nome] = texto || null;
+    }
+    return resultado;
+}
+"""
+
+SCRIPT_SELENIUM = f"return ({FUNCAO_EXTRAIR}).apply(null, arguments);"
+SCRIPT_PLAYWRIGHT = f"(campos) => ({FUNCAO_EXTRAIR})(campos)"
+
+
+def tipo_localizador(localizador: str) -> Tuple[str, str]:
+    """
+    ("xpath" | "css", localizador sem prefixo).
+    """
+    if localizador.startswith("xpath="):
+        return "xpath", localizador[len("xpath="):]
+    if localizador.startswith(("/", "(")):
+        return "xpath", localizador
+    return "css", localizador
+
+
+def _preparar(campos: Campos) -> Dict[str, Tuple[str, str]]:
+    return {nome: tipo_localizador(localizador) for nome, localizador in campos.items()}
+
+
+def extrair_campos_selenium(driver, campos: Campos) -> Dict[str, Optional[str]]:
+    return driver.execute_script(SCRIPT_SELENIUM, _preparar(campos)) or {}
+
+
+async def extrair_campos_playwright(pagina, campos: Campos) -> Dict[str, Optional[str]]:
+    return await pagina.evaluate(SCRIPT_PLAYWRIGHT, _preparar(campos)) or {}
+
+
+def extrair_campos_html(arvore, campos: Campos) -> Dict[str, Optional[str]]:
+    """
+    Mesma extração sobre o HTML estático (árvore do lxml).
+    """
+    from busca_http import extrair_valor
+    resultado = {}
+    for nome, (tipo, localizador) in _preparar(campos).items():
+        try:
+            resultado[nome] = extrair_valor(arvore, xpath=localizador) if tipo == "xpath" \
+                else extrair_valor(arvore, seletor=localizador)
+        except Exception:
+            resultado[nome] = None  # Localizador inválido não derruba os demais campos
+    return resultado
+
+
+def aguardar_campos_selenium(driver, campos: Campos, timeout: float = 20,
+                             intervalo: float = 0.25) -> Dict[str, Optional[str]]:
+    """
+    Repete a extração até algum campo aparecer (página ainda renderizando) ou o tempo acabar.
+    """
+    limite = time.monotonic() + timeout
+    while True:
+        valores = extrair_campos_selenium(driver, campos)
+        if any(valores.values()) or time.monotonic() >= limite:
+            return valores
+        time.sleep(intervalo)
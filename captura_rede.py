@@ -0,0 +1,246 @@
+"""
+Captura do valor direto do tráfego da página (frames de WebSocket e respostas XHR/fetch),
+em vez de ler o texto renderizado: cada tick chega com a latência da rede, sem leituras
+de layout. O alvo declara um `FiltroRede`:
+
+    rede = { url = "stream.investing.com", contem = "pid-1057391", caminho = "0.message.last" }
+
+- url: trecho da URL do WebSocket ou da requisição;
+- contem: trecho que o frame precisa conter (testado antes de decodificar qualquer JSON);
+- caminho: chaves e índices separados por ponto até o valor. Textos no meio do caminho
+  que contêm JSON (SockJS `a["..."]`, `pid-1::{...}`) são decodificados ao atravessá-los.
+
+Cada frame é decodificado sozinho, assim que chega, e só o trecho do caminho é percorrido.
+Quando nenhum frame casa (ou o último é antigo demais), quem lê volta ao localizador do DOM.
+"""
+import base64   # Corpos de resposta binários (CDP)
+import json     # Decodificação dos frames
+import logging  # Registro de logs
+import time     # Idade do último valor capturado
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+from metricas import METRICAS
+
+Rede = Union[None, Dict[str, Any], "FiltroRede"]
+
+_CHAVES = {"url", "contem", "caminho", "validade"}
+
+
+class FiltroRede:
+    """
+    Quais frames/respostas carregam o valor e onde ele está dentro deles.
+    `validade`: segundos que o último valor capturado vale sem um frame novo.
+    """
+    def __init__(self, caminho: str, url: Optional[str] = None, contem: Optional[str] = None,
+                 validade: float = 60.0):
+        if not caminho:
+            raise ValueError("'rede' precisa de um 'caminho' até o valor.")
+        self.caminho = caminho
+        self.url = url
+        self.contem = contem
+        self.validade = validade
+        self._passos: List[Union[str, int]] = [int(p) if p.lstrip("-").isdigit() else p
+                                               for p in caminho.replace("[", ".").replace("]", "").split(".") if p]
+
+    def casa_url(self, url: str) -> bool:
+        return not self.url or self.url in url
+
+    def extrair(self, payload: Union[str, bytes]) -> Optional[str]:
+        """
+        Valor do frame, ou None se ele não casa com o filtro ou não tem o caminho.
+        """
+        if isinstance(payload, bytes):
+            payload = payload.decode("utf-8", "replace")
+        if self.contem and self.contem not in payload:
+            return None  # A maioria dos frames para aqui, sem nenhum json.loads
+        atual: Any = payload
+        for passo in self._passos:
+            if isinstance(atual, str):
+                atual = _decodificar(atual)
+            try:
+                atual = atual[str(passo)] if isinstance(atual, dict) else atual[passo]  # "0" também é chave de objeto
+            except (KeyError, IndexError, TypeError):
+                return None
+        if isinstance(atual, str):
+            return atual.strip() or None
+        if isinstance(atual, (int, float)) and not isinstance(atual, bool):
+            return str(atual)
+        return None
+
+    def __eq__(self, outro):
+        return isinstance(outro, FiltroRede) and \
+            (self.caminho, self.url, self.contem, self.validade) == (outro.caminho, outro.url, outro.contem, outro.validade)
+
+    def __hash__(self):
+        return hash((self.caminho, self.url, self.contem, self.validade))
+
+    def __repr__(self):
+        return f"FiltroRede(url={self.url!r}, contem={self.contem!r}, caminho={self.caminho!r})"
+
+
+def _decodificar(texto: str) -> Any:
+    """
+    JSON contido no texto a partir do primeiro '{' ou '[' (ignora prefixos como `a`, `42` ou `pid-1::`).
+    """
+    inicio = min((i for i in (texto.find("{"), texto.find("[")) if i >= 0), default=-1)
+    if inicio < 0:
+        return None
+    try:
+        return json.loads(texto[inicio:])
+    except ValueError:
+        try:  # Lixo depois do JSON (ex: vários objetos no mesmo frame): fica com o primeiro
+            return json.JSONDecoder().raw_decode(texto[inicio:])[0]
+        except ValueError:
+            return None
+
+
+def filtro_rede(rede: Rede) -> Optional[FiltroRede]:
+    """
+    Converte o mapa `rede` da configuração (ou None) em um FiltroRede.
+    """
+    if rede is None or isinstance(rede, FiltroRede):
+        return rede
+    if not isinstance(rede, dict):
+        raise ValueError("'rede' deve ser um mapa com url, contem e caminho.")
+    desconhecidas = set(rede) - _CHAVES
+    if desconhecidas:
+        raise ValueError(f"Chave(s) desconhecida(s) em 'rede': {', '.join(sorted(desconhecidas))}.")
+    return FiltroRede(rede.get("caminho", ""), rede.get("url"), rede.get("contem"), rede.get("validade", 60.0))
+
+
+class _Captura:
+    """
+    Último valor capturado e quando ele chegou; `ao_receber(valor)` é chamado a cada tick.
+    """
+    def __init__(self, filtro: FiltroRede, ao_receber: Optional[Callable[[str], None]] = None):
+        self.filtro = filtro
+        self.ao_receber = ao_receber
+        self.valor: Optional[str] = None
+        self.recebido_em: Optional[float] = None
+        self.ticks = 0
+
+    def recente(self) -> Optional[str]:
+        """
+        Último valor, se chegou há menos de `validade` segundos; senão None (ler o DOM).
+        """
+        if self.recebido_em is None or time.monotonic() - self.recebido_em > self.filtro.validade:
+            return None
+        return self.valor
+
+    def receber(self, url: str, payload: Union[str, bytes], origem: str):
+        if not self.filtro.casa_url(url):
+            return
+        try:
+            valor = self.filtro.extrair(payload)
+        except Exception as e:
+            logging.debug(f"Frame de {url} não decodificado: {e}")
+            return
+        if valor is None:
+            return
+        self.valor, self.recebido_em = valor, time.monotonic()
+        self.ticks += 1
+        METRICAS.incrementar("ticks_rede_total", 1, "Valores capturados do tráfego da página", origem=origem)
+        if self.ao_receber:
+            try:
+                self.ao_receber(valor)
+            except Exception as e:
+                logging.error(f"Erro ao repassar valor capturado da rede: {e}")
+
+
+# ---------- Playwright (assíncrono) ----------
+
+class CapturaPlaywright(_Captura):
+    """
+    Escuta os WebSockets (`page.on("websocket")`) e as respostas XHR/fetch da página.
+    Deve ser instalada antes do `goto`, para pegar as conexões abertas no carregamento.
+    """
+    def instalar(self, pagina):
+        pagina.on("websocket", self._websocket)
+        pagina.on("response", self._resposta)
+
+    def _websocket(self, websocket):
+        if self.filtro.casa_url(websocket.url):
+            websocket.on("framereceived", lambda payload: self.receber(websocket.url, payload, "websocket"))
+
+    async def _resposta(self, resposta):
+        if resposta.request.resource_type not in ("xhr", "fetch") or not self.filtro.casa_url(resposta.url):
+            return
+        try:
+            texto = await resposta.text()
+        except Exception:  # Página fechada ou corpo indisponível (redirecionamento)
+            return
+        self.receber(resposta.url, texto, "resposta")
+
+
+# ---------- Selenium (log de desempenho do Chrome) ----------
+
+def habilitar_log_rede(options):
+    """
+    Liga o log de desempenho (eventos Network do CDP) nas opções do Chrome; sem isso
+    o Selenium não recebe os frames. O log acumula até ser lido por `CapturaSelenium`.
+    """
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+    options.add_experimental_option("perfLoggingPrefs", {"enableNetwork": True, "enablePage": False})
+    return options
+
+
+class CapturaSelenium(_Captura):
+    """
+    Lê os frames de WebSocket e as respostas XHR/fetch do log de desempenho do Chrome.
+    A cada `coletar()`, tudo o que chegou desde a chamada anterior é decodificado em ordem.
+    """
+    def __init__(self, driver, filtro: FiltroRede, ao_receber: Optional[Callable[[str], None]] = None):
+        super().__init__(filtro, ao_receber)
+        self.driver = driver
+        self._respostas: Dict[str, str] = {}  # requestId -> URL das respostas que casam, até terminarem
+        self._sockets: Dict[str, str] = {}    # requestId -> URL dos WebSockets
+
+    def coletar(self) -> Optional[str]:
+        """
+        Processa o log pendente e retorna o valor recente (ou None, para ler o DOM).
+        """
+        try:
+            entradas = self.driver.get_log("performance")
+        except Exception as e:  # Driver criado sem `habilitar_log_rede`
+            logging.debug(f"Log de desempenho indisponível: {e}")
+            return None
+        for entrada in entradas:
+            mensagem = entrada.get("message", "")
+            if "Network.webSocket" not in mensagem and "Network.response" not in mensagem \
+                    and "Network.loadingFinished" not in mensagem:
+                continue
+            metodo, parametros = self._evento(mensagem)
+            self._tratar(metodo, parametros)
+        return self.recente()
+
+    @staticmethod
+    def _evento(mensagem: str) -> Tuple[str, Dict[str, Any]]:
+        try:
+            evento = json.loads(mensagem)["message"]
+            return evento.get("method", ""), evento.get("params", {})
+        except (ValueError, KeyError, TypeError):
+            return "", {}
+
+    def _tratar(self, metodo: str, parametros: Dict[str, Any]):
+        id_requisicao = parametros.get("requestId")
+        if metodo == "Network.webSocketCreated":
+            self._sockets[id_requisicao] = parametros.get("url", "")
+        elif metodo == "Network.webSocketFrameReceived":
+            url = self._sockets.get(id_requisicao, "")
+            self.receber(url, parametros.get("response", {}).get("payloadData", ""), "websocket")
+        elif metodo == "Network.webSocketClosed":
+            self._sockets.pop(id_requisicao, None)
+        elif metodo == "Network.responseReceived":
+            url = parametros.get("response", {}).get("url", "")
+            if parametros.get("type") in ("XHR", "Fetch") and self.filtro.casa_url(url):
+                self._respostas[id_requisicao] = url
+        elif metodo == "Network.loadingFinished" and id_requisicao in self._respostas:
+            url = self._respostas.pop(id_requisicao)
+            try:
+                corpo = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": id_requisicao})
+            except Exception:  # Corpo já descartado pelo navegador
+                return
+            texto = corpo.get("body", "")
+            if corpo.get("base64Encoded"):
+                texto = base64.b64decode(texto).decode("utf-8", "replace")
+            self.receber(url, texto, "resposta")
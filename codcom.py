@@ -1,21 +1,16 @@
 # Importa bibliotecas padrão do Python
-import re                 # Para trabalhar com expressões regulares
 import time               # Para criar pausas no código (sleep)
 import logging            # Para registrar logs (mensagens informativas, de erro etc.)
 from typing import Optional  # Para anotar tipos opcionais nas funções
 from playwright.sync_api import sync_playwright  # Importa o Playwright para automação de navegador (modo síncrono)
+from numeros import interpretar_numero  # Converte o texto da página em número (formatos pt_BR, en_US, K/M...)
+from config_log import configurar_log  # Configuração central de logs
+from bloqueio_recursos import PERFIS, aplicar_playwright_sync  # Bloqueio de recursos pesados
 
 
 
-# Define a configuração do sistema de log
-logging.basicConfig(
-    level=logging.INFO,  # Nível de log: mostra informações, alertas e erros
-    format='%(asctime)s - %(levelname)s - %(message)s',  # Formato da mensagem
-    handlers=[
-        logging.FileHandler("log_sistema.txt"),  # Salva os logs no arquivo
-        logging.StreamHandler()                  # Também mostra no terminal
-    ]
-)
+# A configuração do sistema de log (arquivo + terminal, escrita em segundo plano)
+# é feita por config_log.configurar_log ao executar o script
 
 
 
@@ -35,13 +30,10 @@ def solicitar_usuario() -> str:
 
 
 def solicitar_numero_alvo() -> str:
-    padrao = r'^-?\d+(?:[\.,]\d+)?$'  # Regex para validar números inteiros ou decimais com ponto ou vírgula
-
     while True:
         entrada = input("Digite o número que deseja monitorar (ex: 5,718 ou -3,14): ").strip()
-        entrada_normalizada = entrada.replace(".", "").replace(",", ".")  # Normaliza o número (ex: 1.234,56 → 1234.56)
 
-        if re.match(padrao, entrada_normalizada):  # Verifica se o número é válido com regex
+        if interpretar_numero(entrada) is not None:  # Verifica se há um número válido (ex: 1.234,56 → 1234.56)
             logging.info(f"Número alvo definido para monitoramento: {entrada}")
             return entrada
         else:
@@ -53,17 +45,19 @@ def monitorar_em_tempo_real(url: str, numero_alvo: str):
     with sync_playwright() as p:
         navegador = p.chromium.launch(headless=True)  # Abre o navegador Chromium de forma invisível
         pagina = navegador.new_page()                 # Cria uma nova aba/página
+        aplicar_playwright_sync(pagina, PERFIS["padrao"])  # Não carrega imagens, fontes, anúncios e rastreadores
         pagina.goto(url, timeout=60000)               # Acessa a URL com timeout de 60 segundos
 
         logging.info("Iniciando monitoramento em tempo real...")
+        alvo = interpretar_numero(numero_alvo)  # Converte o número alvo uma única vez
 
         while True:
             try:
                 # Localiza o valor do índice usando o seletor com atributo data-test="instrument-price-last"
                 valor = pagina.locator('[data-test="instrument-price-last"]').inner_text(timeout=10000).strip()
 
-                # Verifica se o valor atual contém o número alvo
-                if numero_alvo in valor:
+                # Compara os números, e não os textos (134.580,43 e 134,580.43 são o mesmo valor)
+                if interpretar_numero(valor) == alvo:
                     logging.info(f"Valor atual corresponde ao número monitorado ({numero_alvo}): {valor}")
                 else:
                     logging.info(f"Valor atual: {valor} (número alvo: {numero_alvo})")
@@ -92,4 +86,5 @@ def main():
 
 
 if __name__ == "__main__":
+    configurar_log("log_sistema.txt")  # Salva os logs no arquivo e também mostra no terminal
     main()  # Roda o programa se o arquivo for executado diretamente
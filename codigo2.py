@@ -1,18 +1,20 @@
-import re
+import asyncio
 import time
 import logging
 from typing import Optional
 from playwright.sync_api import sync_playwright
+from pool_navegadores import PoolNavegadores
+from pagina_persistente import PoliticaRecarga
+from observador_mutacao import ObservadorPlaywright
+from numeros import interpretar_numero
+from config_log import configurar_log
+from agendador import Agendador, Alvo, IntervaloAdaptativo
+from backends import criar_backend_playwright
+from resiliencia import Backoff
+from bloqueio_recursos import PERFIS, aplicar_playwright_sync
 
 # === CONFIGURAÇÃO DE LOG ===
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("log_sistema.txt"),
-        logging.StreamHandler()
-    ]
-)
+# Feita em config_log.configurar_log ao executar o script
 
 # Valida se o nome inserido é aceitável (mínimo 3 letras e apenas caracteres alfabéticos)
 def validar_nome_usuario(nome: str) -> bool:
@@ -30,44 +32,138 @@ def solicitar_usuario() -> str:
 
 # Solicita e valida o número a ser monitorado (como string, mantendo formatação)
 def solicitar_numero_alvo() -> str:
-    padrao = r'^-?\d+(?:[\.,]\d+)?$'
     while True:
         entrada = input("Digite o número que deseja monitorar (ex: 5,718 ou -3,14): ").strip()
-        entrada_normalizada = entrada.replace(".", "").replace(",", ".")
-        if re.match(padrao, entrada_normalizada):
+        if interpretar_numero(entrada) is not None:
             logging.info(f"Número alvo definido para monitoramento: {entrada}")
-            return entrada_normalizada  # Retorna já em formato com ponto
+            return entrada
         else:
             print("Número inválido. Exemplo de formatos válidos: -10, 20.5, 3,1415")
 
-# Função principal que monitora o valor em tempo real usando o Playwright
-def monitorar_em_tempo_real(url: str, numero_alvo: str):
-    with sync_playwright() as p:
-        navegador = p.chromium.launch(headless=True)
-        pagina = navegador.new_page()
-        pagina.goto(url, timeout=60000)
+# Função principal que monitora o valor em tempo real usando o Playwright.
+# Com `pool` (ver pool_navegadores.pool_paginas_playwright), a página é emprestada
+# de um Chromium já aberto em vez de iniciar um navegador novo.
+# Com `push`, o valor é recebido por MutationObserver em vez de lido a cada segundo.
+def monitorar_em_tempo_real(url: str, numero_alvo: str, pool: Optional[PoolNavegadores] = None,
+                            politica: Optional[PoliticaRecarga] = None, push: bool = False):
+    def acompanhar(pagina):
+        if push:
+            acompanhar_pagina_por_mutacao(pagina, numero_alvo)
+        else:
+            acompanhar_pagina(pagina, numero_alvo, politica)
+
+    # Se a página ou o navegador morrer, tudo é recriado com espera crescente entre tentativas
+    backoff = Backoff(inicial=2, maximo=120)
+    while True:
+        try:
+            if pool:
+                with pool.emprestar() as pagina:  # Página defeituosa é descartada pelo pool
+                    pagina.goto(url, timeout=60000)
+                    acompanhar(pagina)
+            else:
+                with sync_playwright() as p:
+                    navegador = p.chromium.launch(headless=True)
+                    try:
+                        pagina = navegador.new_page()
+                        aplicar_playwright_sync(pagina, PERFIS["padrao"])  # Sem imagens, fontes, anúncios e rastreadores
+                        pagina.goto(url, timeout=60000)
+                        acompanhar(pagina)
+                    finally:
+                        try:
+                            navegador.close()
+                        except Exception:
+                            pass  # Navegador já encerrado
+        except KeyboardInterrupt:
+            raise
+        except Exception as e:
+            espera = backoff.proxima()
+            logging.error(f"Navegador falhou ({e}); recriando em {espera:.0f}s.")
+            time.sleep(espera)
+
+# Versão assíncrona para várias URLs: cada uma é só uma página do mesmo Chromium
+# (distribuídas entre `contextos` contextos), lidas pelo Agendador em um único loop com
+# no máximo `max_concorrencia` leituras simultâneas. O ritmo é o de `acompanhar_pagina`:
+# a cada segundo enquanto o preço se mexe, até `intervalo_max` quando fica parado.
+async def monitorar_varios_em_tempo_real(urls, numero_alvo: str, contextos: int = 4,
+                                         max_concorrencia: int = 10, intervalo_max: float = 30):
+    backend = criar_backend_playwright({"contextos": contextos, "max_concorrencia": max_concorrencia})
+    agendador = Agendador(backend.buscar, max_concorrencia=max_concorrencia, intervalo_min=1,
+                          intervalo_max=intervalo_max)
+    for indice, url in enumerate(urls):
+        agendador.adicionar(Alvo(f"pagina{indice + 1}", url, seletor='[data-test="instrument-price-last"]',
+                                 intervalo=1, intervalo_max=intervalo_max))
+    agendador.ao_alterar(lambda evento: registrar_valor(evento.valor_atual, numero_alvo))
+    logging.info(f"Iniciando monitoramento em tempo real de {len(urls)} página(s)...")
+    try:
+        await agendador.executar()
+    finally:
+        await backend.encerrar()
+
+# Converte o texto do elemento em número e registra se é igual ao número alvo
+def registrar_valor(valor_bruto: str, numero_alvo: str):
+    valor = interpretar_numero(valor_bruto)
+    if valor is None:
+        logging.warning(f"Valor sem número reconhecível: {valor_bruto!r}")
+        return None
 
-        logging.info("Iniciando monitoramento em tempo real...")
+    # Mostra apenas o número normalizado no log
+    if valor == interpretar_numero(numero_alvo):
+        logging.info(f"{valor} ← Número alvo encontrado!")
+    else:
+        logging.info(f"{valor}")
+    return valor
 
-        while True:
-            try:
-                # Captura o valor bruto do HTML
-                valor_bruto = pagina.locator('[data-test="instrument-price-last"]').inner_text(timeout=10000).strip()
+# Recebe cada mudança do elemento via MutationObserver; sem mudança, não há chamadas à página
+def acompanhar_pagina_por_mutacao(pagina, numero_alvo: str):
+    observador = ObservadorPlaywright(pagina, seletor='[data-test="instrument-price-last"]')
+    observador.instalar()
+    logging.info("Iniciando monitoramento por MutationObserver...")
+    backoff = Backoff(inicial=2, maximo=60)  # Espera crescente entre recargas seguidas que falham
 
-                # Remove caracteres indesejados e normaliza para ponto decimal
-                valor_limpo = re.sub(r'[^\d,.-]', '', valor_bruto)
-                valor_formatado = valor_limpo.replace('.', '').replace(',', '.')
+    while True:
+        try:
+            for valor_bruto, _ in observador.mudancas(timeout=30):
+                registrar_valor(valor_bruto, numero_alvo)
+        except Exception as e:
+            if pagina.is_closed():
+                raise  # Página ou navegador morreu: quem chamou recria
+            espera = backoff.proxima()
+            logging.error(f"Erro ao observar valor ao vivo: {e}; recarregando em {espera:.0f}s")
+            time.sleep(espera)
+            pagina.reload(timeout=60000)
+            observador.instalar()
+
+# Lê o valor de uma página já carregada, a cada segundo enquanto o preço se mexe e com espera
+# crescente (até `intervalo_max`) quando fica parado; recarrega só quando a política exigir
+def acompanhar_pagina(pagina, numero_alvo: str, politica: Optional[PoliticaRecarga] = None,
+                      intervalo_max: float = 30):
+    politica = politica or PoliticaRecarga(erros_para_recarregar=3)
+    ritmo = IntervaloAdaptativo(1, minimo=1, maximo=intervalo_max)
+    anterior = None
+    leituras, erros_seguidos, carregada_em = 0, 0, time.monotonic()
+    logging.info("Iniciando monitoramento em tempo real...")
+
+    while True:
+        try:
+            if politica.deve_recarregar(leituras, erros_seguidos, time.monotonic() - carregada_em):
+                logging.info("Recarregando a página monitorada...")
+                pagina.reload(timeout=60000)
+                leituras, erros_seguidos, carregada_em = 0, 0, time.monotonic()
 
-                # Mostra apenas o número limpo no log
-                if numero_alvo in valor_formatado:
-                    logging.info(f"{valor_formatado} ← Número alvo encontrado!")
-                else:
-                    logging.info(f"{valor_formatado}")
+            # Captura o valor bruto do HTML
+            valor_bruto = pagina.locator('[data-test="instrument-price-last"]').inner_text(timeout=10000).strip()
+            valor = registrar_valor(valor_bruto, numero_alvo)
 
-                time.sleep(1)  # Atualiza a cada 1 segundo (como o site)
-            except Exception as e:
-                logging.error(f"Erro ao buscar valor ao vivo: {e}")
-                time.sleep(5)
+            leituras += 1
+            erros_seguidos = 0
+            time.sleep(ritmo.registrar(valor is not None and valor != anterior, erro=valor is None))
+            anterior = valor if valor is not None else anterior
+        except Exception as e:
+            if pagina.is_closed():
+                raise  # Página ou navegador morreu: quem chamou recria
+            erros_seguidos += 1
+            logging.error(f"Erro ao buscar valor ao vivo: {e}")
+            time.sleep(ritmo.registrar(False, erro=True))
 
 # Função principal do programa
 def main():
@@ -75,16 +171,20 @@ def main():
     usuario = solicitar_usuario()
 
     while True:
-        url = input("Digite a URL que deseja monitorar: ").strip()
-        if url.startswith("http://") or url.startswith("https://"):
+        urls = input("Digite a URL que deseja monitorar (várias separadas por espaço): ").split()
+        if urls and all(url.startswith("http://") or url.startswith("https://") for url in urls):
             break
         else:
             print("URL inválida. Deve começar com http:// ou https://")
 
     numero_alvo = solicitar_numero_alvo()
-    logging.info(f"Usuário '{usuario}' iniciou o monitoramento da URL: {url}")
-    monitorar_em_tempo_real(url, numero_alvo)
+    logging.info(f"Usuário '{usuario}' iniciou o monitoramento da(s) URL(s): {', '.join(urls)}")
+    if len(urls) == 1:
+        monitorar_em_tempo_real(urls[0], numero_alvo)
+    else:  # Várias páginas no mesmo navegador e no mesmo loop, sem uma thread por URL
+        asyncio.run(monitorar_varios_em_tempo_real(urls, numero_alvo))
 
 # Executa o programa se for chamado diretamente
 if __name__ == "__main__":
+    configurar_log("log_sistema.txt")
     main()
@@ -0,0 +1,202 @@
+import atexit     # Esvazia a fila de logs ao encerrar
+import json       # Saída estruturada
+import logging    # Registro de logs
+import logging.handlers
+import os         # Nomes dos arquivos rotacionados
+import queue      # Fila entre as threads de monitoramento e o escritor
+import sys        # Saída no terminal
+import threading  # Contadores do filtro de ruído
+import time       # Janelas de limite de taxa
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+FORMATO_PADRAO = "%(asctime)s - %(levelname)s - %(message)s"
+FORMATO_VALORES = "%(asctime)s - %(message)s"
+
+# Mensagens repetitivas limitadas por padrão: (máximo de registros, período em segundos)
+LIMITES_PADRAO: Dict[str, Tuple[int, float]] = {
+    "Nenhuma alteração detectada": (1, 300),
+}
+
+_ouvinte: Optional[logging.handlers.QueueListener] = None
+
+
+class FormatadorJSON(logging.Formatter):
+    """
+    Uma linha JSON por registro.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        dados = {
+            "instante": datetime.fromtimestamp(record.created).isoformat(timespec="milliseconds"),
+            "nivel": record.levelname,
+            "logger": record.name,
+            "mensagem": record.getMessage(),
+        }
+        if record.exc_info:
+            dados["excecao"] = self.formatException(record.exc_info)
+        return json.dumps(dados, ensure_ascii=False)
+
+
+class FiltroRuido(logging.Filter):
+    """
+    Reduz mensagens repetitivas antes de entrarem na fila. Avisos e erros nunca são descartados.
+
+    - amostragem: nome do logger -> mantém 1 a cada N registros;
+    - limites: início da mensagem -> (máximo, período em segundos). Ao reabrir a janela,
+      o registro seguinte informa quantos foram suprimidos.
+    """
+    def __init__(self, amostragem: Optional[Dict[str, int]] = None,
+                 limites: Optional[Dict[str, Tuple[int, float]]] = None):
+        super().__init__()
+        self.amostragem = amostragem or {}
+        self.limites = LIMITES_PADRAO if limites is None else limites
+        self._contagens: Dict[str, int] = {}
+        self._janelas: Dict[str, list] = {}  # prefixo -> [início, emitidos, suprimidos]
+        self._trava = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        with self._trava:
+            passo = self.amostragem.get(record.name)
+            if passo and passo > 1:
+                contagem = self._contagens[record.name] = self._contagens.get(record.name, 0) + 1
+                if contagem % passo != 1:
+                    return False
+
+            if not self.limites:
+                return True
+            mensagem = record.getMessage()
+            for prefixo, (maximo, periodo) in self.limites.items():
+                if not mensagem.startswith(prefixo):
+                    continue
+                agora = time.monotonic()
+                janela = self._janelas.get(prefixo)
+                if janela is None or agora - janela[0] >= periodo:
+                    suprimidos = janela[2] if janela else 0
+                    self._janelas[prefixo] = [agora, 1, 0]
+                    if suprimidos:
+                        record.msg, record.args = f"{mensagem} (+{suprimidos} suprimida(s))", None
+                    return True
+                if janela[1] < maximo:
+                    janela[1] += 1
+                    return True
+                janela[2] += 1
+                return False
+        return True
+
+
+class _FiltroNomes(logging.Filter):
+    """
+    Encaminha ao handler apenas os registros dos loggers indicados (ou todos, exceto eles).
+    """
+    def __init__(self, nomes, incluir: bool):
+        super().__init__()
+        self.nomes = set(nomes)
+        self.incluir = incluir
+
+    def filter(self, record):
+        return (record.name in self.nomes) == self.incluir
+
+
+class ArquivoRotativo(logging.handlers.TimedRotatingFileHandler):
+    """
+    Rotaciona por tempo (`quando`, ex: "midnight") e também ao atingir `max_bytes`.
+    """
+    def __init__(self, arquivo: str, max_bytes: int = 10 * 1024 * 1024, quando: str = "midnight",
+                 backups: int = 7):
+        super().__init__(arquivo, when=quando, backupCount=backups, encoding="utf-8", delay=True)
+        self.max_bytes = max_bytes
+        self.namer = self._nome_livre
+
+    @staticmethod
+    def _nome_livre(nome: str) -> str:
+        # Várias rotações por tamanho no mesmo período não podem sobrescrever umas às outras
+        candidato, sequencia = nome, 1
+        while os.path.exists(candidato):
+            candidato, sequencia = f"{nome}.{sequencia}", sequencia + 1
+        return candidato
+
+    def shouldRollover(self, record) -> int:
+        if super().shouldRollover(record):
+            return 1
+        if self.max_bytes:
+            if self.stream is None:
+                self.stream = self._open()
+            if self.stream.tell() + len(self.format(record)) + 1 >= self.max_bytes:
+                return 1
+        return 0
+
+
+def configurar_log(arquivo: str = "monitoramento.log", nivel: int = logging.INFO, terminal: bool = True,
+                   formato_json: bool = False, max_bytes: int = 10 * 1024 * 1024, quando: str = "midnight",
+                   backups: int = 7, loggers_dedicados: Optional[Dict[str, str]] = None,
+                   amostragem: Optional[Dict[str, int]] = None,
+                   limites: Optional[Dict[str, Tuple[int, float]]] = None) -> logging.handlers.QueueListener:
+    """
+    Configura o logging de todo o processo: os módulos só enfileiram registros
+    (QueueHandler) e uma thread em segundo plano (QueueListener) escreve nos arquivos
+    rotativos e no terminal.
+
+    `loggers_dedicados` mapeia nome de logger -> arquivo próprio (ex: log de valores),
+    sem propagação para o log geral. Chamadas repetidas reutilizam a configuração existente.
+    """
+    global _ouvinte
+    if _ouvinte is not None:
+        return _ouvinte
+
+    dedicados = loggers_dedicados or {}
+    formatador = FormatadorJSON() if formato_json else logging.Formatter(FORMATO_PADRAO)
+
+    geral = ArquivoRotativo(arquivo, max_bytes, quando, backups)
+    geral.setFormatter(formatador)
+    geral.addFilter(_FiltroNomes(dedicados, incluir=False))
+    handlers = [geral]
+    if terminal:
+        tela = logging.StreamHandler(sys.stdout)
+        tela.setFormatter(formatador)
+        tela.addFilter(_FiltroNomes(dedicados, incluir=False))
+        handlers.append(tela)
+    for nome, caminho in dedicados.items():
+        dedicado = ArquivoRotativo(caminho, max_bytes, quando, backups)
+        dedicado.setFormatter(FormatadorJSON() if formato_json else logging.Formatter(FORMATO_VALORES))
+        dedicado.addFilter(_FiltroNomes([nome], incluir=True))
+        handlers.append(dedicado)
+
+    fila: queue.Queue = queue.Queue(-1)
+    ruido = FiltroRuido(amostragem, limites)
+
+    def enfileirador() -> logging.handlers.QueueHandler:
+        handler = logging.handlers.QueueHandler(fila)
+        handler.addFilter(ruido)
+        return handler
+
+    raiz = logging.getLogger()
+    for antigo in list(raiz.handlers):
+        raiz.removeHandler(antigo)
+    raiz.addHandler(enfileirador())
+    raiz.setLevel(nivel)
+    for nome in dedicados:
+        logger = logging.getLogger(nome)
+        logger.handlers.clear()
+        logger.addHandler(enfileirador())
+        logger.setLevel(nivel)
+        logger.propagate = False
+
+    _ouvinte = logging.handlers.QueueListener(fila, *handlers, respect_handler_level=True)
+    _ouvinte.start()
+    atexit.register(encerrar_log)
+    return _ouvinte
+
+
+def encerrar_log():
+    """
+    Esvazia a fila e fecha os arquivos de log.
+    """
+    global _ouvinte
+    if _ouvinte is None:
+        return
+    _ouvinte.stop()
+    for handler in _ouvinte.handlers:
+        handler.close()
+    _ouvinte = None
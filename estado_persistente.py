@@ -0,0 +1,118 @@
+import asyncio    # Descarga periódica fora do loop
+import json       # Estado de cada chave
+import logging    # Registro de logs
+import sqlite3    # Banco embutido (modo WAL)
+import threading  # Gravações vindas de várias threads
+import time       # Intervalo entre gravações
+from typing import Any, Dict, Optional
+
+
+class EstadoPersistente:
+    """
+    Último estado conhecido de cada monitor (último valor, localizador resolvido,
+    estatísticas de intervalo, próxima checagem) em um SQLite em modo WAL.
+
+    As gravações são acumuladas em memória (só a versão mais recente de cada chave) e
+    descarregadas em uma única transação por quem usa o estado: em código assíncrono,
+    `descarregar_periodicamente()` grava a cada `intervalo_gravacao` segundos em uma thread;
+    em laços síncronos, `descarregar_se_preciso()` após cada gravação. Uma queda perde no
+    máximo esse intervalo, nunca corrompe o arquivo, e vários processos podem usar o mesmo banco.
+    """
+    def __init__(self, caminho: str = "estado.sqlite3", intervalo_gravacao: float = 5.0):
+        self.caminho = caminho
+        self.intervalo_gravacao = intervalo_gravacao
+        self._trava = threading.Lock()  # Só para os dicionários em memória: nunca fica presa durante o SQLite
+        self._trava_conexao = threading.Lock()  # Uma transação (ou leitura) por vez na conexão
+        self._pendentes: Dict[str, Optional[str]] = {}  # None = remover
+        self._gravando: Dict[str, Optional[str]] = {}  # Lote sendo descarregado, ainda visível para `ler`
+        self._ultima_gravacao = time.monotonic()
+        self._conexao = sqlite3.connect(caminho, timeout=30, check_same_thread=False)
+        self._conexao.execute("PRAGMA journal_mode=WAL")
+        self._conexao.execute("PRAGMA synchronous=NORMAL")  # Com WAL, seguro contra queda do processo
+        self._conexao.execute(
+            "CREATE TABLE IF NOT EXISTS estado (chave TEXT PRIMARY KEY, dados TEXT NOT NULL, atualizado_em REAL NOT NULL)"
+        )
+        self._conexao.commit()
+
+    def ler(self, chave: str) -> Optional[Dict[str, Any]]:
+        with self._trava:
+            em_memoria = chave in self._pendentes or chave in self._gravando
+            dados = self._pendentes[chave] if chave in self._pendentes else self._gravando.get(chave)
+        if not em_memoria:
+            with self._trava_conexao:
+                linha = self._conexao.execute("SELECT dados FROM estado WHERE chave = ?", (chave,)).fetchone()
+            dados = linha[0] if linha else None
+        if dados is None:
+            return None
+        try:
+            return json.loads(dados)
+        except ValueError:
+            logging.warning(f"Estado salvo de '{chave}' ilegível; ignorado.")
+            return None
+
+    def gravar(self, chave: str, dados: Dict[str, Any]):
+        """
+        Agenda a gravação de `dados` (serializáveis em JSON) para a chave.
+        """
+        texto = json.dumps(dados, ensure_ascii=False)
+        with self._trava:
+            self._pendentes[chave] = texto
+
+    def remover(self, chave: str):
+        with self._trava:
+            self._pendentes[chave] = None
+
+    def descarregar_se_preciso(self):
+        """
+        Descarrega se a última gravação tem mais de `intervalo_gravacao` segundos (laços síncronos).
+        """
+        if time.monotonic() - self._ultima_gravacao >= self.intervalo_gravacao:
+            self.descarregar()
+
+    async def descarregar_periodicamente(self):
+        """
+        Descarrega a cada `intervalo_gravacao` segundos até ser cancelada; a transação
+        (que pode esperar até 30s pelo banco) roda em uma thread, fora do loop.
+        """
+        while True:
+            await asyncio.sleep(self.intervalo_gravacao)
+            await asyncio.to_thread(self.descarregar)
+
+    def descarregar(self):
+        """
+        Grava todas as alterações pendentes em uma única transação. O lote sai de `_pendentes`
+        sob a trava curta; a transação (que pode esperar o banco) roda fora dela, então
+        `gravar` e `ler` não esperam pelo SQLite.
+        """
+        with self._trava_conexao:
+            with self._trava:
+                pendentes, self._pendentes = self._pendentes, {}
+                self._gravando = pendentes
+                self._ultima_gravacao = time.monotonic()
+            if not pendentes:
+                return
+            agora = time.time()
+            try:
+                with self._conexao:
+                    self._conexao.executemany(
+                        "INSERT INTO estado (chave, dados, atualizado_em) VALUES (?, ?, ?) "
+                        "ON CONFLICT(chave) DO UPDATE SET dados = excluded.dados, atualizado_em = excluded.atualizado_em",
+                        [(chave, dados, agora) for chave, dados in pendentes.items() if dados is not None],
+                    )
+                    self._conexao.executemany(
+                        "DELETE FROM estado WHERE chave = ?",
+                        [(chave,) for chave, dados in pendentes.items() if dados is None],
+                    )
+            except sqlite3.Error as e:
+                logging.error(f"Erro ao gravar o estado em {self.caminho}: {e}")
+                with self._trava:
+                    for chave, dados in pendentes.items():  # Tenta de novo na próxima descarga
+                        self._pendentes.setdefault(chave, dados)
+            finally:
+                with self._trava:
+                    self._gravando = {}
+
+    def fechar(self):
+        self.descarregar()
+        with self._trava_conexao:
+            self._conexao.close()
@@ -0,0 +1,295 @@
+"""
+Ponto de entrada não interativo: lê os alvos de um arquivo TOML ou YAML e monitora
+todos no mesmo processo, sem perguntas no terminal.
+
+Uso:
+    python executor.py alvos.toml
+    python executor.py alvos.toml --verificar       # Só valida o arquivo
+    python executor.py alvos.toml --renovar-driver  # Resolve o chromedriver de novo (após atualizar o Chrome)
+
+O arquivo é relido quando muda (MonitorArquivos; sem watchdog, por verificação
+periódica) ou com SIGHUP: alvos novos, removidos ou alterados são aplicados ao
+agendador em execução, sem reiniciar os navegadores nem perder o estado dos demais.
+Alvos com a mesma URL e o mesmo localizador (de usuários diferentes) são buscados uma
+só vez e cada alteração é registrada para cada um deles (ver registro_alvos.py).
+"""
+import argparse  # Linha de comando
+import asyncio   # Loop do agendador
+import logging   # Registro de logs
+import os        # Data de modificação do arquivo de configuração
+import signal    # Recarga (SIGHUP) e parada (SIGTERM)
+import sys       # Código de saída
+from typing import Any, Dict, List, Optional, Tuple
+
+from agendador import Agendador, Alvo, EventoAlteracao
+from backends import Backend, criar_backend
+from bloqueio_recursos import politica_recursos
+from captura_rede import filtro_rede
+from config_log import configurar_log
+from monitor_arquivos import MonitorArquivos
+from registro_alvos import RegistroAlvos
+
+CAMPOS_ALVO = ("id", "url", "seletor", "xpath", "campos", "recursos", "rede", "intervalo",
+               "intervalo_min", "intervalo_max", "usuario")
+
+log_valores = logging.getLogger("ValoresAlterados")
+
+
+def carregar_config(caminho: str) -> Dict[str, Any]:
+    """
+    Lê o arquivo de configuração (.toml, ou .yaml/.yml com PyYAML instalado).
+    """
+    extensao = os.path.splitext(caminho)[1].lower()
+    if extensao == ".toml":
+        try:
+            import tomllib
+        except ImportError:  # Python < 3.11
+            import tomli as tomllib
+        with open(caminho, "rb") as f:
+            dados = tomllib.load(f)
+    elif extensao in (".yaml", ".yml"):
+        import yaml
+        with open(caminho, encoding="utf-8") as f:
+            dados = yaml.safe_load(f) or {}
+    else:
+        raise ValueError(f"Formato de configuração não suportado: '{extensao}' (use .toml, .yaml ou .yml).")
+    if not isinstance(dados, dict):
+        raise ValueError("A configuração deve ser um mapa com as seções 'geral' e 'alvos'.")
+    return dados
+
+
+def alvos_da_config(config: Dict[str, Any]) -> Dict[str, Alvo]:
+    """
+    Converte a lista `alvos` da configuração, validando campos e ids repetidos.
+    """
+    alvos: Dict[str, Alvo] = {}
+    for posicao, item in enumerate(config.get("alvos") or [], start=1):
+        desconhecidos = set(item) - set(CAMPOS_ALVO)
+        if desconhecidos:
+            raise ValueError(f"Alvo {posicao}: campo(s) desconhecido(s): {', '.join(sorted(desconhecidos))}.")
+        if not item.get("id") or not item.get("url"):
+            raise ValueError(f"Alvo {posicao}: 'id' e 'url' são obrigatórios.")
+        campos = item.get("campos")
+        if campos is not None and (not isinstance(campos, dict) or not all(
+                isinstance(localizador, str) for localizador in campos.values())):
+            raise ValueError(f"Alvo {posicao}: 'campos' deve mapear nomes a seletores CSS ou XPath.")
+        if item.get("recursos") is not None:
+            try:
+                politica_recursos(item["recursos"])
+            except ValueError as e:
+                raise ValueError(f"Alvo {posicao}: {e}")
+        if item.get("rede") is not None:
+            if campos is not None:
+                raise ValueError(f"Alvo {posicao}: 'rede' vale só para alvos com um único seletor ou XPath.")
+            try:
+                filtro_rede(item["rede"])
+            except ValueError as e:
+                raise ValueError(f"Alvo {posicao}: {e}")
+        alvo = Alvo(**{campo: item[campo] for campo in CAMPOS_ALVO if campo in item})
+        alvo.id = str(alvo.id)
+        if alvo.id in alvos:
+            raise ValueError(f"Alvo '{alvo.id}' aparece mais de uma vez.")
+        alvos[alvo.id] = alvo
+    return alvos
+
+
+def _assinatura(alvo: Alvo) -> Tuple:
+    return tuple(getattr(alvo, campo) for campo in CAMPOS_ALVO)
+
+
+def diferenca_alvos(atuais: Dict[str, Alvo], novos: Dict[str, Alvo]) -> Tuple[List[Alvo], List[str], List[Alvo]]:
+    """
+    (adicionados, ids removidos, alterados) entre duas versões da lista de alvos.
+    """
+    adicionados = [alvo for alvo_id, alvo in novos.items() if alvo_id not in atuais]
+    removidos = [alvo_id for alvo_id in atuais if alvo_id not in novos]
+    alterados = [alvo for alvo_id, alvo in novos.items()
+                 if alvo_id in atuais and _assinatura(alvo) != _assinatura(atuais[alvo_id])]
+    return adicionados, removidos, alterados
+
+
+class Executor:
+    """
+    Monta o backend e o agendador a partir do arquivo de configuração e mantém os
+    alvos sincronizados com ele enquanto executa.
+    """
+    def __init__(self, caminho_config: str, renovar_driver: bool = False):
+        self.caminho_config = caminho_config
+        self.renovar_driver = renovar_driver
+        config = carregar_config(caminho_config)
+        self.geral: Dict[str, Any] = dict(config.get("geral") or {})
+        politica_recursos(self.geral.get("recursos"))  # Perfil geral inválido falha já na partida
+        self.alvos = alvos_da_config(config)
+        self.backend: Optional[Backend] = None
+        self.agendador: Optional[Agendador] = None
+        self.registro: Optional[RegistroAlvos] = None  # Alvos iguais de usuários diferentes = uma busca
+        self._modificado_em = self._data_arquivo()
+
+    def _data_arquivo(self) -> Optional[float]:
+        try:
+            return os.stat(self.caminho_config).st_mtime
+        except OSError:
+            return None
+
+    def _opcoes_backend(self) -> Dict[str, Any]:
+        opcoes = dict(self.geral)
+        opcoes.setdefault("captura_rede", any(alvo.rede for alvo in self.alvos.values()))
+        if opcoes.get("backend", "selenium") == "selenium" and not opcoes.get("caminho_driver"):
+            from pool_navegadores import caminho_chromedriver
+            opcoes["caminho_driver"] = caminho_chromedriver(renovar=self.renovar_driver)
+        return opcoes
+
+    def recarregar(self) -> bool:
+        """
+        Relê o arquivo e aplica só as diferenças. Com erro no arquivo, mantém os alvos atuais.
+        """
+        try:
+            config = carregar_config(self.caminho_config)
+            novos = alvos_da_config(config)
+        except Exception as e:
+            logging.error(f"Configuração inválida em {self.caminho_config}; mantendo os alvos atuais: {e}")
+            return False
+        if dict(config.get("geral") or {}) != self.geral:
+            logging.warning("Alterações na seção 'geral' só valem após reiniciar o executor.")
+
+        adicionados, removidos, alterados = diferenca_alvos(self.alvos, novos)
+        if self.registro is not None:
+            liberados = [busca for alvo_id in removidos for busca in self.registro.remover(alvo_id)]
+            liberados += [busca for alvo in alterados + adicionados for busca in self.registro.atualizar(alvo)]
+            for busca_id in liberados:  # Busca sem assinantes ou que passou a ter outro id
+                self.backend.esquecer(busca_id)
+        self.alvos = novos
+        if adicionados or removidos or alterados:
+            logging.info(f"Configuração recarregada: {len(adicionados)} alvo(s) novo(s), "
+                         f"{len(removidos)} removido(s), {len(alterados)} alterado(s).")
+        return True
+
+    async def _vigiar_arquivo(self, intervalo: float):
+        while True:
+            await asyncio.sleep(intervalo)
+            modificado_em = self._data_arquivo()
+            if modificado_em is not None and modificado_em != self._modificado_em:
+                self._modificado_em = modificado_em
+                self.recarregar()
+
+    async def executar(self):
+        from metricas import AmostradorRecursos, ServidorMetricas  # psutil só é importado ao amostrar
+
+        geral = self.geral
+        self.backend = criar_backend(geral.get("backend", "selenium"), self._opcoes_backend())
+        estado = None
+        if geral.get("estado", "estado.sqlite3"):
+            from estado_persistente import EstadoPersistente
+            estado = EstadoPersistente(geral.get("estado", "estado.sqlite3"))
+        self.agendador = Agendador(
+            self.backend.buscar,
+            max_concorrencia=geral.get("max_concorrencia", 10),
+            max_por_host=geral.get("max_por_host", 2),
+            intervalo_min=geral.get("intervalo_min", 1.0),
+            intervalo_max=geral.get("intervalo_max", 600.0),
+            falhas_por_host=geral.get("falhas_por_host", 5),
+            espera_disjuntor=geral.get("espera_disjuntor", 30.0),
+            estado=estado,
+        )
+        self.backend.ao_receber = self.agendador.receber  # Ticks capturados da rede, fora das buscas
+        self.registro = RegistroAlvos(self.agendador)
+        serie = None
+        if geral.get("serie"):
+            from serie_temporal import SerieTemporal
+            serie = SerieTemporal(geral["serie"])
+
+        @self.registro.ao_alterar
+        def registrar(evento: EventoAlteracao):
+            usuario = f" ({evento.alvo.usuario})" if evento.alvo.usuario else ""
+            log_valores.info(f"[{evento.chave}]{usuario} {evento.valor_anterior} -> {evento.valor_atual}")
+            if serie is not None:
+                from numeros import para_float
+                numero = para_float(evento.valor_atual)
+                if numero is not None:
+                    serie.registrar(evento.chave, numero, evento.instante)
+
+        for alvo in self.alvos.values():
+            self.registro.adicionar(alvo)
+
+        loop = asyncio.get_running_loop()
+        for sinal, acao in ((getattr(signal, "SIGHUP", None), self.recarregar), (signal.SIGTERM, self.parar)):
+            if sinal is None:
+                continue
+            try:
+                loop.add_signal_handler(sinal, acao)
+            except (NotImplementedError, RuntimeError):  # Windows ou fora da thread principal
+                pass
+
+        amostrador = AmostradorRecursos(pids_navegadores=self.backend.pids,
+                                        arquivo=geral.get("arquivo_metricas", "metricas.json")).iniciar()
+        servidor = ServidorMetricas(porta=geral["porta_metricas"]).iniciar() if geral.get("porta_metricas") else None
+        eventos = None
+        if geral.get("porta_eventos"):  # Alterações por SSE/WebSocket, em vez de ler o log de valores
+            from servidor_eventos import ServidorEventos
+            eventos = ServidorEventos(porta=geral["porta_eventos"], tamanho_fila=geral.get("fila_eventos", 100),
+                                      politica=geral.get("politica_eventos", "descartar_antigos")).iniciar()
+            self.registro.ao_alterar(eventos.publicar_evento)
+        tarefas = []
+        vigia = None
+        if geral.get("vigiar_config", True):
+            try:
+                vigia = MonitorArquivos(self.caminho_config,
+                                        lambda: loop.call_soon_threadsafe(self.recarregar)).iniciar()
+            except ImportError:
+                logging.info("watchdog não instalado; a configuração será verificada periodicamente.")
+        if vigia is None and geral.get("recarregar_a_cada", 5):
+            tarefas.append(asyncio.create_task(self._vigiar_arquivo(geral.get("recarregar_a_cada", 5))))
+
+        logging.info(f"Executor iniciado com {len(self.alvos)} alvo(s) do arquivo {self.caminho_config} "
+                     f"em {self.registro.buscas} busca(s) distinta(s) (backend {geral.get('backend', 'selenium')}).")
+        try:
+            await self.agendador.executar()
+        finally:
+            for tarefa in tarefas:
+                tarefa.cancel()
+            if vigia:
+                vigia.parar()
+            amostrador.parar()
+            if servidor:
+                servidor.parar()
+            if eventos:
+                eventos.parar()
+            await self.backend.encerrar()
+            if serie is not None:
+                serie.fechar()
+            if estado is not None:
+                estado.fechar()
+
+    def parar(self):
+        if self.agendador is not None:
+            self.agendador.parar()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Monitora os alvos definidos em um arquivo TOML ou YAML.")
+    parser.add_argument("config", help="Arquivo de alvos (.toml, .yaml ou .yml)")
+    parser.add_argument("--verificar", action="store_true", help="Valida o arquivo e sai")
+    parser.add_argument("--renovar-driver", action="store_true", help="Resolve o chromedriver de novo")
+    args = parser.parse_args()
+
+    try:
+        executor = Executor(args.config, renovar_driver=args.renovar_driver)
+    except Exception as e:
+        print(f"Erro na configuração: {e}", file=sys.stderr)
+        sys.exit(2)
+    if args.verificar:
+        print(f"Configuração válida: {len(executor.alvos)} alvo(s).")
+        return
+
+    geral = executor.geral
+    configurar_log(geral.get("log", "monitoramento.log"), terminal=geral.get("terminal", True),
+                   formato_json=geral.get("log_json", False),
+                   loggers_dedicados={"ValoresAlterados": geral.get("log_valores", "valores_alterados.log")})
+    try:
+        asyncio.run(executor.executar())
+    except KeyboardInterrupt:
+        print("\nInterrompido pelo usuário.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+import bisect     # Faixa do histograma
+import json       # Arquivo de instantâneo
+import logging    # Registro de logs
+import os         # Gravação atômica do instantâneo
+import threading  # Amostragem e servidor HTTP em segundo plano
+import time       # Cronômetro das operações
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+# Faixas (em segundos) usadas por padrão nos histogramas de latência
+FAIXAS_PADRAO: Tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60)
+
+Rotulos = Tuple[Tuple[str, str], ...]
+
+
+class Histograma:
+    """
+    Contagem cumulativa por faixa, soma e total, no formato do Prometheus.
+    """
+    def __init__(self, faixas: Iterable[float] = FAIXAS_PADRAO):
+        self.faixas = tuple(sorted(faixas))
+        self.contagens = [0] * (len(self.faixas) + 1)  # Última posição = +Inf
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        self.contagens[bisect.bisect_left(self.faixas, valor)] += 1
+        self.soma += valor
+        self.total += 1
+
+    def cumulativas(self) -> List[Tuple[str, int]]:
+        acumulado, linhas = 0, []
+        for faixa, contagem in zip(self.faixas + (float("inf"),), self.contagens):
+            acumulado += contagem
+            linhas.append(("+Inf" if faixa == float("inf") else f"{faixa:g}", acumulado))
+        return linhas
+
+
+class Metricas:
+    """
+    Registro de contadores, medidores e histogramas, com rótulos (ex: alvo, origem).
+
+    As atualizações só tocam dicionários em memória; a exportação (texto do Prometheus
+    ou instantâneo em JSON) é feita sob demanda por quem consome.
+    """
+    def __init__(self, prefixo: str = "exalgorit"):
+        self.prefixo = prefixo
+        self._tipos: Dict[str, str] = {}
+        self._ajudas: Dict[str, str] = {}
+        self._valores: Dict[str, Dict[Rotulos, float]] = {}
+        self._histogramas: Dict[str, Dict[Rotulos, Histograma]] = {}
+        self._faixas: Dict[str, Tuple[float, ...]] = {}
+        self._trava = threading.Lock()
+
+    def _registrar(self, nome: str, tipo: str, ajuda: str) -> str:
+        nome = f"{self.prefixo}_{nome}"
+        if nome not in self._tipos:
+            self._tipos[nome] = tipo
+            self._ajudas[nome] = ajuda
+        return nome
+
+    def incrementar(self, nome: str, valor: float = 1, ajuda: str = "", **rotulos):
+        nome = self._registrar(nome, "counter", ajuda)
+        chave = tuple(sorted(rotulos.items()))
+        with self._trava:
+            serie = self._valores.setdefault(nome, {})
+            serie[chave] = serie.get(chave, 0) + valor
+
+    def definir(self, nome: str, valor: float, ajuda: str = "", **rotulos):
+        nome = self._registrar(nome, "gauge", ajuda)
+        with self._trava:
+            self._valores.setdefault(nome, {})[tuple(sorted(rotulos.items()))] = valor
+
+    def observar(self, nome: str, valor: float, ajuda: str = "", faixas: Iterable[float] = FAIXAS_PADRAO,
+                 **rotulos):
+        nome = self._registrar(nome, "histogram", ajuda)
+        chave = tuple(sorted(rotulos.items()))
+        with self._trava:
+            serie = self._histogramas.setdefault(nome, {})
+            histograma = serie.get(chave)
+            if histograma is None:
+                histograma = serie[chave] = Histograma(self._faixas.setdefault(nome, tuple(faixas)))
+            histograma.observar(valor)
+
+    @contextmanager
+    def cronometrar(self, nome: str, ajuda: str = "", **rotulos):
+        """
+        Uso: `with metricas.cronometrar("busca_segundos", alvo="x"): ...`
+        """
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observar(nome, time.perf_counter() - inicio, ajuda, **rotulos)
+
+    def remover_rotulo(self, chave: str, valor: str):
+        """
+        Descarta as séries com o rótulo indicado (ex: alvo removido), limitando a cardinalidade.
+        """
+        par = (chave, valor)
+        with self._trava:
+            for grupo in list(self._valores.values()) + list(self._histogramas.values()):
+                for rotulos in [r for r in grupo if par in r]:
+                    del grupo[rotulos]
+
+    @staticmethod
+    def _formatar_rotulos(rotulos: Rotulos, extra: Optional[Tuple[str, str]] = None) -> str:
+        pares = list(rotulos) + ([extra] if extra else [])
+        if not pares:
+            return ""
+        return "{" + ",".join(f'{chave}="{_escapar(valor)}"' for chave, valor in pares) + "}"
+
+    def texto_prometheus(self) -> str:
+        """
+        Exportação no formato de texto do Prometheus (versão 0.0.4).
+        """
+        linhas = []
+        with self._trava:
+            for nome, tipo in self._tipos.items():
+                if self._ajudas[nome]:
+                    linhas.append(f"# HELP {nome} {self._ajudas[nome]}")
+                linhas.append(f"# TYPE {nome} {tipo}")
+                if tipo == "histogram":
+                    for rotulos, histograma in self._histogramas.get(nome, {}).items():
+                        for faixa, acumulado in histograma.cumulativas():
+                            linhas.append(f"{nome}_bucket{self._formatar_rotulos(rotulos, ('le', faixa))} {acumulado}")
+                        linhas.append(f"{nome}_sum{self._formatar_rotulos(rotulos)} {histograma.soma}")
+                        linhas.append(f"{nome}_count{self._formatar_rotulos(rotulos)} {histograma.total}")
+                else:
+                    for rotulos, valor in self._valores.get(nome, {}).items():
+                        linhas.append(f"{nome}{self._formatar_rotulos(rotulos)} {valor}")
+        return "\n".join(linhas) + "\n"
+
+    def instantaneo(self) -> dict:
+        """
+        Estado atual em um dicionário serializável (histogramas como total, soma e média).
+        """
+        dados = {"instante": time.time()}
+        with self._trava:
+            for nome, tipo in self._tipos.items():
+                if tipo == "histogram":
+                    dados[nome] = [
+                        {**dict(rotulos), "total": h.total, "soma": round(h.soma, 6),
+                         "media": round(h.soma / h.total, 6) if h.total else None}
+                        for rotulos, h in self._histogramas.get(nome, {}).items()
+                    ]
+                else:
+                    dados[nome] = [{**dict(rotulos), "valor": valor}
+                                   for rotulos, valor in self._valores.get(nome, {}).items()]
+        return dados
+
+
+def _escapar(valor) -> str:
+    return str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Registro compartilhado pelos módulos do processo
+METRICAS = Metricas()
+
+
+def amostrar_arvore(pid: int) -> Tuple[float, float, int]:
+    """
+    RSS (MB), CPU (%) e número de processos da árvore iniciada em `pid`.
+    A CPU é medida desde a amostra anterior do mesmo processo.
+    """
+    import psutil  # Importado só quando há amostragem de recursos
+    raiz = _processo(pid)
+    rss = cpu = 0.0
+    processos = 0
+    for filho in [raiz] + raiz.children(recursive=True):
+        try:
+            processo = _processo(filho.pid)
+            rss += processo.memory_info().rss
+            cpu += processo.cpu_percent(None)
+            processos += 1
+        except psutil.Error:
+            pass  # Processo encerrado durante a amostragem
+    return rss / (1024 * 1024), cpu, processos
+
+
+_processos: Dict[int, object] = {}
+
+
+def _processo(pid: int):
+    # O psutil só mede CPU entre duas chamadas no mesmo objeto Process: reaproveita-os
+    import psutil
+    processo = _processos.get(pid)
+    if processo is None or not processo.is_running():
+        if len(_processos) > 1000:  # Descarta processos já encerrados
+            for antigo in [p for p, proc in _processos.items() if not proc.is_running()]:
+                del _processos[antigo]
+        processo = _processos[pid] = psutil.Process(pid)
+        processo.cpu_percent(None)
+    return processo
+
+
+class AmostradorRecursos:
+    """
+    Thread que, a cada `intervalo` segundos, mede o próprio processo e as árvores dos
+    navegadores (`pids_navegadores`, ex: `pool.pids`), executa os `coletores`
+    registrados (profundidade de filas etc.) e grava o instantâneo em `arquivo`.
+    """
+    def __init__(self, metricas: Metricas = METRICAS, intervalo: float = 15.0,
+                 pids_navegadores: Optional[Callable[[], Iterable[int]]] = None,
+                 arquivo: Optional[str] = "metricas.json"):
+        self.metricas = metricas
+        self.intervalo = intervalo
+        self.pids_navegadores = pids_navegadores
+        self.arquivo = arquivo
+        self.coletores: List[Callable[[Metricas], None]] = []
+        self._parada = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def coletar(self, coletor: Callable[[Metricas], None]):
+        self.coletores.append(coletor)
+        return coletor
+
+    def amostrar(self):
+        try:
+            rss, cpu, _ = amostrar_arvore(os.getpid())
+            self.metricas.definir("processo_rss_mb", rss, "Memória residente do monitor e filhos")
+            self.metricas.definir("processo_cpu_percentual", cpu, "CPU do monitor e filhos")
+            if self.pids_navegadores:
+                rss_total = cpu_total = processos = 0
+                for pid in self.pids_navegadores():
+                    rss, cpu, quantidade = amostrar_arvore(pid)
+                    rss_total, cpu_total, processos = rss_total + rss, cpu_total + cpu, processos + quantidade
+                self.metricas.definir("navegadores_rss_mb", rss_total, "Memória residente dos navegadores")
+                self.metricas.definir("navegadores_cpu_percentual", cpu_total, "CPU dos navegadores")
+                self.metricas.definir("navegadores_processos", processos, "Processos dos navegadores")
+        except Exception as e:
+            logging.warning(f"Falha ao amostrar recursos: {e}")
+        for coletor in self.coletores:
+            try:
+                coletor(self.metricas)
+            except Exception as e:
+                logging.warning(f"Falha no coletor de métricas {coletor}: {e}")
+        if self.arquivo:
+            self.salvar()
+
+    def salvar(self):
+        temporario = f"{self.arquivo}.tmp"
+        with open(temporario, "w", encoding="utf-8") as f:
+            json.dump(self.metricas.instantaneo(), f, ensure_ascii=False)
+        os.replace(temporario, self.arquivo)
+
+    def _rodar(self):
+        while not self._parada.wait(self.intervalo):
+            self.amostrar()
+
+    def iniciar(self) -> "AmostradorRecursos":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._rodar, name="metricas", daemon=True)
+            self._thread.start()
+        return self
+
+    def parar(self):
+        self._parada.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+
+class ServidorMetricas:
+    """
+    Expõe `/metrics` no formato do Prometheus em um endereço local.
+    """
+    def __init__(self, metricas: Metricas = METRICAS, porta: int = 9108, endereco: str = "127.0.0.1"):
+        metricas_servidas = metricas
+
+        class _Tratador(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                corpo = metricas_servidas.texto_prometheus().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(corpo)))
+                self.end_headers()
+                self.wfile.write(corpo)
+
+            def log_message(self, formato, *args):  # Sem uma linha de log por coleta
+                pass
+
+        self._servidor = ThreadingHTTPServer((endereco, porta), _Tratador)
+        self._servidor.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def porta(self) -> int:
+        return self._servidor.server_address[1]
+
+    def iniciar(self) -> "ServidorMetricas":
+        self._thread = threading.Thread(target=self._servidor.serve_forever, name="servidor-metricas", daemon=True)
+        self._thread.start()
+        logging.info(f"Métricas disponíveis em http://{self._servidor.server_address[0]}:{self.porta}/metrics")
+        return self
+
+    def parar(self):
+        self._servidor.shutdown()
+        self._servidor.server_close()
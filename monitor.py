@@ -2,159 +2,191 @@ import asyncio # Execução assíncrona (paralela)
 import logging # Registro de logs
 import re      # Expressões regulares (validação e busca)
 import sys     # Manipulação de exceções e finalização
-from typing import Optional  # Tipagem
-
-import psutil  # Monitoramento de CPU e memória
-from selenium import webdriver  # Controle de navegador
-from selenium.webdriver.common.by import By
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import WebDriverException
-from webdriver_manager.chrome import ChromeDriverManager # Baixa o driver automaticamente
-
-from watchdog.observers import Observer # Observa arquivos
-from watchdog.events import FileSystemEventHandler # Trata eventos de arquivos
-
-<<<<<<< HEAD
-# Log geral
-=======
-
-# Log geral em "monitoramento.log"
->>>>>>> de7599e9b69ebf19e1ff66a5e54ad51b154b461e
-logging.basicConfig(
-    filename="monitoramento.log",
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s"
-)
+from typing import Dict, List, Optional  # Tipagem
+
+from agendador import Agendador, Alvo, EventoAlteracao, IntervaloAdaptativo # Vários alvos em um só processo
+from pool_navegadores import caminho_chromedriver, pool_chrome # Navegadores compartilhados
+from pagina_persistente import PoliticaRecarga # Página aberta entre leituras
+from pagina_monitorada import SELETOR_PRECO, PaginaMonitorada # Leitura do valor com Selenium
+from busca_http import BuscadorEmCamadas, BuscadorHTTP # HTML estático antes do navegador
+from serie_temporal import SerieTemporal # Histórico dos valores observados
+from numeros import para_float # Texto coletado -> número
+from regras import MotorRegras # Alertas por alvo
+from config_log import configurar_log # Logs em segundo plano
+from metricas import METRICAS, AmostradorRecursos, ServidorMetricas # Uso de recursos e latências
+from estado_persistente import EstadoPersistente # Último estado salvo entre execuções
+from servidor_eventos import ServidorEventos # Alterações por SSE/WebSocket
+from registro_alvos import RegistroAlvos # Uma busca por alvo distinto, repassada a cada usuário
+
+
+# Log geral em "monitoramento.log" e log de valores em "valores_alterados.log",
+# configurados por config_log.configurar_log ao executar o script
 
 # Log específico de valores alterados
 log_valores = logging.getLogger("ValoresAlterados") # Log separado para valores detectados
-handler_valores = logging.FileHandler("valores_alterados.log")
-handler_valores.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
-log_valores.addHandler(handler_valores)
-log_valores.setLevel(logging.INFO)
 
-<<<<<<< HEAD
-def log_usuario(nome: str):
-=======
 # Valida e registra o nome do usuário
-def log_usuario(nome: str):   
->>>>>>> de7599e9b69ebf19e1ff66a5e54ad51b154b461e
+def log_usuario(nome: str):
     if not re.fullmatch(r"[A-Za-z ]{3,}", nome):
         raise ValueError("Nome inválido. Use ao menos 3 letras.")
     logging.info(f"Usuário '{nome}' iniciou o monitoramento.")
 
-<<<<<<< HEAD
-def log_recursos():
-=======
-# Loga uso de CPU e memória
-def log_recursos():   
->>>>>>> de7599e9b69ebf19e1ff66a5e54ad51b154b461e
-    cpu = psutil.cpu_percent()
-    mem = psutil.virtual_memory().percent
-    logging.info(f"CPU: {cpu}%, Memória: {mem}%")
-
-class PaginaMonitorada:
-    def __init__(self, url: str):
-        self.url = url
-        self.ultimo_valor = ""
-        self.driver = self._setup_driver()
-
-    def _setup_driver(self):
-        try:
-            options = Options()
-            options.add_argument("--headless")
-            options.add_argument("--disable-gpu")
-            options.add_argument("--no-sandbox")
-            driver = webdriver.Chrome(service=Service(ChromeDriverManager().install()), options=options)
-            driver.set_page_load_timeout(10)
-            return driver
-        except WebDriverException as e:
-            logging.critical(f"Erro ao iniciar WebDriver: {e}")
-            raise
-
-    def validar_url(self):
-        return re.match(r"^https?://[\w\.-]+", self.url)
-
-    def buscar_numero(self) -> Optional[str]:
-        try:
-            self.driver.get(self.url)
-            wait = WebDriverWait(self.driver, 20)  # tempo aumentado
-
-            # Espera até o elemento com o data-test estar presente
-            elemento = wait.until(
-                EC.presence_of_element_located((By.CSS_SELECTOR, '[data-test="instrument-price-last"]'))
-            )
-
-            texto = elemento.text.strip()
-            if texto:
-                logging.info(f"Valor localizado: {texto}")
-                return texto
-            else:
-                logging.warning("Elemento encontrado, mas sem texto.")
-            return None
-        except Exception as e:
-            logging.error(f"Erro na busca: {e}")
-            return None
-
-
-    def fechar(self):
-        self.driver.quit()
-
-class MonitorArquivos(FileSystemEventHandler):
-    def on_modified(self, event):         # Loga arquivos modificados
-        logging.info(f"Modificado: {event.src_path}")
-
-    def on_created(self, event):          # Loga arquivos criados
-        logging.info(f"Criado: {event.src_path}")
-
-    def iniciar(self, caminho="."):      # Inicia observação de arquivos
-        observer = Observer()
-        observer.schedule(self, caminho, recursive=True)
-        observer.start()
-        return observer
-
-<<<<<<< HEAD
-async def monitoramento_web(monitor: PaginaMonitorada, intervalo: int = 60):
-=======
-
-async def monitoramento_web(monitor: PaginaMonitorada, intervalo: int = 60):  # Checa repetidamente a página
->>>>>>> de7599e9b69ebf19e1ff66a5e54ad51b154b461e
+async def monitoramento_web(monitor: PaginaMonitorada, intervalo: int = 60,
+                            estado: Optional[EstadoPersistente] = None,
+                            eventos: Optional[ServidorEventos] = None):  # Checa repetidamente a página
     logging.info(f"Iniciando monitoramento da URL: {monitor.url}")
+    ritmo = IntervaloAdaptativo(intervalo)  # Ajusta o intervalo ao ritmo de mudança da página
+    chave = f"pagina:{monitor.url}|{monitor.localizador[1]}"
+    salvo = estado.ler(chave) if estado else None
+    if salvo:  # Retoma o último valor e o ritmo: a primeira leitura não é uma "mudança" falsa
+        monitor.ultimo_valor = salvo.get("valor", "")
+        ritmo.restaurar(salvo.get("intervalo", {}))
+    amostrador = AmostradorRecursos(
+        pids_navegadores=lambda: ([monitor.driver.service.process.pid] if monitor.driver
+                                  else monitor.pool.pids() if monitor.pool else [])
+    ).iniciar()
+    gravador = asyncio.create_task(estado.descarregar_periodicamente()) if estado else None
     try:
         while True:
-            log_recursos()
-            valor = await asyncio.to_thread(monitor.buscar_numero)
+            with METRICAS.cronometrar("busca_segundos", "Duração das buscas", alvo=monitor.url):
+                valor = await asyncio.to_thread(monitor.buscar_numero)
+            if valor is None:
+                METRICAS.incrementar("erros_total", 1, "Buscas sem valor", alvo=monitor.url)
 
-            if valor and valor != monitor.ultimo_valor:
+            mudou = bool(valor) and valor != monitor.ultimo_valor
+            if mudou:
                 logging.info(f"Valor alterado: {valor}")
                 monitor.ultimo_valor = valor
                 log_valores.info(f"Novo valor detectado: {valor}")
+                if eventos:
+                    eventos.publicar(monitor.url, {"atual": valor})
 
-            await asyncio.sleep(intervalo)
+            espera = ritmo.registrar(mudou, erro=valor is None)
+            if estado:
+                estado.gravar(chave, {"valor": monitor.ultimo_valor, "intervalo": ritmo.exportar()})
+            await asyncio.sleep(espera)
     except asyncio.CancelledError:
         pass
     finally:
+        amostrador.parar()
         monitor.fechar()
-
-async def main():
+        if gravador:
+            gravador.cancel()
+            estado.descarregar()
+
+async def monitorar_alvos(alvos: List[Alvo], max_concorrencia: int = 10, max_por_host: int = 2,
+                          persistente: bool = False, politica: Optional[PoliticaRecarga] = None,
+                          camada_http: bool = True, serie: Optional[SerieTemporal] = None,
+                          motor: Optional[MotorRegras] = None, porta_metricas: Optional[int] = None,
+                          arquivo_metricas: Optional[str] = "metricas.json",
+                          estado: Optional[EstadoPersistente] = None, porta_eventos: Optional[int] = None):
+    """
+    Monitora vários alvos no mesmo processo usando o Agendador.
+    No modo persistente cada alvo reserva um navegador do pool, que passa a ter um por alvo.
+    Com `camada_http`, cada URL é tentada primeiro via HTTP simples e só usa o navegador
+    quando o valor não está no HTML estático.
+    Com `serie`, cada alteração numérica é gravada na série temporal do alvo.
+    Com `motor`, cada alteração é avaliada pelas regras de alerta do alvo.
+    Latências, erros, profundidade da fila e recursos dos navegadores são amostrados para
+    `arquivo_metricas` e, com `porta_metricas`, servidos em /metrics (Prometheus).
+    Com `estado`, o último valor e o ritmo de cada alvo sobrevivem a reinícios.
+    Com `porta_eventos`, as alterações são publicadas por SSE e WebSocket (ver servidor_eventos).
+    Alvos iguais (URL normalizada e localizador) de usuários diferentes são buscados uma só vez,
+    no menor intervalo pedido, e cada alteração é registrada para cada usuário.
+    """
+    com_rede = [alvo for alvo in alvos if alvo.rede] if persistente else []
+    tamanho = len(alvos) - len(com_rede) if persistente else max_concorrencia
+    pool = pool_chrome(tamanho=max(1, tamanho), caminho_driver=caminho_chromedriver())
+    # Só os navegadores dos alvos com `rede` registram o log de desempenho: nos demais ele nunca seria lido
+    pool_rede = pool_chrome(tamanho=len(com_rede), caminho_driver=caminho_chromedriver(),
+                            log_rede=True) if com_rede else None
+    monitores: Dict[str, PaginaMonitorada] = {}  # Um por busca distinta (alvos iguais compartilham)
+
+    def buscador(alvo: Alvo):
+        monitor = monitores.get(alvo.id)
+        if monitor is None:
+            monitor = monitores[alvo.id] = PaginaMonitorada(
+                alvo.url, alvo.seletor or SELETOR_PRECO, pool=pool_rede if alvo.rede and pool_rede else pool,
+                persistente=persistente, politica=politica, xpath=alvo.xpath, recursos=alvo.recursos, rede=alvo.rede)
+        valor = monitor.buscar_campos(alvo.campos) if alvo.campos else monitor.buscar_numero()
+        if monitor.erro is not None:
+            raise monitor.erro  # Falha do navegador conta para o disjuntor do host; elemento ausente não
+        return valor
+
+    if camada_http:
+        buscador = BuscadorEmCamadas(BuscadorHTTP(tamanho_pool=max_concorrencia), buscador)
+    agendador = Agendador(buscador, max_concorrencia=max_concorrencia, max_por_host=max_por_host, estado=estado)
+    registro = RegistroAlvos(agendador)
+
+    @registro.ao_alterar
+    def registrar(evento: EventoAlteracao):
+        usuario = f" ({evento.alvo.usuario})" if evento.alvo.usuario else ""
+        logging.info(f"Valor alterado em '{evento.chave}'{usuario}: {evento.valor_atual}")
+        log_valores.info(f"[{evento.chave}]{usuario} Novo valor detectado: {evento.valor_atual}")
+        numero = para_float(evento.valor_atual)
+        if serie is not None and numero is not None:
+            serie.registrar(evento.chave, numero, evento.instante)
+
+    amostrador = AmostradorRecursos(pids_navegadores=lambda: pool.pids() + (pool_rede.pids() if pool_rede else []),
+                                    arquivo=arquivo_metricas)
+
+    @amostrador.coletar
+    def fila(metricas):
+        metricas.definir("fila_pendentes", agendador.pendentes, "Checagens na fila do agendador")
+        metricas.definir("buscas_em_andamento", agendador.em_andamento, "Buscas em execução")
+        metricas.definir("espera_media_segundos", agendador.espera_media, "Atraso médio das checagens")
+
+    amostrador.iniciar()
+    servidor = ServidorMetricas(porta=porta_metricas).iniciar() if porta_metricas else None
+    eventos = ServidorEventos(porta=porta_eventos).iniciar() if porta_eventos else None
+    if eventos:
+        registro.ao_alterar(eventos.publicar_evento)
+
+    vigia = None
+    if motor is not None:
+        registro.ao_alterar(motor.ao_alterar)
+        vigia = asyncio.create_task(motor.vigiar_inatividade())
+
+    for alvo in alvos:
+        registro.adicionar(alvo)
+    try:
+        await agendador.executar()
+    finally:
+        if vigia:
+            vigia.cancel()
+        if motor is not None:
+            await asyncio.to_thread(motor.encerrar)  # Alertas ainda na fila das saídas
+        amostrador.parar()
+        if servidor:
+            servidor.parar()
+        if eventos:
+            eventos.parar()
+        for monitor in monitores.values():
+            monitor.fechar()
+        pool.encerrar()
+        if pool_rede:
+            pool_rede.encerrar()
+
+async def main(config: Optional[str] = None):
+    if config:  # Alvos do arquivo, recarregados quando ele muda (ver executor.py)
+        from executor import Executor
+        await Executor(config).executar()
+        return
     try:
         nome = input("Seu nome: ").strip()
         log_usuario(nome)
 
-        url = "https://br.investing.com/crypto/bitcoin"
-        monitor = PaginaMonitorada(url)
+        alvos = [
+            Alvo("bitcoin", "https://br.investing.com/crypto/bitcoin", seletor=SELETOR_PRECO, intervalo=60,
+                 usuario=nome),
+        ]
 
-        if not monitor.validar_url():
-            print("URL inválida.")
+        invalidos = [alvo.url for alvo in alvos if not re.match(r"^https?://[\w\.-]+", alvo.url)]
+        if invalidos:
+            print(f"URL inválida: {', '.join(invalidos)}")
             return
 
-        monitor_arquivos = MonitorArquivos()
-        observer = monitor_arquivos.iniciar()
-
-        tarefa_web = asyncio.create_task(monitoramento_web(monitor, intervalo=60))
+        tarefa_web = asyncio.create_task(monitorar_alvos(alvos, estado=EstadoPersistente()))
 
         print("Monitoramento iniciado. Pressione Ctrl+C para parar.")
         await tarefa_web
@@ -165,12 +197,8 @@ async def main():
         logging.critical(f"Erro crítico: {e}")
         print(f"Erro: {e}")
         sys.exit(1)
-    finally:
-        try:
-            observer.stop()
-            observer.join()
-        except:
-            pass
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    configurar_log("monitoramento.log", terminal=False,
+                   loggers_dedicados={"ValoresAlterados": "valores_alterados.log"})
+    asyncio.run(main(sys.argv[1] if len(sys.argv) > 1 else None))  # Opcional: arquivo de alvos
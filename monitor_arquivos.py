@@ -0,0 +1,75 @@
+import hashlib    # Ignora eventos sem mudança de conteúdo
+import logging    # Registro de logs
+import os         # Caminhos observados
+import threading  # Espera (debounce) antes de disparar
+from typing import Callable, Optional
+
+
+class MonitorArquivos:
+    """
+    Observa um único arquivo (ex: a configuração de alvos) e chama `ao_mudar` quando o
+    conteúdo dele muda.
+
+    Só o diretório do arquivo é observado, sem recursão, e os eventos de outros arquivos
+    (logs, série temporal) são descartados antes de qualquer trabalho. Rajadas de eventos
+    de um mesmo salvamento são agrupadas: `ao_mudar` roda `espera` segundos após o último
+    evento, e só se o conteúdo for diferente do último visto.
+    """
+    def __init__(self, caminho: str, ao_mudar: Callable[[], None], espera: float = 0.5):
+        self.caminho = os.path.abspath(caminho)
+        self.ao_mudar = ao_mudar
+        self.espera = espera
+        self._resumo = self._resumir()
+        self._temporizador: Optional[threading.Timer] = None
+        self._trava = threading.Lock()
+        self._observador = None
+
+    def _resumir(self) -> Optional[str]:
+        try:
+            with open(self.caminho, "rb") as f:
+                return hashlib.sha1(f.read()).hexdigest()
+        except OSError:
+            return None
+
+    def dispatch(self, event):
+        # Chamado pelo watchdog para cada evento do diretório. Editores que salvam em um
+        # arquivo temporário e renomeiam geram o evento no destino (`dest_path`).
+        caminhos = (event.src_path, getattr(event, "dest_path", None))
+        if event.is_directory or not any(c and os.path.abspath(c) == self.caminho for c in caminhos):
+            return
+        with self._trava:
+            if self._temporizador:
+                self._temporizador.cancel()
+            self._temporizador = threading.Timer(self.espera, self._disparar)
+            self._temporizador.daemon = True
+            self._temporizador.start()
+
+    def _disparar(self):
+        resumo = self._resumir()
+        if resumo is None or resumo == self._resumo:
+            return  # Arquivo apagado no meio do salvamento ou conteúdo igual
+        self._resumo = resumo
+        logging.info(f"Arquivo alterado: {self.caminho}")
+        try:
+            self.ao_mudar()
+        except Exception as e:
+            logging.error(f"Erro ao aplicar alteração de {self.caminho}: {e}")
+
+    def iniciar(self) -> "MonitorArquivos":
+        """
+        Começa a observar. Levanta ImportError se o watchdog não estiver instalado.
+        """
+        from watchdog.observers import Observer
+        self._observador = Observer()
+        self._observador.schedule(self, os.path.dirname(self.caminho), recursive=False)
+        self._observador.start()
+        return self
+
+    def parar(self):
+        with self._trava:
+            if self._temporizador:
+                self._temporizador.cancel()
+        if self._observador:
+            self._observador.stop()
+            self._observador.join()
+            self._observador = None
@@ -1,22 +1,29 @@
 # Importação das bibliotecas necessárias
 import requests
+import hashlib  # Resumo da última ocorrência
 import re  # Biblioteca de expressões regulares
 import logging  # Biblioteca para gerar logs de atividades
 import time  # Biblioteca para manipulação de tempo
 import sys  # Biblioteca para manipulação de argumentos do sistema
-import psutil  # Biblioteca para monitoramento de uso de CPU e memória
 from selenium import webdriver  # Selenium para interação com a web
 from selenium.webdriver.chrome.options import Options  # Configurações do navegador
 from selenium.webdriver.common.by import By  # Para localizar elementos na página
 from selenium.common.exceptions import WebDriverException  # Exceções do Selenium
-from typing import Optional  # Para tipagem opcional de retorno
+from selenium.webdriver.support.ui import WebDriverWait  # Espera pela região após carregar a página
+from selenium.webdriver.support import expected_conditions as EC  # Condição de presença do elemento
+from typing import List, Optional  # Para tipagem opcional de retorno
+from pool_navegadores import PoolNavegadores, driver_responde  # Pool de navegadores compartilhado
+from resiliencia import SessaoNavegador  # Driver próprio recriado após falhas
+from estado_persistente import EstadoPersistente  # Último estado salvo entre execuções
+from pagina_persistente import LeitorPersistente, PoliticaRecarga  # Página mantida aberta entre leituras
+from config_log import configurar_log  # Configuração central de logs
+from agendador import IntervaloAdaptativo  # Intervalo ajustado ao ritmo de mudança
+from metricas import METRICAS, AmostradorRecursos  # Latências e recursos dos navegadores
+from bloqueio_recursos import Recursos, aplicar_selenium, politica_recursos  # Sem imagens, fontes e anúncios
+from regiao import Alteracao, RegiaoMonitorada, executor_selenium, formatar_alteracoes  # Região por resumos
 
-# Configuração do Logger para monitoramento e logs
-logging.basicConfig(
-    filename='monitoramento.log',  # Define o nome do arquivo de log
-    level=logging.INFO,            # Define o nível do log (INFO para mostrar informações gerais)
-    format='%(asctime)s - %(levelname)s - %(message)s'  # Define o formato do log com data, nível e mensagem
-)
+# O Logger (arquivo 'monitoramento.log', gravado em segundo plano) é configurado
+# por config_log.configurar_log ao executar o script
 
 # Função para logar a atividade do usuário
 def log_usuario(nome: str) -> None:
@@ -28,26 +35,51 @@ def log_usuario(nome: str) -> None:
         raise ValueError("Nome inválido. Use ao menos 3 caracteres e apenas letras.")
     logging.info(f"Usuário '{nome}' iniciou o monitoramento.")  # Registra o nome do usuário no log
 
-# Função para capturar e logar o uso de recursos do sistema (CPU e Memória)
-def log_recursos_sistema():
-    """
-    Função que coleta informações sobre o uso de CPU e memória e registra no log.
-    """
-    cpu = psutil.cpu_percent()  # Captura o uso percentual da CPU
-    mem = psutil.virtual_memory().percent  # Captura o uso percentual da memória
-    logging.info(f"Uso de CPU: {cpu}%, Uso de Memória: {mem}%")  # Registra no log
-
 # Classe responsável pelo monitoramento da página HTML
 class MonitorHTML:
-    def __init__(self, url: str, numero: str, timeout: int = 10):
+    def __init__(self, url: str, numero: str, timeout: int = 10, pool: Optional[PoolNavegadores] = None,
+                 persistente: bool = False, politica: Optional[PoliticaRecarga] = None,
+                 recursos: Recursos = "padrao", regiao: Optional[str] = None,
+                 estado: Optional[EstadoPersistente] = None):
         """
         Inicializa a classe de monitoramento com a URL, número a ser monitorado e o tempo de timeout.
+        Com `pool`, o WebDriver é emprestado do pool a cada busca em vez de ser criado aqui.
+        Com `persistente`, a página é carregada uma vez e só recarregada conforme a `politica`.
+        `recursos` define o que não é carregado (imagens, fontes, anúncios; ver bloqueio_recursos).
+        Com `regiao` (seletor CSS ou XPath), só essa parte da página é acompanhada, por resumos
+        calculados no navegador, em vez do texto do corpo inteiro a cada verificação.
+        Com `estado`, a última ocorrência (resumo) e o ritmo de checagem sobrevivem a reinícios.
         """
         self.url = url  # URL que será monitorada
         self.numero = numero  # Número que estamos buscando
         self.timeout = timeout  # Tempo máximo de espera para carregar a página
         self.ultima_ocorrencia = ""  # Variável para armazenar o último conteúdo encontrado
-        self.driver = self._setup_driver()  # Inicializa o WebDriver
+        self._resumo_ocorrencia: Optional[str] = None  # SHA-1 da última ocorrência (o que é comparado e salvo)
+        self.estado = estado  # Checkpoints do último estado (opcional)
+        self.pool = pool  # Pool de navegadores compartilhado (opcional)
+        self.persistente = persistente  # Mantém a página aberta entre as verificações
+        self.politica = politica  # Quando recarregar a página no modo persistente
+        self.recursos = politica_recursos(recursos)  # Recursos bloqueados na página
+        self.regiao = RegiaoMonitorada(regiao) if regiao else None  # Região acompanhada por resumos
+        # WebDriver próprio, recriado com espera crescente se travar ou morrer
+        self._sessao = None if pool else SessaoNavegador(self._setup_driver, driver_responde, lambda d: d.quit())
+        self._leitor: Optional[LeitorPersistente] = None  # Leitor da página persistente
+        self.erro: Optional[Exception] = None  # Falha da última verificação (None quando só faltou o elemento)
+        if self._sessao:
+            self._sessao.obter()  # Inicializa o WebDriver próprio
+
+    @property
+    def driver(self):
+        """
+        WebDriver próprio atual (None com pool ou enquanto é recriado).
+        """
+        return self._sessao.objeto if self._sessao else None
+
+    def _usar_driver(self):
+        """
+        Driver emprestado do pool ou o próprio; em ambos, um driver que morre durante o uso é substituído.
+        """
+        return self.pool.emprestar() if self.pool else self._sessao.usar()
 
     def _setup_driver(self):
         """
@@ -60,6 +92,7 @@ class MonitorHTML:
             options.add_argument('--no-sandbox')  # Impede o uso de sandbox, melhora performance em alguns casos
             driver = webdriver.Chrome(options=options)  # Inicializa o WebDriver com as opções definidas
             driver.set_page_load_timeout(self.timeout)  # Define o tempo de timeout para carregar a página
+            aplicar_selenium(driver, self.recursos)  # Não baixa imagens, fontes nem rastreadores
             return driver
         except WebDriverException as e:
             logging.critical(f"Erro ao iniciar WebDriver: {e}")  # Registra erro crítico no log se o WebDriver falhar
@@ -72,14 +105,87 @@ class MonitorHTML:
         pattern = re.compile(r'^https?://[\w.-]+(?:\.[\w\.-]+)+[/\w\.-]*$')  # Expressão regular para validar URLs
         return bool(pattern.match(self.url))  # Retorna True se a URL for válida, caso contrário False
 
+    def _leitor_persistente(self) -> LeitorPersistente:
+        """
+        Cria (uma vez) o leitor que mantém a página aberta; com pool, o driver fica reservado até `finalizar()`.
+        """
+        if self._leitor is None:
+            driver = self.pool.obter() if self.pool else self._sessao.obter()
+            aplicar_selenium(driver, self.recursos)
+            por, localizador = self._localizador_espera()
+            self._leitor = LeitorPersistente(driver, self.url, por, localizador, self.politica,
+                                             espera=self.timeout)
+        return self._leitor
+
+    def _recuperar_leitor(self):
+        """
+        Após uma leitura com erro no modo persistente, libera o navegador reservado se ele morreu;
+        a próxima leitura abre outro na mesma URL e região, mantendo a última ocorrência.
+        """
+        if self._leitor is None:
+            return
+        if self._sessao:
+            if self._sessao.saudavel():
+                return
+        else:
+            try:
+                if driver_responde(self._leitor.driver):
+                    return
+            except Exception:
+                pass
+            logging.error(f"Navegador reservado para {self.url} não responde; será substituído.")
+            self.pool.devolver(self._leitor.driver, defeituoso=True)  # Devolvido como defeituoso: o pool fecha
+        self._leitor = None
+
+    def _localizador_espera(self):
+        """
+        Elemento aguardado após carregar a página: a região, se houver, ou o corpo.
+        """
+        if self.regiao is None:
+            return By.TAG_NAME, 'body'
+        return (By.XPATH if self.regiao.tipo == "xpath" else By.CSS_SELECTOR), self.regiao.localizador
+
+    def buscar_regiao(self) -> Optional[List[Alteracao]]:
+        """
+        Verifica a região: [] sem mudança, as alterações quando muda, None em erro (guardado em `erro`).
+        """
+        self.erro = None
+        try:
+            if self.persistente:
+                leitor = self._leitor_persistente()
+                alteracoes = leitor.ler_regiao(self.regiao)
+                if alteracoes is None:
+                    self.erro = leitor.erro
+                    self._recuperar_leitor()
+                return alteracoes
+            with self._usar_driver() as driver:
+                aplicar_selenium(driver, self.recursos)
+                driver.get(self.url)
+                WebDriverWait(driver, self.timeout).until(EC.presence_of_element_located(self._localizador_espera()))
+                with METRICAS.cronometrar("extracao_segundos", "Tempo de extração do valor", origem="navegador"):
+                    return self.regiao.verificar(executor_selenium(driver))
+        except Exception as e:
+            logging.error(f"Erro ao verificar a região {self.regiao.localizador}: {e}")
+            self.erro = e
+            return None
+
     def buscar_numero(self) -> Optional[str]:
         """
         Busca o número especificado na página carregada usando o Selenium.
         """
         try:
-            self.driver.get(self.url)  # Carrega a página da URL fornecida
-            time.sleep(2)  # Aguarda 2 segundos para garantir que a página foi completamente carregada
-            texto = self.driver.find_element(By.TAG_NAME, 'body').text  # Obtém o texto completo da página
+            if self.persistente:
+                texto = self._leitor_persistente().ler()  # Relê o corpo sem recarregar a página
+                if texto is None:
+                    self._recuperar_leitor()  # Navegador morto é substituído na próxima leitura
+                    return None
+            else:
+                with self._usar_driver() as driver:
+                    aplicar_selenium(driver, self.recursos)  # Sem custo se o driver já tem esta política
+                    driver.get(self.url)  # Carrega a página da URL fornecida
+                    time.sleep(2)  # Aguarda 2 segundos para garantir que a página foi completamente carregada
+                    with METRICAS.cronometrar("extracao_segundos", "Tempo de extração do valor", origem="navegador"):
+                        texto = driver.find_element(By.TAG_NAME, 'body').text  # Obtém o texto completo da página
 
             # Usa expressão regular para procurar o número dentro do texto da página
             match = re.search(re.escape(self.numero), texto)
@@ -95,29 +201,100 @@ class MonitorHTML:
 
     def monitorar(self, intervalo: int = 60):
         """
-        Monitora a página indefinidamente, verificando o número a cada intervalo de tempo (em segundos).
+        Monitora a página indefinidamente. `intervalo` (em segundos) é o ponto de partida:
+        a espera encurta quando o conteúdo muda com frequência e cresce quando fica parado.
         """
         logging.info(f"Iniciando monitoramento em: {self.url}")  # Log de início do monitoramento
-        while True:
-            log_recursos_sistema()  # Log do uso de recursos do sistema (CPU, memória)
-            conteudo = self.buscar_numero()  # Chama a função para buscar o número na página
+        ritmo = IntervaloAdaptativo(intervalo)
+        self._restaurar(ritmo)  # Retoma a última ocorrência salva: sem "alteração" falsa ao reiniciar
+        # Uso de recursos (inclusive dos processos do Chrome) amostrado em segundo plano, em metricas.json
+        amostrador = AmostradorRecursos(pids_navegadores=self._pids_navegadores).iniciar()
+        try:
+            while True:
+                if self.regiao is not None:
+                    alteracoes = self._verificar_regiao()
+                    espera = ritmo.registrar(bool(alteracoes), erro=alteracoes is None)
+                    self._salvar(ritmo)
+                    time.sleep(espera)
+                    continue
+                with METRICAS.cronometrar("busca_segundos", "Duração das buscas", alvo=self.url):
+                    conteudo = self.buscar_numero()  # Chama a função para buscar o número na página
+
+                if conteudo:
+                    logging.info(f"Número verificado: {self.numero}")  # Log do número verificado
+                    logging.debug(f"Conteúdo da página verificado: {conteudo[:500]}...")  # Primeiros 500 caracteres, só em nível DEBUG
 
-            if conteudo:
-                logging.info(f"Número verificado: {self.numero}")  # Log do número verificado
-                logging.info(f"Conteúdo da página verificado: {conteudo[:500]}...")  # Exibe os primeiros 500 caracteres do conteúdo da página
+                # Se o conteúdo foi encontrado e for diferente do último verificado, considera que houve alteração
+                resumo = hashlib.sha1(conteudo.encode("utf-8")).hexdigest() if conteudo else None
+                mudou = bool(conteudo) and resumo != self._resumo_ocorrencia
+                if mudou:
+                    logging.info("Alteração detectada no conteúdo da página.")  # Log de alteração detectada
+                    self.ultima_ocorrencia = conteudo  # Atualiza a variável que armazena o conteúdo da última verificação
+                    self._resumo_ocorrencia = resumo
 
-            # Se o conteúdo foi encontrado e for diferente do último verificado, considera que houve alteração
-            if conteudo and conteudo != self.ultima_ocorrencia:
-                logging.info("Alteração detectada no conteúdo da página.")  # Log de alteração detectada
-                self.ultima_ocorrencia = conteudo  # Atualiza a variável que armazena o conteúdo da última verificação
+                espera = ritmo.registrar(mudou, erro=conteudo is None)
+                self._salvar(ritmo)
+                time.sleep(espera)  # Aguarda antes de realizar nova verificação
+        finally:
+            amostrador.parar()  # A thread de amostragem não sobrevive ao monitor
 
-            time.sleep(intervalo)  # Aguarda o intervalo antes de realizar nova verificação
+    def _chave_estado(self) -> str:
+        return f"monitor_site:{self.url}|{self.regiao.localizador if self.regiao else 'body'}"
+
+    def _restaurar(self, ritmo: IntervaloAdaptativo):
+        dados = self.estado.ler(self._chave_estado()) if self.estado else None
+        if not dados:
+            return
+        self._resumo_ocorrencia = dados.get("resumo")
+        if self.regiao is not None and dados.get("regiao"):
+            self.regiao.restaurar(dados["regiao"])
+        ritmo.restaurar(dados.get("intervalo", {}))
+        logging.info(f"Estado anterior restaurado para {self.url}.")
+
+    def _salvar(self, ritmo: IntervaloAdaptativo):
+        if self.estado is None:
+            return
+        dados = {"resumo": self._resumo_ocorrencia, "intervalo": ritmo.exportar()}
+        if self.regiao is not None:
+            dados["regiao"] = self.regiao.exportar()
+        self.estado.gravar(self._chave_estado(), dados)
+        self.estado.descarregar_se_preciso()
+
+    def _verificar_regiao(self) -> Optional[List[Alteracao]]:
+        """
+        Uma verificação no modo região; registra no log só o que mudou.
+        """
+        with METRICAS.cronometrar("busca_segundos", "Duração das buscas", alvo=self.url):
+            alteracoes = self.buscar_regiao()
+        if not alteracoes:
+            return alteracoes
+        logging.info(f"Alteração detectada na região {self.regiao.localizador}:\n"
+                     + "\n".join(formatar_alteracoes(alteracoes)))
+        # O número é procurado só no texto da região, remontado a partir das partes já baixadas
+        match = re.search(re.escape(self.numero), self.regiao.texto)
+        if match:
+            logging.info(f"Número {self.numero} encontrado na região, posição {match.start()} (Regex)")
+        return alteracoes
+
+    def _pids_navegadores(self):
+        """
+        PIDs dos navegadores usados por este monitor (driver próprio ou os do pool).
+        """
+        if self.driver:
+            return [self.driver.service.process.pid]
+        return self.pool.pids() if self.pool else []
 
     def finalizar(self):
         """
         Finaliza o driver do Selenium, fechando o navegador e liberando os recursos.
         """
-        self.driver.quit()  # Fecha o WebDriver, liberando os recursos
+        if self._leitor and self.pool:
+            self.pool.devolver(self._leitor.driver)  # Devolve o driver reservado pelo modo persistente
+        self._leitor = None
+        if self._sessao:  # Drivers emprestados são fechados pelo pool
+            self._sessao.fechar()  # Fecha o WebDriver, liberando os recursos
+        if self.estado:
+            self.estado.descarregar()  # Grava o último estado antes de sair
 
 # Função principal que executa o script
 def main():
@@ -128,8 +305,12 @@ def main():
         url = input("Informe a URL a ser monitorada: ").strip()  # Solicita a URL para monitoramento
         numero = input("Informe o número que deseja monitorar: ").strip()  # Solicita o número a ser monitorado
 
-        # Cria uma instância do monitor para a URL e número fornecidos
-        monitor = MonitorHTML(url, numero)
+        regiao = input("Região a acompanhar (seletor CSS ou XPath; vazio = página inteira): ").strip() or None
+
+        # Cria uma instância do monitor para a URL e número fornecidos; a região é
+        # acompanhada com a página aberta, relendo só os resumos a cada verificação
+        monitor = MonitorHTML(url, numero, regiao=regiao, persistente=regiao is not None,
+                              estado=EstadoPersistente())
 
         # Verifica se a URL fornecida é válida
         if not monitor.validar_url():
@@ -150,4 +331,5 @@ def main():
 
 # Inicia a execução do script chamando a função principal
 if __name__ == "__main__":
+    configurar_log('monitoramento.log', terminal=False)  # Logs gravados por uma thread em segundo plano
     main()
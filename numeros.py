@@ -0,0 +1,147 @@
+import re  # Limpeza do texto coletado
+from decimal import Decimal, InvalidOperation
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# (separador de milhar, separador decimal) por localidade
+LOCALIDADES: Dict[str, Tuple[str, str]] = {
+    "pt_BR": (".", ","),
+    "de_DE": (".", ","),
+    "es_ES": (".", ","),
+    "en_US": (",", "."),
+    "en_GB": (",", "."),
+    "fr_FR": (" ", ","),
+}
+LOCALIDADE_PADRAO = "pt_BR"
+
+# Sufixos de escala usados em sites de cotação (134,5K / 2,1 mi / 3.4B)
+SUFIXOS: Dict[str, Decimal] = {
+    "k": Decimal(10) ** 3, "mil": Decimal(10) ** 3,
+    "m": Decimal(10) ** 6, "mi": Decimal(10) ** 6, "mm": Decimal(10) ** 6,
+    "b": Decimal(10) ** 9, "bi": Decimal(10) ** 9, "bn": Decimal(10) ** 9,
+    "t": Decimal(10) ** 12, "tri": Decimal(10) ** 12,
+}
+
+_NUMERO = re.compile(
+    r"(?P<sinal>[-−+])?\s*(?P<moeda>[^\d\s.,()+−-]{0,4})\s*(?P<corpo>\d(?:[\d.,']|[\s  ](?=\d{3}(?!\d)))*)"
+    r"\s*(?P<sufixo>[A-Za-z]{1,3})?\b"
+)
+_ESPACOS = re.compile(r"[\s'  ]")
+
+
+def _separadores_automaticos(corpo: str, padrao: str) -> Tuple[str, str]:
+    """
+    Deduz (milhar, decimal) a partir do próprio texto; só recorre à localidade
+    padrão quando o texto é ambíguo (ex: "134,580" ou "5.718").
+    """
+    ponto, virgula = corpo.rfind("."), corpo.rfind(",")
+    if ponto >= 0 and virgula >= 0:
+        return (",", ".") if ponto > virgula else (".", ",")
+    separador = "." if ponto >= 0 else "," if virgula >= 0 else None
+    if separador is None:
+        return LOCALIDADES[padrao]
+    if corpo.count(separador) > 1:
+        return separador, ("," if separador == "." else ".")
+    casas = len(corpo) - corpo.rfind(separador) - 1
+    if casas != 3:
+        return ("," if separador == "." else "."), separador
+    return LOCALIDADES[padrao]
+
+
+def interpretar_numero(texto: str, localidade: str = "auto",
+                       padrao: str = LOCALIDADE_PADRAO) -> Optional[Decimal]:
+    """
+    Converte o texto coletado da página em Decimal.
+
+    Aceita prefixos/sufixos de moeda (R$, US$, €), sinal negativo ou parênteses,
+    sufixos de escala (K, M, B, mil, mi, bi) e percentuais. Com `localidade="auto"`
+    os separadores são deduzidos do texto; nos casos ambíguos vale `padrao`.
+    Retorna None quando não há número no texto.
+    """
+    if not texto:
+        return None
+    encontrado = _NUMERO.search(texto)
+    if not encontrado:
+        return None
+    corpo = _ESPACOS.sub("", encontrado.group("corpo")).rstrip(".,")
+    if localidade == "auto":
+        milhar, decimal = _separadores_automaticos(corpo, padrao)
+    else:
+        milhar, decimal = LOCALIDADES[localidade]
+    if milhar.strip():
+        corpo = corpo.replace(milhar, "")
+    corpo = corpo.replace(decimal, ".")
+    try:
+        numero = Decimal(corpo)
+    except InvalidOperation:
+        return None
+
+    sufixo = (encontrado.group("sufixo") or "").lower()
+    if sufixo in SUFIXOS:
+        numero *= SUFIXOS[sufixo]
+    prefixo = texto[:encontrado.start("corpo")]
+    negativo = encontrado.group("sinal") in ("-", "−") or ("(" in prefixo and ")" in texto[encontrado.end("corpo"):])
+    return -numero if negativo else numero
+
+
+def para_float(texto: str, localidade: str = "auto", padrao: str = LOCALIDADE_PADRAO) -> Optional[float]:
+    numero = interpretar_numero(texto, localidade, padrao)
+    return float(numero) if numero is not None else None
+
+
+def normalizar_lote(textos: Iterable[str], localidade: str = "auto", padrao: str = LOCALIDADE_PADRAO):
+    """
+    Converte muitos textos de uma vez em float (NaN onde não há número).
+
+    Cada texto distinto é interpretado uma única vez e o resultado é espalhado para as
+    repetições. Com NumPy instalado, devolve um ndarray float64; sem ele, uma lista.
+    """
+    if np is not None:
+        entrada = np.asarray(list(textos), dtype=object)
+        if entrada.size == 0:
+            return np.empty(0, dtype=np.float64)
+        unicos, inverso = np.unique(entrada.astype(str), return_inverse=True)
+        valores = np.fromiter(
+            (_float_ou_nan(texto, localidade, padrao) for texto in unicos), dtype=np.float64, count=len(unicos)
+        )
+        return valores[inverso]
+
+    cache: Dict[str, float] = {}
+    resultado: List[float] = []
+    for texto in textos:
+        valor = cache.get(texto)
+        if valor is None:
+            valor = cache[texto] = _float_ou_nan(texto, localidade, padrao)
+        resultado.append(valor)
+    return resultado
+
+
+def _float_ou_nan(texto: str, localidade: str, padrao: str) -> float:
+    numero = interpretar_numero(texto, localidade, padrao)
+    return float(numero) if numero is not None else float("nan")
+
+
+def variacao_percentual(anterior: Decimal, atual: Decimal) -> Optional[Decimal]:
+    """
+    Variação de `anterior` para `atual` em pontos percentuais (None se anterior for zero).
+    """
+    if not anterior:
+        return None
+    return (atual - anterior) / abs(anterior) * 100
+
+
+def cruzou_limite(anterior: Optional[Decimal], atual: Decimal, limite: Decimal) -> Optional[str]:
+    """
+    Retorna "acima" ou "abaixo" quando o valor atravessa o limite entre duas leituras.
+    """
+    if anterior is None:
+        return None
+    if anterior < limite <= atual:
+        return "acima"
+    if anterior > limite >= atual:
+        return "abaixo"
+    return None
@@ -0,0 +1,159 @@
+import logging  # Registro de logs
+from abc import ABC, abstractmethod
+from typing import Iterator, List, Optional, Tuple
+
+# Instala um MutationObserver no elemento monitorado (seletor CSS ou XPath).
+# Cada mudança de texto é guardada em uma fila que o Python consome com `proximo()`,
+# uma Promise que só resolve quando há mudança.
+# Um segundo observador relocaliza o elemento quando o site o substitui no DOM.
+SCRIPT_INSTALAR = """
+function (seletor, xpath) {
+    var estado = window.__exalgorit;
+    if (estado) { estado.observador.disconnect(); estado.vigia.disconnect(); }
+    estado = window.__exalgorit = {fila: [], espera: null, ultimo: null, elemento: null};
+
+    var localizar = function () {
+        if (seletor) { return document.querySelector(seletor); }
+        return document.evaluate(xpath, document, null,
+                                 XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    };
+    var publicar = function () {
+        if (!estado.elemento) { return; }
+        var valor = (estado.elemento.textContent || '').trim();
+        if (valor === estado.ultimo) { return; }
+        estado.ultimo = valor;
+        estado.fila.push({valor: valor, instante: Date.now()});
+        if (estado.fila.length > 1000) { estado.fila.shift(); }
+        if (estado.espera) {
+            var resolver = estado.espera;
+            estado.espera = null;
+            resolver(estado.fila.splice(0));
+        }
+    };
+    var observar = function () {
+        estado.observador.disconnect();
+        estado.elemento = localizar();
+        if (estado.elemento) {
+            estado.observador.observe(estado.elemento, {characterData: true, childList: true, subtree: true});
+        }
+        publicar();
+    };
+
+    estado.observador = new MutationObserver(publicar);
+    estado.vigia = new MutationObserver(function () {
+        if (!estado.elemento || !estado.elemento.isConnected) { observar(); }
+    });
+    estado.vigia.observe(document.documentElement, {childList: true, subtree: true});
+    estado.proximo = function (timeoutMs) {
+        if (estado.fila.length) { return Promise.resolve(estado.fila.splice(0)); }
+        return new Promise(function (resolver) {
+            estado.espera = resolver;
+            setTimeout(function () {
+                if (estado.espera === resolver) { estado.espera = null; resolver([]); }
+            }, timeoutMs);
+        });
+    };
+    observar();
+    return estado.elemento !== null;
+}
+"""
+
+# Aguarda a próxima leva de mudanças; devolve null se o observador sumiu (página recarregada)
+SCRIPT_AGUARDAR = """
+function (timeoutMs) {
+    if (!window.__exalgorit) { return Promise.resolve(null); }
+    return window.__exalgorit.proximo(timeoutMs);
+}
+"""
+
+Mudanca = Tuple[str, float]  # (valor, instante em segundos desde a época)
+
+
+def _converter(itens) -> List[Mudanca]:
+    return [(item["valor"], item["instante"] / 1000) for item in itens]
+
+
+class _Observador(ABC):
+    """
+    Base comum: instala o observador e entrega as mudanças à medida que chegam.
+    Cada biblioteca implementa como executar um script e como esperar a Promise.
+    """
+    def __init__(self, seletor: Optional[str] = None, xpath: Optional[str] = None):
+        if not seletor and not xpath:
+            raise ValueError("Informe um seletor CSS ou um XPath para observar.")
+        self.seletor = seletor
+        self.xpath = xpath
+
+    @abstractmethod
+    def _executar(self, script: str, *args):
+        ...
+
+    @abstractmethod
+    def _aguardar(self, timeout_ms: int):
+        ...
+
+    def instalar(self) -> bool:
+        """
+        Instala o observador na página. Retorna False se o elemento ainda não existe
+        (o observador continua vigiando o documento até ele aparecer).
+        """
+        encontrado = bool(self._executar(SCRIPT_INSTALAR, self.seletor, self.xpath))
+        if not encontrado:
+            logging.warning(f"Elemento observado ainda não encontrado: {self.seletor or self.xpath}")
+        return encontrado
+
+    def aguardar(self, timeout: float = 30.0) -> List[Mudanca]:
+        """
+        Bloqueia até haver mudanças ou até `timeout` segundos. Reinstala o observador
+        quando a página foi recarregada.
+        """
+        itens = self._aguardar(int(timeout * 1000))
+        if itens is None:
+            logging.info("Observador ausente na página; reinstalando.")
+            self.instalar()
+            return []
+        return _converter(itens)
+
+    def mudancas(self, timeout: float = 30.0) -> Iterator[Mudanca]:
+        """
+        Gera (valor, instante) a cada mudança do elemento, indefinidamente.
+        """
+        while True:
+            for mudanca in self.aguardar(timeout):
+                yield mudanca
+
+
+class ObservadorSelenium(_Observador):
+    """
+    Observador para Selenium: a espera é uma única chamada `execute_async_script`
+    que só retorna quando o valor muda.
+    """
+    def __init__(self, driver, seletor: Optional[str] = None, xpath: Optional[str] = None):
+        super().__init__(seletor, xpath)
+        self.driver = driver
+
+    def _executar(self, script: str, *args):
+        return self.driver.execute_script(f"return ({script}).apply(null, arguments);", *args)
+
+    def _aguardar(self, timeout_ms: int):
+        self.driver.set_script_timeout(timeout_ms / 1000 + 5)
+        return self.driver.execute_async_script(
+            f"var pronto = arguments[arguments.length - 1];"
+            f"({SCRIPT_AGUARDAR})(arguments[0]).then(pronto);",
+            timeout_ms,
+        )
+
+
+class ObservadorPlaywright(_Observador):
+    """
+    Observador para páginas Playwright (API síncrona).
+    """
+    def __init__(self, pagina, seletor: Optional[str] = None, xpath: Optional[str] = None):
+        super().__init__(seletor, xpath)
+        self.pagina = pagina
+
+    def _executar(self, script: str, *args):
+        return self.pagina.evaluate(f"(args) => ({script}).apply(null, args)", list(args))
+
+    def _aguardar(self, timeout_ms: int):
+        return self.pagina.evaluate(f"({SCRIPT_AGUARDAR})", timeout_ms)
@@ -0,0 +1,182 @@
+"""
+Leitura de um valor em uma página com Selenium (driver próprio ou emprestado de um pool),
+separada de monitor.py para que os backends a importem sem carregar o resto do monitor.
+"""
+import logging # Registro de logs
+import re      # Validação da URL
+from contextlib import contextmanager
+from typing import Dict, Optional  # Tipagem
+
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import TimeoutException, WebDriverException
+
+from pool_navegadores import PoolNavegadores, caminho_chromedriver, criar_driver_chrome, driver_responde # Navegadores compartilhados
+from resiliencia import SessaoNavegador # Driver próprio recriado após falhas
+from pagina_persistente import LeitorPersistente, PoliticaRecarga # Página aberta entre leituras
+from campos import Campos, aguardar_campos_selenium # Vários valores em uma só leitura
+from captura_rede import CapturaSelenium, Rede, filtro_rede # Valor lido dos frames de rede
+from bloqueio_recursos import Recursos, aplicar_selenium, politica_recursos # Sem imagens, fontes e anúncios
+from metricas import METRICAS # Latência da extração
+
+SELETOR_PRECO = '[data-test="instrument-price-last"]'
+
+class PaginaMonitorada:
+    def __init__(self, url: str, seletor: str = SELETOR_PRECO, pool: Optional[PoolNavegadores] = None,
+                 persistente: bool = False, politica: Optional[PoliticaRecarga] = None,
+                 xpath: Optional[str] = None, recursos: Recursos = "padrao", rede: Rede = None,
+                 espera_pool: float = 60.0):
+        self.url = url
+        self.seletor = seletor
+        self.xpath = xpath  # Quando informado, tem precedência sobre o seletor CSS
+        self.localizador = (By.XPATH, xpath) if xpath else (By.CSS_SELECTOR, seletor)
+        self.ultimo_valor = ""
+        self.pool = pool  # Com pool, o driver é emprestado a cada busca
+        self.persistente = persistente  # Mantém a página aberta e relê só o elemento
+        self.espera_pool = espera_pool  # Segundos aguardando um navegador livre para reservar no modo persistente
+        self.politica = politica
+        self.recursos = politica_recursos(recursos)  # Imagens, fontes e rastreadores que não são carregados
+        # Valor lido do tráfego da página (só no modo persistente, em que a página fica aberta)
+        self.rede = filtro_rede(rede)
+        self._captura: Optional[CapturaSelenium] = None
+        self.erro: Optional[Exception] = None  # Falha da última busca (None quando só faltou o elemento)
+        # Sem pool, o driver próprio é recriado (com espera crescente) quando trava ou morre
+        self._sessao = None if pool else SessaoNavegador(self._setup_driver, driver_responde, lambda d: d.quit())
+        self._leitor: Optional[LeitorPersistente] = None
+        if self._sessao:
+            self._sessao.obter()
+
+    @property
+    def driver(self):
+        return self._sessao.objeto if self._sessao else None
+
+    def _setup_driver(self):
+        try:
+            # Caminho do driver em cache entre execuções
+            return criar_driver_chrome(caminho_chromedriver(), log_rede=self.persistente and self.rede is not None)
+        except WebDriverException as e:
+            logging.critical(f"Erro ao iniciar WebDriver: {e}")
+            raise
+
+    def validar_url(self):
+        return re.match(r"^https?://[\w\.-]+", self.url)
+
+    @contextmanager
+    def _usar_driver(self):
+        with (self.pool.emprestar() if self.pool else self._sessao.usar()) as driver:
+            aplicar_selenium(driver, self.recursos)  # Drivers do pool podem vir de alvos com outra política
+            yield driver
+
+    def _leitor_persistente(self) -> LeitorPersistente:
+        # No modo persistente o driver do pool fica reservado para esta página até `fechar()`
+        if self._leitor is None:
+            if self.pool:
+                try:
+                    driver = self.pool.obter(timeout=self.espera_pool)
+                except TimeoutError:
+                    raise TimeoutError(f"Nenhum navegador livre no pool (limite {self.pool.tamanho}) para "
+                                       f"reservar a {self.url} após {self.espera_pool:.0f}s.") from None
+            else:
+                driver = self._sessao.obter()
+            aplicar_selenium(driver, self.recursos)
+            self._leitor = LeitorPersistente(driver, self.url, *self.localizador, self.politica)
+            if self.rede is not None:
+                self._captura = CapturaSelenium(driver, self.rede)
+        return self._leitor
+
+    def _recuperar_leitor(self):
+        """
+        Após uma leitura sem valor no modo persistente: se o navegador reservado morreu, ele é
+        liberado e a próxima leitura abre outro na mesma URL e localizador (o último valor é mantido).
+        """
+        if self._leitor is None:
+            return
+        if self._sessao:
+            if self._sessao.saudavel():
+                return
+        else:
+            try:
+                if driver_responde(self._leitor.driver):
+                    return
+            except Exception:
+                pass
+            logging.error(f"Navegador reservado para {self.url} não responde; será substituído.")
+            self.pool.devolver(self._leitor.driver, defeituoso=True)
+        self._leitor = None
+        self._captura = None
+
+    def buscar_numero(self) -> Optional[str]:
+        self.erro = None
+        try:
+            if self.persistente:
+                leitor = self._leitor_persistente()
+                texto = self._captura.coletar() if self._captura else None
+                if texto is not None:  # Último valor dos frames de rede: sem leitura do DOM
+                    logging.info(f"Valor capturado da rede: {texto}")
+                    return texto
+                with METRICAS.cronometrar("extracao_segundos", "Tempo de extração do valor", origem="navegador"):
+                    texto = leitor.ler()
+                if texto is None:
+                    self.erro = leitor.erro  # Falha do navegador, não só o elemento ausente
+                    self._recuperar_leitor()
+            else:
+                with self._usar_driver() as driver:
+                    driver.get(self.url)
+                    wait = WebDriverWait(driver, 20)  # tempo aumentado
+
+                    # Espera até o elemento com o data-test estar presente
+                    with METRICAS.cronometrar("extracao_segundos", "Tempo de extração do valor", origem="navegador"):
+                        elemento = wait.until(
+                            EC.presence_of_element_located(self.localizador)
+                        )
+                        texto = elemento.text.strip()
+            if texto:
+                logging.info(f"Valor localizado: {texto}")
+                return texto
+            else:
+                logging.warning("Elemento encontrado, mas sem texto.")
+            return None
+        except TimeoutException:
+            logging.warning(f"Elemento não encontrado em {self.url}.")
+            return None
+        except Exception as e:
+            logging.error(f"Erro na busca: {e}")
+            self.erro = e
+            return None
+
+    def buscar_campos(self, campos: Campos) -> Dict[str, Optional[str]]:
+        """
+        Lê vários valores da mesma página com um único carregamento e uma única chamada ao navegador.
+        """
+        self.erro = None
+        try:
+            with METRICAS.cronometrar("extracao_segundos", "Tempo de extração do valor", origem="navegador"):
+                if self.persistente:
+                    leitor = self._leitor_persistente()
+                    valores = leitor.ler_campos(campos)
+                    if not any(valores.values()):
+                        self.erro = leitor.erro
+                        self._recuperar_leitor()
+                    return valores
+                with self._usar_driver() as driver:
+                    driver.get(self.url)
+                    return aguardar_campos_selenium(driver, campos)
+        except Exception as e:
+            logging.error(f"Erro na busca dos campos: {e}")
+            self.erro = e
+            return {}
+
+    def fechar(self):
+        if self._leitor and self.pool:
+            if self._captura is not None:  # Fecha os WebSockets da página e esvazia o log antes de devolver
+                try:
+                    self._leitor.driver.get("about:blank")
+                    self._leitor.driver.get_log("performance")
+                except Exception:
+                    pass  # Driver com defeito: o pool o descarta na verificação
+            self.pool.devolver(self._leitor.driver)
+        self._leitor = None
+        self._captura = None
+        if self._sessao:  # Drivers do pool são fechados pelo próprio pool
+            self._sessao.fechar()
@@ -0,0 +1,158 @@
+import logging  # Registro de logs
+import time     # Idade da página carregada
+from typing import Dict, List, Optional
+
+from selenium.common.exceptions import StaleElementReferenceException, TimeoutException
+from selenium.webdriver.support.ui import WebDriverWait
+from selenium.webdriver.support import expected_conditions as EC
+
+from campos import Campos, aguardar_campos_selenium, extrair_campos_selenium
+from regiao import Alteracao, RegiaoMonitorada, executor_selenium
+
+
+class PoliticaRecarga:
+    """
+    Define quando uma página mantida aberta deve ser recarregada por completo.
+
+    - recarregar_ao_erro: recarrega depois de `erros_para_recarregar` falhas seguidas de leitura;
+    - a_cada_leituras: força uma recarga a cada N leituras (sites que congelam o valor);
+    - idade_maxima: força uma recarga quando a página está aberta há mais de N segundos.
+    """
+    def __init__(self, recarregar_ao_erro: bool = True, erros_para_recarregar: int = 1,
+                 a_cada_leituras: Optional[int] = None, idade_maxima: Optional[float] = None):
+        self.recarregar_ao_erro = recarregar_ao_erro
+        self.erros_para_recarregar = erros_para_recarregar
+        self.a_cada_leituras = a_cada_leituras
+        self.idade_maxima = idade_maxima
+
+    def deve_recarregar(self, leituras: int, erros_seguidos: int, idade: float) -> bool:
+        if self.recarregar_ao_erro and erros_seguidos >= self.erros_para_recarregar:
+            return True
+        if self.a_cada_leituras and leituras >= self.a_cada_leituras:
+            return True
+        if self.idade_maxima and idade >= self.idade_maxima:
+            return True
+        return False
+
+
+class LeitorPersistente:
+    """
+    Mantém a página aberta no driver e relê apenas o elemento localizado.
+
+    O elemento fica guardado entre leituras; se ficar obsoleto (stale) ele é
+    localizado de novo sem recarregar a página. A recarga completa (`driver.get`)
+    só acontece conforme a `PoliticaRecarga`.
+    """
+    def __init__(self, driver, url: str, por: str, localizador: str,
+                 politica: Optional[PoliticaRecarga] = None, espera: int = 20,
+                 ja_carregada: bool = False):
+        self.driver = driver
+        self.url = url
+        self.por = por
+        self.localizador = localizador
+        self.politica = politica or PoliticaRecarga()
+        self.espera = espera
+        self.recargas = 0
+        self.leituras = 0
+        self.erros_seguidos = 0
+        self.erro: Optional[Exception] = None  # Falha da última leitura (None quando só faltou o elemento)
+        self._elemento = None
+        self._carregada_em = time.monotonic() if ja_carregada else None
+
+    def carregar(self):
+        self.driver.get(self.url)
+        self._carregada_em = time.monotonic()
+        self._elemento = None
+        self.leituras = 0
+        self.erros_seguidos = 0
+        self.recargas += 1
+
+    def _localizar(self):
+        self._elemento = WebDriverWait(self.driver, self.espera).until(
+            EC.presence_of_element_located((self.por, self.localizador))
+        )
+        return self._elemento
+
+    def _garantir_carregada(self) -> bool:
+        """
+        Carrega ou recarrega a página se a política exigir; True quando acabou de carregar.
+        """
+        if self._carregada_em is None:
+            self.carregar()
+            return True
+        if self.politica.deve_recarregar(self.leituras, self.erros_seguidos,
+                                         time.monotonic() - self._carregada_em):
+            logging.info(f"Recarregando página monitorada: {self.url}")
+            self.carregar()
+            return True
+        return False
+
+    def ler(self) -> Optional[str]:
+        """
+        Retorna o texto atual do elemento, recarregando a página apenas quando a política exigir.
+        None quando o elemento não aparece ou em erro (guardado em `erro`).
+        """
+        self.erro = None
+        try:
+            self._garantir_carregada()  # Falha no carregamento também conta para a política de recarga
+            elemento = self._elemento or self._localizar()
+            try:
+                texto = elemento.text.strip()
+            except StaleElementReferenceException:
+                texto = self._localizar().text.strip()  # O DOM mudou: relocaliza sem recarregar
+            self.leituras += 1
+            self.erros_seguidos = 0
+            return texto
+        except TimeoutException:
+            self._elemento = None
+            self.erros_seguidos += 1
+            logging.warning(f"Elemento não encontrado na página persistente: {self.url}")
+            return None
+        except Exception as e:
+            self._elemento = None
+            self.erros_seguidos += 1
+            self.erro = e
+            logging.error(f"Erro ao ler elemento em página persistente: {e}")
+            return None
+
+    def ler_campos(self, campos: Campos) -> Dict[str, Optional[str]]:
+        """
+        Lê todos os campos em uma única chamada ao navegador (mesma política de recarga de `ler`).
+        """
+        self.erro = None
+        try:
+            if self._garantir_carregada():
+                valores = aguardar_campos_selenium(self.driver, campos, self.espera)
+            else:
+                valores = extrair_campos_selenium(self.driver, campos)
+        except Exception as e:
+            logging.error(f"Erro ao ler campos em página persistente: {e}")
+            self.erro = e
+            valores = {}
+        if any(valores.values()):
+            self.leituras += 1
+            self.erros_seguidos = 0
+        else:
+            self.erros_seguidos += 1
+        return valores
+
+    def ler_regiao(self, regiao: RegiaoMonitorada) -> Optional[List[Alteracao]]:
+        """
+        Verifica a região pelos resumos calculados na página (ver regiao.py); após uma
+        recarga, espera o elemento localizado aparecer antes de resumir.
+        """
+        self.erro = None
+        try:
+            if self._garantir_carregada():
+                self._localizar()
+            alteracoes = regiao.verificar(executor_selenium(self.driver))
+        except Exception as e:
+            logging.error(f"Erro ao verificar região em página persistente: {e}")
+            self.erro = e
+            alteracoes = None
+        if alteracoes is None:
+            self.erros_seguidos += 1
+        else:
+            self.leituras += 1
+            self.erros_seguidos = 0
+        return alteracoes
@@ -0,0 +1,189 @@
+import asyncio   # Um único loop para todas as páginas
+import logging   # Registro de logs
+import time      # Idade das páginas e espera após quedas do navegador
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from bloqueio_recursos import PERFIS, PoliticaRecursos, aplicar_playwright
+from campos import Campos, extrair_campos_playwright
+from captura_rede import CapturaPlaywright, FiltroRede
+from pagina_persistente import PoliticaRecarga
+from resiliencia import Backoff
+
+# (chave, url, localizador, campos, política de recursos[, filtro de rede]) de uma leitura em `ler_todas`
+Pedido = Tuple[Any, ...]
+
+
+class _PaginaAberta:
+    def __init__(self, pagina, contexto: int, url: str, recursos: PoliticaRecursos,
+                 captura: Optional[CapturaPlaywright] = None):
+        self.pagina = pagina
+        self.contexto = contexto
+        self.url = url
+        self.recursos = recursos
+        self.captura = captura
+        self.leituras = 0
+        self.erros_seguidos = 0
+        self.carregada_em = time.monotonic()
+
+
+class GrupoPaginasPlaywright:
+    """
+    Dezenas de páginas do Playwright assíncrono em um só Chromium e um só loop, no lugar
+    de um navegador e uma thread por alvo (como em `codigo2.monitorar_em_tempo_real`).
+
+    - cada chave (alvo) tem uma página mantida aberta e relida sem recarregar; a recarga
+      segue a `PoliticaRecarga` (por padrão, após 3 erros seguidos);
+    - as páginas são distribuídas entre até `contextos` contextos, sempre no menos ocupado;
+    - no máximo `max_simultaneas` navegações/leituras acontecem ao mesmo tempo;
+    - se o navegador morrer, tudo é recriado na próxima leitura, com espera crescente;
+    - com um `FiltroRede`, o valor vem dos frames da página (ver captura_rede) e cada tick
+      é repassado a `ao_receber(chave, valor)` na hora; o DOM só é lido sem frame recente.
+    """
+    def __init__(self, contextos: int = 4, max_simultaneas: int = 10, timeout: float = 10,
+                 politica: Optional[PoliticaRecarga] = None, headless: bool = True,
+                 ao_receber: Optional[Callable[[str, str], None]] = None):
+        self.max_contextos = max(1, contextos)
+        self.timeout_ms = timeout * 1000
+        self.politica = politica or PoliticaRecarga(erros_para_recarregar=3)
+        self.headless = headless
+        self.ao_receber = ao_receber
+        self.paginas: Dict[str, _PaginaAberta] = {}
+        self._playwright = None
+        self._navegador = None
+        self._contextos: List[Any] = []
+        self._semaforo = asyncio.Semaphore(max_simultaneas)
+        self._trava = asyncio.Lock()  # Início do navegador e criação de contextos
+        self._travas: Dict[str, asyncio.Lock] = {}  # Uma leitura por vez em cada página
+        self._backoff = Backoff(inicial=2, maximo=120)
+        self._tentar_apos = 0.0
+
+    async def _iniciar(self):
+        async with self._trava:
+            if self._navegador is not None and self._navegador.is_connected():
+                return
+            await self._descartar_navegador()
+            espera = self._tentar_apos - time.monotonic()
+            if espera > 0:
+                raise RuntimeError(f"Navegador indisponível; nova tentativa em {espera:.0f}s.")
+            try:
+                if self._playwright is None:
+                    from playwright.async_api import async_playwright
+                    self._playwright = await async_playwright().start()
+                self._navegador = await self._playwright.chromium.launch(headless=self.headless)
+            except Exception:
+                self._tentar_apos = time.monotonic() + self._backoff.proxima()
+                raise
+
+    async def _contexto_livre(self) -> int:
+        """
+        Índice do contexto com menos páginas; cria um novo enquanto houver menos que o máximo.
+        """
+        async with self._trava:
+            ocupacao = [0] * len(self._contextos)
+            for aberta in self.paginas.values():
+                ocupacao[aberta.contexto] += 1
+            if len(self._contextos) < self.max_contextos and (not ocupacao or min(ocupacao) > 0):
+                self._contextos.append(await self._navegador.new_context())
+                return len(self._contextos) - 1
+            return ocupacao.index(min(ocupacao))
+
+    async def _abrir(self, chave: str, url: str, recursos: PoliticaRecursos,
+                     rede: Optional[FiltroRede]) -> _PaginaAberta:
+        indice = await self._contexto_livre()
+        pagina = await self._contextos[indice].new_page()
+        captura = None
+        if rede is not None:  # Antes do goto, para pegar os WebSockets abertos no carregamento
+            captura = CapturaPlaywright(rede, lambda valor: self.ao_receber and self.ao_receber(chave, valor))
+            captura.instalar(pagina)
+        aberta = self.paginas[chave] = _PaginaAberta(pagina, indice, url, recursos, captura)
+        await aplicar_playwright(pagina, recursos)
+        await pagina.goto(url, wait_until="domcontentloaded", timeout=self.timeout_ms * 3)
+        return aberta
+
+    async def fechar_pagina(self, chave: str):
+        aberta = self.paginas.pop(chave, None)
+        if aberta is not None:
+            try:
+                await aberta.pagina.close()
+            except Exception as e:
+                logging.warning(f"Erro ao fechar página de '{chave}': {e}")
+
+    async def ler(self, chave: str, url: str, localizador: Optional[str] = None,
+                  campos: Optional[Campos] = None, recursos: PoliticaRecursos = PERFIS["padrao"],
+                  rede: Optional[FiltroRede] = None):
+        """
+        Texto do `localizador` (CSS, ou "xpath=...") ou dicionário dos `campos` na página da chave.
+        Com `rede`, o último valor capturado do tráfego, se recente. Uma URL, política de
+        recursos ou filtro de rede diferente do anterior reabre a página.
+        """
+        trava = self._travas.setdefault(chave, asyncio.Lock())
+        async with trava, self._semaforo:
+            if self._navegador is None or not self._navegador.is_connected():
+                await self._iniciar()
+            aberta = self.paginas.get(chave)
+            if aberta is not None and (aberta.url, aberta.recursos, aberta.captura and aberta.captura.filtro) != \
+                    (url, recursos, rede):
+                await self.fechar_pagina(chave)
+                aberta = None
+            if aberta is not None and aberta.captura is not None and not campos:
+                capturado = aberta.captura.recente()
+                if capturado is not None:
+                    return capturado  # Sem leitura do DOM nem recarga
+            try:
+                if aberta is None:
+                    aberta = await self._abrir(chave, url, recursos, rede)
+                elif self.politica.deve_recarregar(aberta.leituras, aberta.erros_seguidos,
+                                                   time.monotonic() - aberta.carregada_em):
+                    logging.info(f"Recarregando página monitorada: {url}")
+                    await aberta.pagina.reload(wait_until="domcontentloaded", timeout=self.timeout_ms * 3)
+                    aberta.leituras, aberta.erros_seguidos, aberta.carregada_em = 0, 0, time.monotonic()
+                if campos:  # Todos os campos em um único evaluate
+                    valor = await extrair_campos_playwright(aberta.pagina, campos)
+                else:
+                    valor = (await aberta.pagina.locator(localizador).first.inner_text(timeout=self.timeout_ms)).strip()
+            except Exception:
+                await self._registrar_falha(chave)
+                raise
+            aberta.leituras += 1
+            aberta.erros_seguidos = 0
+            self._backoff.reiniciar()
+            return valor
+
+    async def _registrar_falha(self, chave: str):
+        if self._navegador is not None and not self._navegador.is_connected():
+            logging.error("Navegador Playwright encerrado; será recriado com todas as páginas.")
+            self._tentar_apos = time.monotonic() + self._backoff.proxima()
+            await self._descartar_navegador()
+            return
+        aberta = self.paginas.get(chave)
+        if aberta is None:
+            return
+        if aberta.pagina.is_closed():
+            self.paginas.pop(chave, None)  # Página morta: reaberta na próxima leitura
+        else:
+            aberta.erros_seguidos += 1
+
+    async def ler_todas(self, pedidos: Iterable[Pedido]) -> List[Any]:
+        """
+        Lê várias páginas ao mesmo tempo (respeitando `max_simultaneas`); a falha de uma
+        leitura aparece como a exceção na posição dela, sem interromper as demais.
+        """
+        return await asyncio.gather(*(self.ler(*pedido) for pedido in pedidos), return_exceptions=True)
+
+    async def _descartar_navegador(self):
+        self.paginas.clear()
+        self._contextos = []
+        navegador, self._navegador = self._navegador, None
+        if navegador is not None:
+            try:
+                await navegador.close()
+            except Exception:
+                pass  # Navegador já encerrado
+
+    async def encerrar(self):
+        for chave in list(self.paginas):
+            await self.fechar_pagina(chave)
+        await self._descartar_navegador()
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
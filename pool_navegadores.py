@@ -0,0 +1,333 @@
+import json       # Cache do caminho do chromedriver
+import logging    # Registro de logs
+import os         # Caminho do cache
+import threading  # O pool é usado a partir das threads do Agendador
+import time       # Controle de timeout e idade dos navegadores
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, List, Optional
+
+from resiliencia import Backoff  # Espera entre criações que falham
+
+
+class _Navegador:
+    """
+    Navegador (ou aba/contexto) mantido pelo pool, com seus contadores de uso.
+    """
+    __slots__ = ("objeto", "pid", "navegacoes", "criado_em")
+
+    def __init__(self, objeto: Any, pid: Optional[int]):
+        self.objeto = objeto
+        self.pid = pid
+        self.navegacoes = 0
+        self.criado_em = time.monotonic()
+
+
+def rss_processo_mb(pid: int) -> float:
+    """
+    Soma a memória residente (RSS) do processo e de todos os seus filhos, em MB.
+    """
+    import psutil  # Importado só quando o limite de RSS está configurado
+    processo = psutil.Process(pid)
+    total = processo.memory_info().rss
+    for filho in processo.children(recursive=True):
+        try:
+            total += filho.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
+
+
+class PoolNavegadores:
+    """
+    Pool de navegadores reutilizáveis com semântica de empréstimo e devolução.
+
+    Os navegadores são criados sob demanda até `tamanho`, verificados antes de cada
+    empréstimo e reciclados após `max_navegacoes` usos ou quando a árvore de processos
+    ultrapassa `max_rss_mb`.
+    """
+    def __init__(self, fabrica: Callable[[], Any], tamanho: int = 4,
+                 max_navegacoes: Optional[int] = 200, max_rss_mb: Optional[float] = None,
+                 verificar: Optional[Callable[[Any], bool]] = None,
+                 fechar: Optional[Callable[[Any], None]] = None,
+                 obter_pid: Optional[Callable[[Any], Optional[int]]] = None):
+        if tamanho < 1:
+            raise ValueError("O tamanho do pool deve ser ao menos 1.")
+        self.fabrica = fabrica
+        self.tamanho = tamanho
+        self.max_navegacoes = max_navegacoes
+        self.max_rss_mb = max_rss_mb
+        self.verificar = verificar
+        self.fechar = fechar
+        self.obter_pid = obter_pid
+        self.estatisticas = {"criados": 0, "reciclados": 0, "descartados": 0, "emprestimos": 0}
+        self._livres: Deque[_Navegador] = deque()
+        self._emprestados: Dict[int, _Navegador] = {}
+        self._total = 0
+        self._fechado = False
+        self._cond = threading.Condition()
+        self._backoff = Backoff(inicial=1.0, maximo=60.0)  # Entre criações que falham (Chrome fora do ar, sem memória)
+        self._criar_apos = 0.0
+
+    def _aguardar_criacao(self, limite: Optional[float]):
+        espera = self._criar_apos - time.monotonic()
+        if espera <= 0:
+            return
+        if limite is not None and time.monotonic() + espera > limite:
+            raise TimeoutError(f"Criação de navegadores suspensa após falhas; nova tentativa em {espera:.0f}s.")
+        time.sleep(espera)
+
+    def _criar(self) -> _Navegador:
+        try:
+            objeto = self.fabrica()
+        except Exception as e:
+            espera = self._backoff.proxima()
+            self._criar_apos = time.monotonic() + espera
+            logging.error(f"Pool: falha ao criar navegador ({e}); próxima tentativa em {espera:.0f}s.")
+            raise
+        self._backoff.reiniciar()
+        pid = None
+        if self.obter_pid:
+            try:
+                pid = self.obter_pid(objeto)
+            except Exception:
+                pid = None
+        self.estatisticas["criados"] += 1
+        logging.info(f"Pool: navegador criado ({self._total}/{self.tamanho}).")
+        return _Navegador(objeto, pid)
+
+    def _descartar(self, item: _Navegador, motivo: str):
+        try:
+            if self.fechar:
+                self.fechar(item.objeto)
+        except Exception as e:
+            logging.warning(f"Pool: erro ao fechar navegador ({motivo}): {e}")
+        with self._cond:
+            self._total -= 1
+            self.estatisticas["reciclados" if motivo == "reciclagem" else "descartados"] += 1
+            self._cond.notify()
+
+    def _saudavel(self, item: _Navegador) -> bool:
+        if not self.verificar:
+            return True
+        try:
+            return bool(self.verificar(item.objeto))
+        except Exception:
+            return False
+
+    def _precisa_reciclar(self, item: _Navegador) -> bool:
+        if self.max_navegacoes and item.navegacoes >= self.max_navegacoes:
+            return True
+        if self.max_rss_mb and item.pid:
+            try:
+                return rss_processo_mb(item.pid) > self.max_rss_mb
+            except Exception:
+                return False
+        return False
+
+    def obter(self, timeout: Optional[float] = None) -> Any:
+        """
+        Empresta um navegador do pool, aguardando até `timeout` segundos se todos estiverem em uso.
+        """
+        limite = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while True:
+                    if self._fechado:
+                        raise RuntimeError("Pool de navegadores já foi encerrado.")
+                    if self._livres:
+                        item = self._livres.popleft()
+                        break
+                    if self._total < self.tamanho:
+                        self._total += 1
+                        item = None
+                        break
+                    restante = None if limite is None else limite - time.monotonic()
+                    if restante is not None and restante <= 0:
+                        raise TimeoutError("Nenhum navegador disponível no pool.")
+                    self._cond.wait(restante)
+
+            if item is None:
+                try:
+                    self._aguardar_criacao(limite)
+                    item = self._criar()
+                except Exception:
+                    with self._cond:
+                        self._total -= 1
+                        self._cond.notify()
+                    raise
+            elif not self._saudavel(item):
+                logging.warning("Pool: navegador não respondeu à verificação e será recriado.")
+                self._descartar(item, "falha")
+                continue
+
+            with self._cond:
+                self._emprestados[id(item.objeto)] = item
+                self.estatisticas["emprestimos"] += 1
+            return item.objeto
+
+    def garantir_tamanho(self, tamanho: int):
+        """
+        Aumenta o limite do pool para ao menos `tamanho` navegadores (nunca diminui).
+        """
+        with self._cond:
+            if tamanho > self.tamanho:
+                self.tamanho = tamanho
+                self._cond.notify_all()
+
+    def devolver(self, objeto: Any, defeituoso: bool = False):
+        """
+        Devolve um navegador ao pool. Navegadores defeituosos ou desgastados são fechados.
+        """
+        with self._cond:
+            item = self._emprestados.pop(id(objeto), None)
+        if item is None:
+            raise ValueError("Objeto devolvido não pertence a este pool.")
+        item.navegacoes += 1
+        if defeituoso or self._fechado:
+            self._descartar(item, "falha" if defeituoso else "encerramento")
+        elif self._precisa_reciclar(item):
+            self._descartar(item, "reciclagem")
+        else:
+            with self._cond:
+                self._livres.append(item)
+                self._cond.notify()
+
+    def pids(self) -> List[int]:
+        """
+        PIDs conhecidos dos navegadores do pool (livres e emprestados), para amostragem de recursos.
+        """
+        with self._cond:
+            itens = list(self._livres) + list(self._emprestados.values())
+        return [item.pid for item in itens if item.pid]
+
+    @contextmanager
+    def emprestar(self, timeout: Optional[float] = None):
+        """
+        Uso: `with pool.emprestar() as driver: ...`
+        """
+        objeto = self.obter(timeout)
+        defeituoso = False
+        try:
+            yield objeto
+        except BaseException:
+            defeituoso = not self._saudavel(self._emprestados[id(objeto)])
+            raise
+        finally:
+            self.devolver(objeto, defeituoso=defeituoso)
+
+    def encerrar(self):
+        """
+        Fecha todos os navegadores livres; os emprestados são fechados ao serem devolvidos.
+        """
+        with self._cond:
+            self._fechado = True
+            livres = list(self._livres)
+            self._livres.clear()
+            self._cond.notify_all()
+        for item in livres:
+            self._descartar(item, "encerramento")
+
+
+CACHE_DRIVER = os.path.join(os.path.expanduser("~"), ".cache", "exalgorit", "chromedriver.json")
+
+
+def caminho_chromedriver(arquivo_cache: str = CACHE_DRIVER, renovar: bool = False) -> Optional[str]:
+    """
+    Caminho do chromedriver, resolvido pelo webdriver_manager só na primeira vez (ou com
+    `renovar`, ex: após atualizar o Chrome) e guardado em `arquivo_cache`. Sem o
+    webdriver_manager instalado retorna None e o Selenium procura o driver sozinho.
+    """
+    if not renovar:
+        try:
+            with open(arquivo_cache, encoding="utf-8") as f:
+                caminho = json.load(f).get("caminho")
+            if caminho and os.path.isfile(caminho):
+                return caminho
+        except (OSError, ValueError):
+            pass
+
+    try:
+        from webdriver_manager.chrome import ChromeDriverManager  # Faz checagens de rede: só quando necessário
+    except ImportError:
+        logging.info("webdriver_manager não instalado; o Selenium localizará o chromedriver.")
+        return None
+    caminho = ChromeDriverManager().install()
+    os.makedirs(os.path.dirname(arquivo_cache), exist_ok=True)
+    temporario = f"{arquivo_cache}.tmp"
+    with open(temporario, "w", encoding="utf-8") as f:
+        json.dump({"caminho": caminho}, f)
+    os.replace(temporario, arquivo_cache)
+    logging.info(f"chromedriver resolvido e guardado em cache: {caminho}")
+    return caminho
+
+
+def criar_driver_chrome(caminho_driver: Optional[str] = None, timeout: int = 10, log_rede: bool = False):
+    """
+    Cria um Chrome headless com as mesmas opções usadas pelos monitores.
+    Com `log_rede`, os eventos de rede ficam disponíveis para captura_rede.CapturaSelenium.
+    """
+    from selenium import webdriver
+    from selenium.webdriver.chrome.options import Options
+    from selenium.webdriver.chrome.service import Service
+
+    options = Options()
+    options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    if log_rede:
+        from captura_rede import habilitar_log_rede
+        habilitar_log_rede(options)
+    service = Service(caminho_driver) if caminho_driver else Service()
+    driver = webdriver.Chrome(service=service, options=options)
+    driver.set_page_load_timeout(timeout)
+    return driver
+
+
+def driver_responde(driver) -> bool:
+    return driver.execute_script("return 1") == 1
+
+
+def _pid_driver(driver) -> Optional[int]:
+    return driver.service.process.pid
+
+
+def pool_chrome(tamanho: int = 4, caminho_driver: Optional[str] = None, timeout: int = 10,
+                max_navegacoes: Optional[int] = 200, max_rss_mb: Optional[float] = 600,
+                log_rede: bool = False) -> PoolNavegadores:
+    """
+    Pool de drivers Selenium/Chrome. O RSS medido inclui o chromedriver e os processos do Chrome.
+    """
+    return PoolNavegadores(
+        lambda: criar_driver_chrome(caminho_driver, timeout, log_rede),
+        tamanho=tamanho,
+        max_navegacoes=max_navegacoes,
+        max_rss_mb=max_rss_mb,
+        verificar=driver_responde,
+        fechar=lambda driver: driver.quit(),
+        obter_pid=_pid_driver,
+    )
+
+
+def pool_paginas_playwright(navegador, tamanho: int = 4,
+                            max_navegacoes: Optional[int] = 500, recursos="padrao") -> PoolNavegadores:
+    """
+    Pool de páginas Playwright (síncrono), cada uma em seu próprio contexto isolado,
+    compartilhando um único processo do Chromium. Cada contexto bloqueia os recursos
+    definidos por `recursos` (ver bloqueio_recursos).
+    """
+    from bloqueio_recursos import aplicar_playwright_sync, politica_recursos
+    politica = politica_recursos(recursos)
+
+    def criar_pagina():
+        contexto = navegador.new_context()
+        aplicar_playwright_sync(contexto, politica)
+        return contexto.new_page()
+
+    return PoolNavegadores(
+        criar_pagina,
+        tamanho=tamanho,
+        max_navegacoes=max_navegacoes,
+        verificar=lambda pagina: not pagina.is_closed(),
+        fechar=lambda pagina: pagina.context.close(),
+    )
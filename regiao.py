@@ -0,0 +1,158 @@
+import logging  # Registro de logs
+from difflib import SequenceMatcher  # Diferença entre as partes da região
+from typing import Callable, Dict, List, Optional, Tuple
+
+from campos import tipo_localizador
+
+# A região (seletor CSS ou XPath) é dividida em partes: os elementos filhos e os textos
+# soltos entre eles (ou a própria região, se não tiver filhos). A página calcula um
+# resumo FNV-1a do texto de cada parte e guarda textos e resumos consigo; só o resumo
+# da região atravessa a conexão a cada verificação. Quando ele muda, o Python pede os
+# resumos das partes e baixa apenas os textos das partes novas ou alteradas.
+SCRIPT_RESUMIR = """
+function (tipo, localizador) {
+    var regioes = window.__exalgoritRegioes = window.__exalgoritRegioes || {};
+    var el = null;
+    try {
+        el = tipo === 'xpath'
+            ? document.evaluate(localizador, document, null,
+                                XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue
+            : document.querySelector(localizador);
+    } catch (e) {
+        el = null;
+    }
+    if (!el) { delete regioes[localizador]; return null; }
+    var normalizar = function (texto) { return (texto || '').replace(/\\s+/g, ' ').trim(); };
+    var fnv = function (texto) {
+        var h = 0x811c9dc5;
+        for (var i = 0; i < texto.length; i++) {
+            h ^= texto.charCodeAt(i);
+            h = Math.imul(h, 0x01000193);
+        }
+        return ('0000000' + (h >>> 0).toString(16)).slice(-8);
+    };
+    var textos = [];
+    if (el.children.length) {
+        for (var no = el.firstChild; no; no = no.nextSibling) {
+            if (no.nodeType === 1 || no.nodeType === 3) {
+                var texto = normalizar(no.textContent);
+                if (texto) { textos.push(texto); }
+            }
+        }
+    } else {
+        textos.push(normalizar(el.textContent));
+    }
+    var resumos = textos.map(fnv);
+    regioes[localizador] = {textos: textos, resumos: resumos};
+    return fnv(resumos.join(','));
+}
+"""
+
+# Resumos das partes calculados na última chamada de SCRIPT_RESUMIR (null se a página recarregou)
+SCRIPT_RESUMOS = """
+function (localizador) {
+    var regiao = (window.__exalgoritRegioes || {})[localizador];
+    return regiao ? regiao.resumos : null;
+}
+"""
+
+# Textos das partes pedidas, da mesma leitura dos resumos (não do DOM atual)
+SCRIPT_TEXTOS = """
+function (localizador, indices) {
+    var regiao = (window.__exalgoritRegioes || {})[localizador];
+    return regiao ? indices.map(function (i) { return regiao.textos[i]; }) : null;
+}
+"""
+
+Executar = Callable[..., object]  # (script, *argumentos) -> resultado da função no navegador
+
+# (tipo, textos anteriores, textos atuais), com tipo "alterado", "inserido" ou "removido"
+Alteracao = Tuple[str, List[str], List[str]]
+
+_TIPOS = {"replace": "alterado", "insert": "inserido", "delete": "removido"}
+
+
+def executor_selenium(driver) -> Executar:
+    return lambda script, *args: driver.execute_script(f"return ({script}).apply(null, arguments);", *args)
+
+
+class RegiaoMonitorada:
+    """
+    Acompanha uma região da página trocando apenas resumos com o navegador e
+    produz a lista de partes alteradas, inseridas e removidas a cada mudança.
+    """
+    def __init__(self, localizador: str):
+        self.tipo, self.localizador = tipo_localizador(localizador)
+        self.resumo: Optional[str] = None
+        self.resumos: List[str] = []
+        self.textos: List[str] = []
+        self.estatisticas: Dict[str, int] = {"verificacoes": 0, "mudancas": 0, "textos_baixados": 0}
+
+    @property
+    def texto(self) -> str:
+        """
+        Texto atual da região, remontado a partir das partes já baixadas.
+        """
+        return "\n".join(self.textos)
+
+    def exportar(self) -> Dict[str, object]:
+        return {"resumo": self.resumo, "resumos": self.resumos, "textos": self.textos}
+
+    def restaurar(self, dados: Dict[str, object]):
+        """
+        Retoma a última leitura salva: a próxima verificação só acusa o que mudou desde ela.
+        """
+        resumos, textos = list(dados.get("resumos") or []), list(dados.get("textos") or [])
+        if len(resumos) == len(textos):
+            self.resumo, self.resumos, self.textos = dados.get("resumo"), resumos, textos
+
+    def verificar(self, executar: Executar) -> Optional[List[Alteracao]]:
+        """
+        [] se nada mudou, a lista de alterações se mudou, ou None se a região não foi encontrada.
+        A primeira leitura aparece como uma inserção de todas as partes.
+        """
+        self.estatisticas["verificacoes"] += 1
+        resumo = executar(SCRIPT_RESUMIR, self.tipo, self.localizador)
+        if resumo is None:
+            return None
+        if resumo == self.resumo:
+            return []
+        resumos = executar(SCRIPT_RESUMOS, self.localizador)
+        if resumos is None:
+            return None
+
+        blocos = SequenceMatcher(None, self.resumos, resumos, autojunk=False).get_opcodes()
+        indices = [j for operacao, _, _, j1, j2 in blocos if operacao in ("replace", "insert")
+                   for j in range(j1, j2)]
+        baixados = executar(SCRIPT_TEXTOS, self.localizador, indices) if indices else []
+        if baixados is None:
+            return None
+        novos = dict(zip(indices, baixados))
+        self.estatisticas["textos_baixados"] += len(indices)
+
+        textos: List[str] = []
+        alteracoes: List[Alteracao] = []
+        for operacao, i1, i2, j1, j2 in blocos:
+            if operacao == "equal":
+                textos += self.textos[i1:i2]
+                continue
+            atuais = [novos[j] for j in range(j1, j2)]
+            alteracoes.append((_TIPOS[operacao], self.textos[i1:i2], atuais))
+            textos += atuais
+        self.resumo, self.resumos, self.textos = resumo, resumos, textos
+        self.estatisticas["mudancas"] += 1
+        logging.debug(f"Região {self.localizador}: {len(alteracoes)} alteração(ões), "
+                      f"{len(indices)} de {len(resumos)} parte(s) baixada(s)")
+        return alteracoes
+
+
+def formatar_alteracoes(alteracoes: List[Alteracao]) -> List[str]:
+    """
+    Linhas no estilo diff ("- anterior" / "+ atual") para os logs.
+    """
+    linhas = []
+    for tipo, anteriores, atuais in alteracoes:
+        linhas.append(f"@@ {tipo} ({len(anteriores)} -> {len(atuais)})")
+        linhas += [f"- {texto}" for texto in anteriores]
+        linhas += [f"+ {texto}" for texto in atuais]
+    return linhas
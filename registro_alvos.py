@@ -0,0 +1,214 @@
+import asyncio  # Evento inicial para quem assina um alvo já em andamento
+import inspect  # Ouvintes assíncronos
+import logging  # Registro de logs
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+from agendador import Agendador, Alvo, EventoAlteracao, Ouvinte
+
+_PORTAS_PADRAO = {"http": 80, "https": 443}
+
+
+def normalizar_url(url: str) -> str:
+    """
+    Forma canônica da URL: esquema e host em minúsculas, sem porta padrão, sem fragmento,
+    parâmetros em ordem e sem a barra final do caminho.
+    """
+    partes = urlsplit(url.strip())
+    esquema = partes.scheme.lower()
+    host = (partes.hostname or "").lower()
+    if partes.port and partes.port != _PORTAS_PADRAO.get(esquema):
+        host = f"{host}:{partes.port}"
+    caminho = partes.path.rstrip("/") or "/"
+    consulta = urlencode(sorted(parse_qsl(partes.query, keep_blank_values=True)))
+    return urlunsplit((esquema, host, caminho, consulta, ""))
+
+
+def chave_compartilhada(alvo: Alvo) -> Tuple:
+    """
+    O que torna dois alvos a mesma busca: URL normalizada, localizador e o que muda a leitura.
+    """
+    seletor = alvo.seletor.strip() if alvo.seletor else None
+    xpath = alvo.xpath.strip() if alvo.xpath else None
+    campos = tuple(sorted((nome, loc.strip()) for nome, loc in alvo.campos.items())) if alvo.campos else None
+    return (normalizar_url(alvo.url), seletor, xpath, campos, repr(alvo.recursos), repr(alvo.rede))
+
+
+class _Compartilhado:
+    def __init__(self, alvo: Alvo, assinantes: Dict[str, Alvo]):
+        self.alvo = alvo  # Alvo da busca única, registrado no Agendador
+        self.assinantes = assinantes  # id do alvo do usuário -> alvo do usuário
+
+
+class RegistroAlvos:
+    """
+    Single-flight entre usuários: alvos com a mesma URL normalizada e o mesmo localizador
+    viram uma única busca no Agendador, no intervalo mais curto pedido entre eles.
+
+    Cada mudança da busca compartilhada é repassada a cada assinante como um
+    EventoAlteracao do próprio alvo dele (id, usuário, campo), então logs, regras de
+    alerta e séries continuam separados por usuário. As buscas crescem com os alvos
+    distintos, não com o número de usuários.
+    """
+    def __init__(self, agendador: Agendador):
+        self.agendador = agendador
+        self._compartilhados: Dict[Tuple, _Compartilhado] = {}
+        self._chaves: Dict[str, Tuple] = {}  # id do assinante -> chave do alvo compartilhado
+        self._por_id: Dict[str, _Compartilhado] = {}  # id do alvo compartilhado -> grupo
+        self._ouvintes: List[Ouvinte] = []
+        agendador.ao_alterar(self._repassar)
+
+    def ao_alterar(self, ouvinte: Ouvinte):
+        """
+        Registra uma função chamada a cada alteração, uma vez por assinante do alvo.
+        """
+        self._ouvintes.append(ouvinte)
+        return ouvinte
+
+    @property
+    def buscas(self) -> int:
+        return len(self._compartilhados)
+
+    def assinantes(self, alvo_id: str) -> List[Alvo]:
+        """
+        Alvos dos usuários atendidos pela busca compartilhada `alvo_id`.
+        """
+        grupo = self._por_id.get(alvo_id)
+        return list(grupo.assinantes.values()) if grupo else []
+
+    def compartilhado(self, alvo_id: str) -> Optional[str]:
+        """
+        Id da busca compartilhada que atende o alvo do usuário.
+        """
+        chave = self._chaves.get(alvo_id)
+        return self._compartilhados[chave].alvo.id if chave is not None else None
+
+    def _id_compartilhado(self, chave: Tuple, assinantes: Dict[str, Alvo], atual: Optional[str] = None) -> str:
+        """
+        Com um só assinante, o id do próprio alvo (logs, métricas e estado salvo continuam os dele);
+        com vários, host e localizador, numerados quando outra busca já usa o mesmo nome.
+        """
+        if len(assinantes) == 1:
+            return next(iter(assinantes))
+        base = next(iter(assinantes.values()))
+        localizador = base.seletor or base.xpath or ",".join(sorted(base.campos or ()))
+        nome = f"{base.host} {localizador}"
+        candidato, numero = nome, 1
+        while candidato != atual and (candidato in self._por_id or candidato in self._chaves):
+            numero += 1
+            candidato = f"{nome} ({numero})"
+        return candidato
+
+    def _montar(self, chave: Tuple, assinantes: Dict[str, Alvo], atual: Optional[str] = None) -> Alvo:
+        base = next(iter(assinantes.values()))
+        limites_min = [a.intervalo_min for a in assinantes.values() if a.intervalo_min is not None]
+        limites_max = [a.intervalo_max for a in assinantes.values() if a.intervalo_max is not None]
+        return Alvo(
+            self._id_compartilhado(chave, assinantes, atual),
+            base.url, base.seletor, base.xpath,
+            intervalo=min(a.intervalo for a in assinantes.values()),
+            usuario=", ".join(sorted({a.usuario for a in assinantes.values() if a.usuario})),
+            intervalo_min=min(limites_min) if limites_min else None,
+            intervalo_max=min(limites_max) if limites_max else None,
+            campos=base.campos, recursos=base.recursos, rede=base.rede,
+        )
+
+    def adicionar(self, alvo: Alvo) -> List[str]:
+        """
+        Registra o alvo do usuário; devolve os ids de buscas que deixaram de existir (a busca
+        individual de quem passou a compartilhar), para liberar o que o backend reservou para elas.
+        """
+        if alvo.id in self._chaves:
+            raise ValueError(f"Alvo '{alvo.id}' já está registrado.")
+        chave = chave_compartilhada(alvo)
+        grupo = self._compartilhados.get(chave)
+        self._chaves[alvo.id] = chave
+        if grupo is None:
+            assinantes = {alvo.id: alvo}
+            grupo = self._compartilhados[chave] = _Compartilhado(self._montar(chave, assinantes), assinantes)
+            self._por_id[grupo.alvo.id] = grupo
+            self.agendador.adicionar(grupo.alvo)
+            return []
+        grupo.assinantes[alvo.id] = alvo
+        liberados = self._reconfigurar(chave, grupo)
+        logging.info(f"Alvo '{alvo.id}' compartilha a busca de '{grupo.alvo.id}' "
+                     f"({len(grupo.assinantes)} assinante(s)).")
+        self._valores_atuais(grupo, alvo)
+        return liberados
+
+    def remover(self, alvo_id: str, esquecer_estado: bool = True) -> List[str]:
+        """
+        Cancela a assinatura; devolve, como `adicionar`, os ids de buscas que deixaram de existir.
+        Com `esquecer_estado=False` (alvo cedido a outro processo) o estado salvo é mantido.
+        """
+        chave = self._chaves.pop(alvo_id, None)
+        if chave is None:
+            return []
+        grupo = self._compartilhados[chave]
+        grupo.assinantes.pop(alvo_id, None)
+        if not grupo.assinantes:
+            del self._compartilhados[chave]
+            del self._por_id[grupo.alvo.id]
+            self.agendador.remover(grupo.alvo.id, esquecer_estado)
+            return [grupo.alvo.id]
+        return self._reconfigurar(chave, grupo)
+
+    def atualizar(self, alvo: Alvo) -> List[str]:
+        """
+        Aplica a nova configuração do alvo do usuário (ou o registra, se for novo); devolve,
+        como `adicionar`, os ids de buscas que deixaram de existir.
+        """
+        chave = self._chaves.get(alvo.id)
+        if chave is not None and chave == chave_compartilhada(alvo):
+            grupo = self._compartilhados[chave]
+            grupo.assinantes[alvo.id] = alvo
+            return self._reconfigurar(chave, grupo)
+        return self.remover(alvo.id) + self.adicionar(alvo)
+
+    def _reconfigurar(self, chave: Tuple, grupo: _Compartilhado) -> List[str]:
+        novo = self._montar(chave, grupo.assinantes, grupo.alvo.id)
+        atual = grupo.alvo
+        if novo.id != atual.id:  # Passou a ser (ou deixou de ser) compartilhada
+            grupo.alvo = novo
+            del self._por_id[atual.id]
+            self._por_id[novo.id] = grupo
+            self.agendador.renomear(atual.id, novo)
+            return [atual.id]
+        if (novo.intervalo, novo.intervalo_min, novo.intervalo_max, novo.usuario, novo.url) != \
+                (atual.intervalo, atual.intervalo_min, atual.intervalo_max, atual.usuario, atual.url):
+            grupo.alvo = novo
+            self.agendador.atualizar(novo)
+        return []
+
+    def _valores_atuais(self, grupo: _Compartilhado, alvo: Alvo):
+        """
+        Quem entra em uma busca já em andamento recebe o valor atual como primeira leitura.
+        """
+        valores = self.agendador.ultimos_valores
+        eventos = [EventoAlteracao(alvo, None, valores[grupo.alvo.chave(campo)], campo=campo)
+                   for campo in (alvo.campos or [None]) if valores.get(grupo.alvo.chave(campo)) is not None]
+        if not eventos:
+            return
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:  # Fora do loop: o assinante recebe o valor na próxima alteração
+            return
+        for evento in eventos:
+            loop.create_task(self._emitir(evento))
+
+    async def _repassar(self, evento: EventoAlteracao):
+        grupo = self._por_id.get(evento.alvo.id)
+        if grupo is None:
+            return
+        for alvo in list(grupo.assinantes.values()):
+            await self._emitir(EventoAlteracao(alvo, evento.valor_anterior, evento.valor_atual,
+                                               evento.instante, evento.campo))
+
+    async def _emitir(self, evento: EventoAlteracao):
+        for ouvinte in self._ouvintes:
+            try:
+                resultado = ouvinte(evento)
+                if inspect.isawaitable(resultado):
+                    await resultado
+            except Exception as e:
+                logging.error(f"Erro no tratamento do evento {evento}: {e}")
@@ -0,0 +1,321 @@
+import asyncio    # Verificação periódica de inatividade
+import heapq      # Fila de prazos para a regra de inatividade
+import json       # Serialização dos alertas
+import logging    # Registro de logs
+import queue      # Alertas aguardando as saídas
+import sys        # Saída padrão
+import threading  # Escrita concorrente no arquivo de alertas
+import time       # Instantes das atualizações
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from decimal import Decimal
+from typing import Callable, Deque, Dict, List, Optional, Tuple
+
+from numeros import cruzou_limite, interpretar_numero, variacao_percentual
+
+
+class Alerta:
+    """
+    Resultado do disparo de uma regra.
+    """
+    def __init__(self, regra: "Regra", alvo_id: str, mensagem: str, valor: Optional[Decimal], instante: float):
+        self.regra = regra
+        self.alvo_id = alvo_id
+        self.mensagem = mensagem
+        self.valor = valor
+        self.instante = instante
+
+    def como_dict(self) -> dict:
+        return {
+            "regra": self.regra.nome,
+            "alvo": self.alvo_id,
+            "mensagem": self.mensagem,
+            "valor": str(self.valor) if self.valor is not None else None,
+            "instante": self.instante,
+        }
+
+    def __repr__(self):
+        return f"Alerta({self.regra.nome!r}, {self.alvo_id!r}, {self.mensagem!r})"
+
+
+class Regra(ABC):
+    """
+    Base das regras. `atualizar` é chamada a cada novo valor do alvo e deve ser O(1)
+    (amortizado); devolve a mensagem do alerta ou None.
+    """
+    def __init__(self, alvo_id: str, nome: Optional[str] = None):
+        self.alvo_id = alvo_id
+        self.nome = nome or f"{type(self).__name__}:{alvo_id}"
+
+    @abstractmethod
+    def atualizar(self, valor: Decimal, instante: float) -> Optional[str]:
+        ...
+
+
+class RegraLimite(Regra):
+    """
+    Dispara quando o valor cruza `limite` (em qualquer direção ou só em `direcao`).
+    """
+    def __init__(self, alvo_id: str, limite, direcao: Optional[str] = None, nome: Optional[str] = None):
+        super().__init__(alvo_id, nome)
+        self.limite = Decimal(str(limite))
+        self.direcao = direcao  # "acima", "abaixo" ou None
+        self._anterior: Optional[Decimal] = None
+
+    def atualizar(self, valor, instante):
+        sentido = cruzou_limite(self._anterior, valor, self.limite)
+        self._anterior = valor
+        if sentido and (self.direcao is None or sentido == self.direcao):
+            return f"Valor cruzou {self.limite} para {sentido}: {valor}"
+        return None
+
+
+class _JanelaMinMax:
+    """
+    Mínimo e máximo de uma janela deslizante de tempo com deques monotônicas:
+    cada ponto entra e sai uma única vez, O(1) amortizado por atualização.
+    """
+    def __init__(self, janela: float):
+        self.janela = janela
+        self._minimos: Deque[Tuple[float, Decimal]] = deque()
+        self._maximos: Deque[Tuple[float, Decimal]] = deque()
+
+    def adicionar(self, valor: Decimal, instante: float):
+        while self._minimos and self._minimos[-1][1] >= valor:
+            self._minimos.pop()
+        while self._maximos and self._maximos[-1][1] <= valor:
+            self._maximos.pop()
+        self._minimos.append((instante, valor))
+        self._maximos.append((instante, valor))
+        limite = instante - self.janela
+        while self._minimos[0][0] < limite:
+            self._minimos.popleft()
+        while self._maximos[0][0] < limite:
+            self._maximos.popleft()
+
+    @property
+    def minimo(self) -> Decimal:
+        return self._minimos[0][1]
+
+    @property
+    def maximo(self) -> Decimal:
+        return self._maximos[0][1]
+
+
+class RegraVariacaoJanela(Regra):
+    """
+    Dispara quando o valor atual se afasta `percentual`% do mínimo ou do máximo
+    observado nos últimos `janela` segundos. Dispara uma vez por direção e só volta a
+    disparar depois que a variação fica de novo abaixo do percentual.
+    """
+    def __init__(self, alvo_id: str, percentual, janela: float, nome: Optional[str] = None):
+        super().__init__(alvo_id, nome)
+        self.percentual = Decimal(str(percentual))
+        self._janela = _JanelaMinMax(janela)
+        self._disparada: Optional[str] = None  # "alta" ou "queda" enquanto a variação segue acima do percentual
+
+    def atualizar(self, valor, instante):
+        self._janela.adicionar(valor, instante)
+        alta = variacao_percentual(self._janela.minimo, valor)
+        queda = variacao_percentual(self._janela.maximo, valor)
+        if alta is not None and alta >= self.percentual:
+            if self._disparada == "alta":
+                return None
+            self._disparada = "alta"
+            return f"Alta de {alta:.2f}% em {self._janela.janela:g}s (mínimo {self._janela.minimo}): {valor}"
+        if queda is not None and -queda >= self.percentual:
+            if self._disparada == "queda":
+                return None
+            self._disparada = "queda"
+            return f"Queda de {-queda:.2f}% em {self._janela.janela:g}s (máximo {self._janela.maximo}): {valor}"
+        self._disparada = None  # Voltou para dentro do percentual: a regra é rearmada
+        return None
+
+
+class RegraMinMaxMovel(Regra):
+    """
+    Dispara quando o valor estabelece nova mínima ou máxima da janela móvel de `janela` segundos.
+    """
+    def __init__(self, alvo_id: str, janela: float, nome: Optional[str] = None):
+        super().__init__(alvo_id, nome)
+        self._janela = _JanelaMinMax(janela)
+        self._pontos = 0
+
+    def atualizar(self, valor, instante):
+        self._janela.adicionar(valor, instante)
+        self._pontos += 1
+        if self._pontos < 2:
+            return None
+        if valor == self._janela.maximo and self._janela.maximo != self._janela.minimo:
+            return f"Nova máxima em {self._janela.janela:g}s: {valor}"
+        if valor == self._janela.minimo and self._janela.maximo != self._janela.minimo:
+            return f"Nova mínima em {self._janela.janela:g}s: {valor}"
+        return None
+
+
+class RegraInatividade(Regra):
+    """
+    Dispara quando o alvo fica `segundos` sem atualização. É verificada pelo
+    `MotorRegras.verificar_inatividade`, não a cada valor.
+    """
+    def __init__(self, alvo_id: str, segundos: float, nome: Optional[str] = None):
+        super().__init__(alvo_id, nome)
+        self.segundos = segundos
+        self.ultimo_instante: Optional[float] = None
+        self.alertado = False
+
+    def atualizar(self, valor, instante):
+        self.ultimo_instante = instante
+        self.alertado = False
+        return None
+
+
+# === Saídas de alerta ===
+
+class SaidaTerminal:
+    def __call__(self, alerta: Alerta):
+        print(f"[ALERTA] {alerta.alvo_id}: {alerta.mensagem}", file=sys.stdout, flush=True)
+
+
+class SaidaArquivo:
+    """
+    Acrescenta cada alerta como uma linha JSON no arquivo.
+    """
+    def __init__(self, caminho: str = "alertas.jsonl"):
+        self.caminho = caminho
+        self._trava = threading.Lock()
+
+    def __call__(self, alerta: Alerta):
+        linha = json.dumps(alerta.como_dict(), ensure_ascii=False)
+        with self._trava, open(self.caminho, "a", encoding="utf-8") as f:
+            f.write(linha + "\n")
+
+
+class SaidaWebhook:
+    """
+    Envia o alerta como JSON via POST para a URL configurada.
+    """
+    def __init__(self, url: str, timeout: int = 5):
+        import requests
+        self.url = url
+        self.timeout = timeout
+        self.sessao = requests.Session()
+
+    def __call__(self, alerta: Alerta):
+        self.sessao.post(self.url, json=alerta.como_dict(), timeout=self.timeout)
+
+
+Saida = Callable[[Alerta], None]
+
+
+class MotorRegras:
+    """
+    Tabela de regras indexada por alvo: cada atualização avalia apenas as regras
+    daquele alvo, e os alertas são entregues às saídas registradas.
+
+    As saídas (webhook, arquivo) rodam em uma thread própria, na ordem dos alertas: uma
+    saída lenta não atrasa o Agendador que chamou `ao_alterar`. `encerrar()` entrega o
+    que estiver pendente.
+    """
+    def __init__(self, saidas: Optional[List[Saida]] = None):
+        self.saidas: List[Saida] = list(saidas or [])
+        self._regras: Dict[str, List[Regra]] = defaultdict(list)
+        self._prazos: List[Tuple[float, int, RegraInatividade]] = []  # Heap de prazos de inatividade
+        self._sequencia = 0
+        self._fila: "queue.Queue[Optional[Alerta]]" = queue.Queue()
+        self._entregador: Optional[threading.Thread] = None
+
+    def adicionar(self, regra: Regra) -> Regra:
+        self._regras[regra.alvo_id].append(regra)
+        return regra
+
+    def remover_alvo(self, alvo_id: str):
+        self._regras.pop(alvo_id, None)
+
+    def regras(self, alvo_id: str) -> List[Regra]:
+        return list(self._regras.get(alvo_id, ()))
+
+    def _emitir(self, alerta: Alerta):
+        logging.warning(f"Alerta '{alerta.regra.nome}' em '{alerta.alvo_id}': {alerta.mensagem}")
+        if not self.saidas:
+            return
+        if self._entregador is None:
+            self._entregador = threading.Thread(target=self._entregar, name="saidas-alertas", daemon=True)
+            self._entregador.start()
+        self._fila.put(alerta)
+
+    def _entregar(self):
+        while True:
+            alerta = self._fila.get()
+            if alerta is None:
+                return
+            for saida in self.saidas:
+                try:
+                    saida(alerta)
+                except Exception as e:
+                    logging.error(f"Erro ao enviar alerta para {type(saida).__name__}: {e}")
+
+    def encerrar(self, timeout: float = 10.0):
+        """
+        Entrega os alertas pendentes (por até `timeout` segundos) e encerra a thread das saídas.
+        """
+        if self._entregador is None:
+            return
+        self._fila.put(None)
+        self._entregador.join(timeout)
+        self._entregador = None
+
+    def atualizar(self, alvo_id: str, valor: Decimal, instante: Optional[float] = None) -> List[Alerta]:
+        """
+        Avalia as regras do alvo para o novo valor e devolve os alertas disparados.
+        """
+        instante = instante if instante is not None else time.time()
+        alertas = []
+        for regra in self._regras.get(alvo_id, ()):
+            mensagem = regra.atualizar(valor, instante)
+            if isinstance(regra, RegraInatividade):
+                self._sequencia += 1
+                heapq.heappush(self._prazos, (instante + regra.segundos, self._sequencia, regra))
+            if mensagem:
+                alerta = Alerta(regra, alvo_id, mensagem, valor, instante)
+                alertas.append(alerta)
+                self._emitir(alerta)
+        return alertas
+
+    def ao_alterar(self, evento) -> List[Alerta]:
+        """
+        Ouvinte para `Agendador.ao_alterar`: converte o texto do evento em número e avalia as regras.
+        """
+        valor = interpretar_numero(evento.valor_atual)
+        if valor is None:
+            return []
+        return self.atualizar(evento.chave, valor, evento.instante)
+
+    async def vigiar_inatividade(self, intervalo: float = 1.0):
+        """
+        Tarefa asyncio que verifica as regras de inatividade a cada `intervalo` segundos.
+        """
+        while True:
+            self.verificar_inatividade()
+            await asyncio.sleep(intervalo)
+
+    def verificar_inatividade(self, agora: Optional[float] = None) -> List[Alerta]:
+        """
+        Dispara as regras de inatividade vencidas; só olha o topo do heap de prazos.
+        """
+        agora = agora if agora is not None else time.time()
+        alertas = []
+        while self._prazos and self._prazos[0][0] <= agora:
+            prazo, _, regra = heapq.heappop(self._prazos)
+            if regra.alertado or regra.ultimo_instante is None:
+                continue
+            if regra.ultimo_instante + regra.segundos != prazo:
+                continue  # Prazo antigo: o alvo foi atualizado depois
+            if regra not in self._regras.get(regra.alvo_id, ()):
+                continue  # Regra removida
+            regra.alertado = True
+            alerta = Alerta(regra, regra.alvo_id, f"Sem atualização há {agora - regra.ultimo_instante:.0f}s",
+                            None, agora)
+            alertas.append(alerta)
+            self._emitir(alerta)
+        return alertas
@@ -0,0 +1,182 @@
+import logging    # Registro de logs
+import random     # Jitter das esperas
+import threading  # Sessões usadas a partir de threads do Agendador
+import time       # Esperas e instantes de reabertura
+from contextlib import contextmanager
+from typing import Any, Callable, Optional
+
+from metricas import METRICAS
+
+
+class Backoff:
+    """
+    Espera exponencial entre tentativas: inicial, 2x, 4x... até `maximo`, com jitter.
+    Volta ao início sozinha depois de `estavel` segundos sem pedir nova espera.
+    """
+    def __init__(self, inicial: float = 1.0, maximo: float = 60.0, fator: float = 2.0,
+                 jitter: float = 0.1, estavel: float = 300.0):
+        self.inicial = inicial
+        self.maximo = maximo
+        self.fator = fator
+        self.jitter = jitter
+        self.estavel = estavel
+        self.tentativas = 0
+        self._ultima: Optional[float] = None
+
+    def proxima(self) -> float:
+        agora = time.monotonic()
+        if self._ultima is not None and agora - self._ultima > self.estavel:
+            self.tentativas = 0
+        self._ultima = agora
+        espera = min(self.maximo, self.inicial * self.fator ** self.tentativas)
+        self.tentativas += 1
+        return espera * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def reiniciar(self):
+        self.tentativas = 0
+        self._ultima = None
+
+
+class Disjuntor:
+    """
+    Circuit breaker: abre após `limite` falhas seguidas e recusa buscas por `espera`
+    segundos. Depois disso deixa passar uma busca de teste (meio aberto): sucesso fecha,
+    falha reabre com o dobro da espera (até `espera_maxima`).
+    """
+    def __init__(self, limite: int = 5, espera: float = 30.0, espera_maxima: float = 600.0):
+        self.limite = limite
+        self.espera = espera
+        self.espera_maxima = espera_maxima
+        self.espera_atual = espera
+        self.falhas = 0
+        self.aberto_ate: Optional[float] = None
+        self.testando = False
+
+    @property
+    def estado(self) -> str:
+        if self.aberto_ate is None:
+            return "fechado"
+        return "meio_aberto" if self.testando or time.monotonic() >= self.aberto_ate else "aberto"
+
+    def permite(self, agora: Optional[float] = None) -> bool:
+        if self.aberto_ate is None:
+            return True
+        agora = time.monotonic() if agora is None else agora
+        if agora < self.aberto_ate or self.testando:
+            return False
+        self.testando = True  # Só a busca de teste passa até o resultado dela chegar
+        return True
+
+    def restante(self, agora: Optional[float] = None) -> float:
+        """
+        Segundos até a próxima busca poder passar (com um teste em andamento, a espera atual).
+        """
+        if self.aberto_ate is None:
+            return 0.0
+        if self.testando:
+            return self.espera_atual
+        agora = time.monotonic() if agora is None else agora
+        return max(0.0, self.aberto_ate - agora)
+
+    def registrar(self, sucesso: bool, agora: Optional[float] = None) -> Optional[str]:
+        """
+        Registra o resultado de uma busca. Retorna "aberto" ou "fechado" quando o estado muda.
+        """
+        agora = time.monotonic() if agora is None else agora
+        if sucesso:
+            estava_aberto = self.aberto_ate is not None
+            self.falhas = 0
+            self.aberto_ate = None
+            self.testando = False
+            self.espera_atual = self.espera
+            return "fechado" if estava_aberto else None
+        self.falhas += 1
+        if self.testando:
+            self.testando = False
+            self.espera_atual = min(self.espera_maxima, self.espera_atual * 2)
+            self.aberto_ate = agora + self.espera_atual
+            return "aberto"
+        if self.aberto_ate is None and self.falhas >= self.limite:
+            self.aberto_ate = agora + self.espera_atual
+            return "aberto"
+        return None
+
+
+class SessaoNavegador:
+    """
+    Navegador próprio (fora de um pool) que é recriado quando morre ou trava.
+
+    Depois de uma falha de uso, `verificar` confirma se o navegador ainda responde; se não,
+    ele é fechado e a próxima chamada a `obter()` cria outro. Criações seguidas que falham
+    (ou navegadores que morrem logo após criados) esperam cada vez mais entre tentativas.
+    """
+    def __init__(self, criar: Callable[[], Any], verificar: Optional[Callable[[Any], bool]] = None,
+                 fechar: Optional[Callable[[Any], None]] = None, backoff: Optional[Backoff] = None):
+        self.criar = criar
+        self.verificar = verificar
+        self.fechar_objeto = fechar
+        self.backoff = backoff or Backoff(inicial=2.0, maximo=120.0)
+        self.criacoes = 0
+        self._objeto = None
+        self._tentar_apos = 0.0
+        self._trava = threading.Lock()
+
+    @property
+    def objeto(self) -> Any:
+        return self._objeto
+
+    def obter(self) -> Any:
+        with self._trava:
+            if self._objeto is not None:
+                return self._objeto
+            espera = self._tentar_apos - time.monotonic()
+            if espera > 0:
+                raise RuntimeError(f"Navegador indisponível; nova tentativa em {espera:.0f}s.")
+            try:
+                self._objeto = self.criar()
+            except Exception:
+                self._tentar_apos = time.monotonic() + self.backoff.proxima()
+                raise
+            if self.criacoes:
+                logging.warning("Navegador recriado após falha.")
+                METRICAS.incrementar("navegadores_recriados_total", 1, "Navegadores recriados após falha")
+            self.criacoes += 1
+            return self._objeto
+
+    def saudavel(self) -> bool:
+        """
+        Confere se o navegador responde; se não, descarta-o e adia a próxima criação.
+        """
+        objeto = self._objeto
+        if objeto is None:
+            return False
+        try:
+            vivo = self.verificar(objeto) if self.verificar else True
+        except Exception:
+            vivo = False
+        if not vivo:
+            logging.error("Navegador não responde (travou ou foi encerrado); será recriado.")
+            self.descartar()
+            self._tentar_apos = time.monotonic() + self.backoff.proxima()
+        return vivo
+
+    @contextmanager
+    def usar(self):
+        objeto = self.obter()
+        try:
+            yield objeto
+        except BaseException:
+            self.saudavel()
+            raise
+
+    def descartar(self):
+        with self._trava:
+            objeto, self._objeto = self._objeto, None
+        if objeto is not None and self.fechar_objeto:
+            try:
+                self.fechar_objeto(objeto)
+            except Exception as e:
+                logging.warning(f"Erro ao fechar navegador descartado: {e}")
+
+    def fechar(self):
+        self.descartar()
@@ -0,0 +1,200 @@
+import bisect     # Busca por intervalo de tempo no índice
+import json       # Mapa de alvos
+import logging    # Registro de logs
+import mmap       # Leitura do arquivo de dados sem copiá-lo para a memória
+import os         # Manipulação de arquivos
+import struct     # Registros binários de tamanho fixo
+import threading  # Escritas vindas de várias threads
+import time       # Horário dos registros e das descargas
+from array import array
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+# Registro: id numérico do alvo (uint32), instante (float64, segundos) e valor (float64)
+FORMATO = struct.Struct("<Idd")
+Ponto = Tuple[float, float]  # (instante, valor)
+
+AGREGACOES = {
+    "ultimo": lambda valores: valores[-1],
+    "primeiro": lambda valores: valores[0],
+    "media": lambda valores: sum(valores) / len(valores),
+    "min": min,
+    "max": max,
+}
+
+
+class SerieTemporal:
+    """
+    Armazenamento compacto e somente-anexação dos valores observados.
+
+    As escritas são acumuladas e gravadas em lote; as leituras usam o arquivo mapeado
+    em memória e um índice por alvo (posições e instantes), montado na abertura.
+    """
+    def __init__(self, diretorio: str = "serie_dados", tamanho_lote: int = 256, intervalo_descarga: float = 5.0):
+        os.makedirs(diretorio, exist_ok=True)
+        self.diretorio = diretorio
+        self.tamanho_lote = tamanho_lote
+        self.intervalo_descarga = intervalo_descarga
+        self._caminho_dados = os.path.join(diretorio, "valores.bin")
+        self._caminho_alvos = os.path.join(diretorio, "alvos.json")
+        self._trava = threading.RLock()
+        self._pendentes: List[bytes] = []
+        self._ultima_descarga = time.monotonic()
+        self._alvos: Dict[str, int] = {}
+        self._nomes: Dict[int, str] = {}
+        self._posicoes: Dict[int, array] = {}
+        self._instantes: Dict[int, array] = {}
+        self._mapa: Optional[mmap.mmap] = None
+        self._total = 0
+
+        if os.path.exists(self._caminho_alvos):
+            with open(self._caminho_alvos, encoding="utf-8") as f:
+                self._alvos = json.load(f)
+            self._nomes = {numero: nome for nome, numero in self._alvos.items()}
+        self._arquivo = open(self._caminho_dados, "ab")
+        self._remapear()
+        self._indexar(0)
+
+    # === Escrita ===
+
+    def _id_numerico(self, alvo: str) -> int:
+        numero = self._alvos.get(alvo)
+        if numero is None:
+            numero = self._alvos[alvo] = len(self._alvos)
+            self._nomes[numero] = alvo
+            temporario = f"{self._caminho_alvos}.tmp"
+            with open(temporario, "w", encoding="utf-8") as f:
+                json.dump(self._alvos, f, ensure_ascii=False)
+            os.replace(temporario, self._caminho_alvos)
+        return numero
+
+    def registrar(self, alvo: str, valor: float, instante: Optional[float] = None):
+        """
+        Acrescenta um ponto; a gravação em disco ocorre em lote.
+        """
+        with self._trava:
+            registro = FORMATO.pack(self._id_numerico(alvo), instante if instante is not None else time.time(),
+                                    float(valor))
+            self._pendentes.append(registro)
+            if (len(self._pendentes) >= self.tamanho_lote
+                    or time.monotonic() - self._ultima_descarga >= self.intervalo_descarga):
+                self.descarregar()
+
+    def descarregar(self):
+        """
+        Grava os pontos pendentes e atualiza o índice.
+        """
+        with self._trava:
+            self._ultima_descarga = time.monotonic()
+            if not self._pendentes:
+                return
+            inicio = self._total
+            self._arquivo.write(b"".join(self._pendentes))
+            self._arquivo.flush()
+            self._pendentes.clear()
+            self._remapear()
+            self._indexar(inicio)
+
+    # === Índice ===
+
+    def _remapear(self):
+        tamanho = os.path.getsize(self._caminho_dados)
+        tamanho -= tamanho % FORMATO.size  # Ignora um registro final incompleto (gravação interrompida)
+        if self._mapa is not None:
+            self._mapa.close()
+            self._mapa = None
+        if tamanho:
+            with open(self._caminho_dados, "rb") as f:
+                self._mapa = mmap.mmap(f.fileno(), tamanho, access=mmap.ACCESS_READ)
+        self._total = tamanho // FORMATO.size
+
+    def _indexar(self, inicio: int):
+        if self._mapa is None:
+            return
+        dados = memoryview(self._mapa)[inicio * FORMATO.size:self._total * FORMATO.size]
+        try:
+            for deslocamento, (numero, instante, _) in enumerate(FORMATO.iter_unpack(dados), start=inicio):
+                posicoes = self._posicoes.setdefault(numero, array("q"))
+                instantes = self._instantes.setdefault(numero, array("d"))
+                if instantes and instante < instantes[-1]:  # Fora de ordem: mantém o índice ordenado
+                    i = bisect.bisect_right(instantes, instante)
+                    instantes.insert(i, instante)
+                    posicoes.insert(i, deslocamento)
+                else:
+                    instantes.append(instante)
+                    posicoes.append(deslocamento)
+        finally:
+            dados.release()
+
+    def _ponto(self, posicao: int) -> Ponto:
+        _, instante, valor = FORMATO.unpack_from(self._mapa, posicao * FORMATO.size)
+        return instante, valor
+
+    # === Consultas ===
+
+    @property
+    def alvos(self) -> List[str]:
+        return list(self._alvos)
+
+    def intervalo(self, alvo: str, inicio: Optional[float] = None, fim: Optional[float] = None) -> List[Ponto]:
+        """
+        Pontos do alvo com inicio <= instante <= fim.
+        """
+        with self._trava:
+            self.descarregar()
+            numero = self._alvos.get(alvo)
+            if numero is None or numero not in self._instantes:
+                return []
+            instantes = self._instantes[numero]
+            esquerda = 0 if inicio is None else bisect.bisect_left(instantes, inicio)
+            direita = len(instantes) if fim is None else bisect.bisect_right(instantes, fim)
+            posicoes = self._posicoes[numero]
+            return [self._ponto(posicoes[i]) for i in range(esquerda, direita)]
+
+    def ultimos(self, alvo: str, n: int = 1) -> List[Ponto]:
+        with self._trava:
+            self.descarregar()
+            numero = self._alvos.get(alvo)
+            if numero is None or numero not in self._posicoes:
+                return []
+            return [self._ponto(posicao) for posicao in self._posicoes[numero][-n:]]
+
+    def reamostrar(self, alvo: str, passo: float, inicio: Optional[float] = None, fim: Optional[float] = None,
+                   agregacao: str = "ultimo") -> List[Ponto]:
+        """
+        Agrupa os pontos em janelas de `passo` segundos e agrega cada janela
+        (ultimo, primeiro, media, min ou max). Janelas sem pontos são omitidas.
+        """
+        agregar = AGREGACOES[agregacao]
+        resultado: List[Ponto] = []
+        janela, valores = None, []
+        for instante, valor in self.intervalo(alvo, inicio, fim):
+            atual = instante - instante % passo
+            if atual != janela and valores:
+                resultado.append((janela, agregar(valores)))
+                valores = []
+            janela = atual
+            valores.append(valor)
+        if valores:
+            resultado.append((janela, agregar(valores)))
+        return resultado
+
+    def linhas_log(self, alvo: str, inicio: Optional[float] = None, fim: Optional[float] = None,
+                   rotulo: str = "") -> List[str]:
+        """
+        Visão em texto no formato dos arquivos de log de valores.
+        """
+        prefixo = f"{rotulo} | " if rotulo else ""
+        return [
+            f"{datetime.fromtimestamp(instante).strftime('%Y-%m-%d %H:%M:%S')} - {prefixo}Valor atual: {valor}"
+            for instante, valor in self.intervalo(alvo, inicio, fim)
+        ]
+
+    def fechar(self):
+        with self._trava:
+            self.descarregar()
+            self._arquivo.close()
+            if self._mapa is not None:
+                self._mapa.close()
+                self._mapa = None
+            logging.info(f"Série temporal fechada com {self._total} registro(s).")
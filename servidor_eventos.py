@@ -0,0 +1,388 @@
+"""
+Servidor local de eventos de alteração, por Server-Sent Events e WebSocket, no lugar de
+acompanhar `valores_alterados.log` / `valores_atualizados.log`:
+
+    GET /eventos?topicos=bitcoin,petr4.preco   SSE (text/event-stream)
+    GET /ws?topicos=bitcoin                    WebSocket; aceita {"assinar": [...]} e {"cancelar": [...]}
+    GET /topicos                               Último valor de cada tópico (JSON)
+
+O tópico é a chave do evento ("id" ou "id.campo"); sem `topicos`, o cliente recebe todos.
+Ao conectar, o cliente recebe primeiro o último valor de cada tópico assinado (tipo
+"snapshot") e depois cada alteração (tipo "valor").
+
+Tudo roda em um único loop asyncio em uma thread própria, então milhares de assinantes
+parados custam só a conexão e uma fila vazia. Cada assinante tem uma fila limitada; quando
+ela enche (cliente lento), a `politica` decide: "descartar_antigos" (padrão), "descartar_novos"
+ou "desconectar".
+"""
+import asyncio    # Loop único para todos os assinantes
+import base64     # Handshake do WebSocket
+import hashlib    # Handshake do WebSocket
+import json       # Mensagens
+import logging    # Registro de logs
+import struct     # Frames do WebSocket
+import threading  # Loop do servidor fora do loop/thread dos monitores
+import time       # Instante das mensagens publicadas fora de um EventoAlteracao
+from collections import deque
+from typing import Any, Deque, Dict, Iterable, Optional, Set
+from urllib.parse import parse_qs, urlsplit
+
+from metricas import METRICAS
+
+GUID_WEBSOCKET = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+POLITICAS = ("descartar_antigos", "descartar_novos", "desconectar")
+
+
+class _Assinante:
+    """
+    Fila limitada de mensagens de um cliente e os tópicos que ele assina (None = todos,
+    menos os `excluidos` que ele cancelou).
+    """
+    def __init__(self, topicos: Optional[Set[str]], maximo: int, politica: str,
+                 escritor: Optional[asyncio.StreamWriter] = None):
+        self.topicos = topicos
+        self.excluidos: Set[str] = set()
+        self.escritor = escritor
+        self.maximo = maximo
+        self.politica = politica
+        self.fila: Deque[str] = deque()
+        self.pronto = asyncio.Event()
+        self.desconectar = False
+        self.descartados = 0
+
+    def assina(self, topico: str) -> bool:
+        return (self.topicos is None or topico in self.topicos) and topico not in self.excluidos
+
+    def entregar(self, texto: str):
+        if self.desconectar:
+            return
+        if len(self.fila) >= self.maximo:
+            self.descartados += 1
+            METRICAS.incrementar("eventos_descartados_total", 1, "Eventos descartados por assinantes lentos",
+                                 politica=self.politica)
+            if self.politica == "descartar_novos":
+                return
+            if self.politica == "desconectar":
+                self.desconectar = True
+                self.pronto.set()
+                if self.escritor is not None:
+                    self.escritor.transport.abort()  # O envio pode estar parado no drain() do cliente lento
+                return
+            self.fila.popleft()
+        self.fila.append(texto)
+        self.pronto.set()
+
+    async def proximas(self, timeout: float):
+        """
+        Mensagens pendentes (lista vazia após `timeout` segundos sem nenhuma).
+        """
+        if not self.fila and not self.desconectar:
+            try:
+                await asyncio.wait_for(self.pronto.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        self.pronto.clear()
+        mensagens = list(self.fila)
+        self.fila.clear()
+        return mensagens
+
+
+class ServidorEventos:
+    """
+    Publica as alterações detectadas para assinantes SSE e WebSocket.
+    `publicar` e `publicar_evento` podem ser chamados de qualquer thread ou loop.
+    """
+    def __init__(self, porta: int = 9109, endereco: str = "127.0.0.1", tamanho_fila: int = 100,
+                 politica: str = "descartar_antigos", batimento: float = 15.0):
+        if politica not in POLITICAS:
+            raise ValueError(f"Política de fila desconhecida: '{politica}'. Opções: {', '.join(POLITICAS)}.")
+        self.endereco = endereco
+        self.porta = porta
+        self.tamanho_fila = tamanho_fila
+        self.politica = politica
+        self.batimento = batimento  # Segundos entre batimentos (detecta conexões mortas)
+        self.ultimos: Dict[str, Dict[str, Any]] = {}
+        self._assinantes: Set[_Assinante] = set()
+        self._conexoes: Dict[asyncio.Task, asyncio.StreamWriter] = {}  # Tarefa de cada conexão aberta
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._servidor: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+        self._iniciado = threading.Event()
+
+    @property
+    def assinantes(self) -> int:
+        return len(self._assinantes)
+
+    # ---------- Ciclo de vida ----------
+
+    def iniciar(self) -> "ServidorEventos":
+        self._thread = threading.Thread(target=self._executar, name="servidor-eventos", daemon=True)
+        self._thread.start()
+        self._iniciado.wait(10)
+        if self._servidor is None:
+            raise RuntimeError(f"Não foi possível abrir o servidor de eventos em {self.endereco}:{self.porta}.")
+        logging.info(f"Eventos disponíveis em http://{self.endereco}:{self.porta}/eventos (SSE) e /ws (WebSocket)")
+        return self
+
+    def _executar(self):
+        self._loop = asyncio.new_event_loop()
+        try:
+            self._servidor = self._loop.run_until_complete(
+                asyncio.start_server(self._atender, self.endereco, self.porta, backlog=1024)
+            )
+            self.porta = self._servidor.sockets[0].getsockname()[1]  # Porta 0 = escolhida pelo sistema
+        except OSError as e:
+            logging.error(f"Erro ao abrir o servidor de eventos: {e}")
+            return
+        finally:
+            self._iniciado.set()
+        try:
+            self._loop.run_forever()
+        finally:
+            self._loop.close()
+
+    def parar(self, timeout: float = 5.0):
+        """
+        Fecha o servidor e todas as conexões, espera as tarefas delas terminarem e só então
+        encerra o loop e a thread.
+        """
+        if self._loop is None or self._servidor is None or self._loop.is_closed():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._encerrar(timeout), self._loop).result(timeout + 1)
+        except Exception as e:
+            logging.warning(f"Servidor de eventos não encerrou as conexões a tempo: {e}")
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        if self._thread:
+            self._thread.join(timeout)
+
+    async def _encerrar(self, timeout: float):
+        self._servidor.close()
+        for assinante in list(self._assinantes):
+            assinante.desconectar = True
+            assinante.pronto.set()
+        for escritor in self._conexoes.values():
+            escritor.close()
+        tarefas = list(self._conexoes)
+        if tarefas:
+            _, pendentes = await asyncio.wait(tarefas, timeout=timeout)
+            for tarefa in pendentes:
+                tarefa.cancel()
+            await asyncio.gather(*pendentes, return_exceptions=True)
+        await self._servidor.wait_closed()
+
+    # ---------- Publicação ----------
+
+    def publicar(self, topico: str, dados: Dict[str, Any]):
+        """
+        Publica `dados` (serializáveis em JSON) no tópico e guarda-os como o último valor dele.
+        """
+        mensagem = dict(dados, topico=topico)
+        mensagem.setdefault("instante", time.time())
+        if self._loop is None:
+            self.ultimos[topico] = mensagem
+            return
+        self._loop.call_soon_threadsafe(self._distribuir, topico, mensagem)
+
+    def publicar_evento(self, evento):
+        """
+        Ouvinte para `Agendador.ao_alterar`: publica o EventoAlteracao no tópico da sua chave.
+        """
+        self.publicar(evento.chave, {
+            "alvo": evento.alvo.id,
+            "campo": evento.campo,
+            "usuario": evento.alvo.usuario,
+            "anterior": evento.valor_anterior,
+            "atual": evento.valor_atual,
+            "instante": evento.instante,
+        })
+
+    def _distribuir(self, topico: str, mensagem: Dict[str, Any]):
+        self.ultimos[topico] = mensagem
+        texto = json.dumps(dict(mensagem, tipo="valor"), ensure_ascii=False)
+        for assinante in self._assinantes:
+            if assinante.assina(topico):
+                assinante.entregar(texto)
+
+    def _snapshot(self, topicos: Optional[Iterable[str]]) -> Iterable[str]:
+        for topico, mensagem in list(self.ultimos.items()):
+            if topicos is None or topico in topicos:
+                yield json.dumps(dict(mensagem, tipo="snapshot"), ensure_ascii=False)
+
+    # ---------- Conexões ----------
+
+    async def _atender(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter):
+        tarefa = asyncio.current_task()
+        self._conexoes[tarefa] = escritor
+        try:
+            cabecalho = await asyncio.wait_for(leitor.readuntil(b"\r\n\r\n"), 10)
+            linhas = cabecalho.decode("latin-1").split("\r\n")
+            metodo, caminho, _ = linhas[0].split(" ", 2)
+            cabecalhos = {}
+            for linha in linhas[1:]:
+                if ":" in linha:
+                    nome, valor = linha.split(":", 1)
+                    cabecalhos[nome.strip().lower()] = valor.strip()
+            url = urlsplit(caminho)
+            topicos = _topicos(parse_qs(url.query).get("topicos"))
+            if metodo != "GET":
+                await self._responder(escritor, "405 Method Not Allowed", "text/plain", b"")
+            elif url.path == "/eventos":
+                await self._sse(escritor, topicos)
+            elif url.path == "/ws" and cabecalhos.get("upgrade", "").lower() == "websocket":
+                await self._websocket(leitor, escritor, cabecalhos, topicos)
+            elif url.path == "/topicos":
+                corpo = json.dumps(self.ultimos, ensure_ascii=False).encode("utf-8")
+                await self._responder(escritor, "200 OK", "application/json; charset=utf-8", corpo)
+            else:
+                await self._responder(escritor, "404 Not Found", "text/plain", b"")
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError,
+                ConnectionError, ValueError):
+            pass  # Cliente desconectou ou enviou uma requisição inválida
+        finally:
+            self._conexoes.pop(tarefa, None)
+            escritor.close()
+
+    @staticmethod
+    async def _responder(escritor: asyncio.StreamWriter, status: str, tipo: str, corpo: bytes):
+        escritor.write(f"HTTP/1.1 {status}\r\nContent-Type: {tipo}\r\nContent-Length: {len(corpo)}\r\n"
+                       f"Connection: close\r\n\r\n".encode("latin-1") + corpo)
+        await escritor.drain()
+
+    def _registrar(self, topicos: Optional[Set[str]], escritor: asyncio.StreamWriter) -> _Assinante:
+        assinante = _Assinante(topicos, self.tamanho_fila, self.politica, escritor)
+        for texto in self._snapshot(topicos):
+            assinante.entregar(texto)
+        self._assinantes.add(assinante)
+        METRICAS.definir("assinantes_conectados", len(self._assinantes), "Assinantes do servidor de eventos")
+        return assinante
+
+    def _remover(self, assinante: _Assinante):
+        self._assinantes.discard(assinante)
+        METRICAS.definir("assinantes_conectados", len(self._assinantes), "Assinantes do servidor de eventos")
+        if assinante.desconectar and assinante.politica == "desconectar":
+            logging.warning(f"Assinante lento desconectado após {assinante.descartados} evento(s) descartado(s).")
+
+    async def _sse(self, escritor: asyncio.StreamWriter, topicos: Optional[Set[str]]):
+        escritor.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream; charset=utf-8\r\n"
+                       b"Cache-Control: no-cache\r\nAccess-Control-Allow-Origin: *\r\n\r\n")
+        await escritor.drain()
+        assinante = self._registrar(topicos, escritor)
+        try:
+            while not assinante.desconectar:
+                mensagens = await assinante.proximas(self.batimento)
+                if escritor.is_closing():
+                    break
+                if not mensagens and not assinante.desconectar:
+                    escritor.write(b": batimento\n\n")
+                for texto in mensagens:
+                    escritor.write(f"data: {texto}\n\n".encode("utf-8"))
+                await escritor.drain()
+        finally:
+            self._remover(assinante)
+
+    async def _websocket(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter,
+                         cabecalhos: Dict[str, str], topicos: Optional[Set[str]]):
+        chave = cabecalhos.get("sec-websocket-key", "")
+        aceite = base64.b64encode(hashlib.sha1((chave + GUID_WEBSOCKET).encode("latin-1")).digest()).decode()
+        escritor.write(f"HTTP/1.1 101 Switching Protocols\r\nUpgrade: websocket\r\nConnection: Upgrade\r\n"
+                       f"Sec-WebSocket-Accept: {aceite}\r\n\r\n".encode("latin-1"))
+        await escritor.drain()
+        assinante = self._registrar(topicos, escritor)
+        recebendo = asyncio.create_task(self._receber_websocket(leitor, escritor, assinante))
+        try:
+            while not assinante.desconectar and not recebendo.done():
+                mensagens = await assinante.proximas(self.batimento)
+                if escritor.is_closing():
+                    break
+                if not mensagens and not assinante.desconectar:
+                    escritor.write(_frame(0x9, b""))  # Ping: o cliente responde com pong
+                for texto in mensagens:
+                    escritor.write(_frame(0x1, texto.encode("utf-8")))
+                await escritor.drain()
+            if assinante.desconectar and not recebendo.done():
+                escritor.write(_frame(0x8, struct.pack("!H", 1008)))  # Violação de política (cliente lento)
+                await escritor.drain()
+        finally:
+            recebendo.cancel()
+            await asyncio.gather(recebendo, return_exceptions=True)
+            self._remover(assinante)
+
+    async def _receber_websocket(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter,
+                                 assinante: _Assinante):
+        """
+        Lê os frames do cliente: assinaturas, pings e o fechamento.
+        """
+        try:
+            while True:
+                codigo, dados = await _ler_frame(leitor)
+                if codigo == 0x8:  # Fechamento
+                    escritor.write(_frame(0x8, dados[:2]))
+                    break
+                if codigo == 0x9:
+                    escritor.write(_frame(0xA, dados))
+                elif codigo == 0x1:
+                    self._comando(assinante, dados.decode("utf-8", "replace"))
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            assinante.pronto.set()  # Acorda o envio para encerrar a conexão
+
+    def _comando(self, assinante: _Assinante, texto: str):
+        try:
+            comando = json.loads(texto)
+        except ValueError:
+            return
+        if not isinstance(comando, dict):
+            return
+        novos = _topicos(comando.get("assinar"))
+        if novos:
+            if assinante.topicos is not None:
+                assinante.topicos |= novos
+            assinante.excluidos -= novos
+            for texto_snapshot in self._snapshot(novos):
+                assinante.entregar(texto_snapshot)
+        cancelados = _topicos(comando.get("cancelar"))
+        if cancelados:
+            if assinante.topicos is None:  # Assina tudo: tópicos novos continuam chegando, menos esses
+                assinante.excluidos |= cancelados
+            else:
+                assinante.topicos -= cancelados
+
+
+def _topicos(valor) -> Optional[Set[str]]:
+    """
+    Tópicos de `?topicos=a,b` (lista de parse_qs) ou de uma lista JSON; None = todos.
+    """
+    if not valor:
+        return None
+    if isinstance(valor, str):
+        valor = [valor]
+    topicos = {topico.strip() for item in valor for topico in str(item).split(",") if topico.strip()}
+    return topicos or None
+
+
+def _frame(codigo: int, dados: bytes) -> bytes:
+    tamanho = len(dados)
+    if tamanho < 126:
+        cabecalho = struct.pack("!BB", 0x80 | codigo, tamanho)
+    elif tamanho < 65536:
+        cabecalho = struct.pack("!BBH", 0x80 | codigo, 126, tamanho)
+    else:
+        cabecalho = struct.pack("!BBQ", 0x80 | codigo, 127, tamanho)
+    return cabecalho + dados
+
+
+async def _ler_frame(leitor: asyncio.StreamReader, maximo: int = 65536):
+    primeiro, segundo = await leitor.readexactly(2)
+    codigo = primeiro & 0x0F
+    tamanho = segundo & 0x7F
+    if tamanho == 126:
+        tamanho = struct.unpack("!H", await leitor.readexactly(2))[0]
+    elif tamanho == 127:
+        tamanho = struct.unpack("!Q", await leitor.readexactly(8))[0]
+    if tamanho > maximo:
+        raise ValueError("Frame do cliente grande demais.")
+    mascara = await leitor.readexactly(4) if segundo & 0x80 else b"\x00\x00\x00\x00"
+    dados = await leitor.readexactly(tamanho)
+    return codigo, bytes(b ^ mascara[i % 4] for i, b in enumerate(dados))
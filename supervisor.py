@@ -0,0 +1,293 @@
+import asyncio          # Loop de cada processo trabalhador
+import logging          # Registro de logs
+import logging.handlers
+import multiprocessing  # Processos trabalhadores e filas entre processos
+import os               # Número de núcleos
+import queue            # Exceção de fila vazia
+import threading        # Repasse dos logs dos trabalhadores
+import time             # Batimentos e prazos
+from typing import Any, Callable, Dict, List, Optional
+
+from agendador import Agendador, Alvo, EventoAlteracao
+from backends import CriadorBackend, criar_backend_selenium
+from estado_persistente import EstadoPersistente  # Um mesmo banco (WAL) para todos os trabalhadores
+from registro_alvos import RegistroAlvos  # Alvos iguais do mesmo trabalhador = uma busca
+
+
+async def _loop_trabalhador(indice: int, comandos, resultados, criar_backend: CriadorBackend,
+                            opcoes: Dict[str, Any]):
+    backend = criar_backend(opcoes)  # Criado dentro do trabalhador: navegadores não atravessam processos
+    agendador = Agendador(backend.buscar, max_concorrencia=opcoes.get("max_concorrencia", 10),
+                          max_por_host=opcoes.get("max_por_host", 2),
+                          falhas_por_host=opcoes.get("falhas_por_host", 5),
+                          espera_disjuntor=opcoes.get("espera_disjuntor", 30.0),
+                          estado=EstadoPersistente(opcoes["estado"]) if opcoes.get("estado") else None)
+    backend.ao_receber = agendador.receber  # Ticks capturados da rede, fora das buscas
+    registro = RegistroAlvos(agendador)
+    registro.ao_alterar(lambda evento: resultados.put(
+        ("evento", indice, evento.alvo.id, evento.valor_anterior, evento.valor_atual, evento.instante, evento.campo)
+    ))
+
+    async def ler_comandos():
+        while True:
+            try:
+                comando = await asyncio.to_thread(comandos.get, True, 1.0)
+            except queue.Empty:
+                continue
+            if comando[0] == "parar":
+                agendador.parar()
+                return
+            if comando[0] == "adicionar":
+                liberados = registro.atualizar(comando[1])  # Reenvio do mesmo alvo = atualização
+            else:  # "remover", ou "ceder": alvo movido para outro trabalhador, que restaura o estado salvo
+                liberados = registro.remover(comando[1], esquecer_estado=comando[0] == "remover")
+            for busca_id in liberados:
+                backend.esquecer(busca_id)
+            if comando[0] == "ceder":
+                if agendador.estado is not None:
+                    await asyncio.to_thread(agendador.estado.descarregar)
+                resultados.put(("cedido", indice, comando[1]))  # Estado gravado: o destino já pode restaurá-lo
+
+    async def bater():
+        intervalo = opcoes.get("intervalo_batimento", 2.0)
+        while True:
+            resultados.put(("batimento", indice, time.time(), agendador.espera_media, len(agendador.alvos)))
+            await asyncio.sleep(intervalo)
+
+    tarefas = [asyncio.create_task(ler_comandos()), asyncio.create_task(bater())]
+    try:
+        await agendador.executar()
+    finally:
+        for tarefa in tarefas:
+            tarefa.cancel()
+        await backend.encerrar()
+        if agendador.estado is not None:
+            agendador.estado.fechar()
+
+
+def _rodar_trabalhador(indice: int, comandos, resultados, logs, criar_backend: CriadorBackend,
+                       opcoes: Dict[str, Any]):
+    # Os logs do trabalhador vão para o processo pai, que os grava com a configuração central
+    raiz = logging.getLogger()
+    raiz.handlers[:] = [logging.handlers.QueueHandler(logs)]
+    raiz.setLevel(opcoes.get("nivel_log", logging.INFO))
+    try:
+        asyncio.run(_loop_trabalhador(indice, comandos, resultados, criar_backend, opcoes))
+    except KeyboardInterrupt:
+        pass
+
+
+class _Trabalhador:
+    """
+    Visão do processo pai sobre um trabalhador: processo, fila de comandos e hosts atribuídos.
+    """
+    def __init__(self, indice: int):
+        self.indice = indice
+        self.processo: Optional[multiprocessing.Process] = None
+        self.comandos = None
+        self.hosts: Dict[str, List[str]] = {}  # host -> ids dos alvos
+        self.ultimo_batimento = 0.0
+        self.espera_media = 0.0
+
+    @property
+    def carga(self) -> int:
+        return sum(len(ids) for ids in self.hosts.values())
+
+
+class Supervisor:
+    """
+    Distribui os alvos entre N processos, cada um com seu próprio Agendador e backend
+    (`criar_backend`, função de módulo chamada dentro do trabalhador). Todos os alvos de um mesmo host ficam no mesmo processo, preservando
+    o limite por host.
+
+    Trabalhadores que morrem ou param de enviar batimentos são recriados com seus alvos;
+    trabalhadores sobrecarregados (`espera_maxima`) cedem um host ao menos carregado.
+    """
+    def __init__(self, criar_backend: CriadorBackend = criar_backend_selenium,
+                 processos: Optional[int] = None, opcoes: Optional[Dict[str, Any]] = None,
+                 timeout_batimento: float = 30.0, espera_maxima: Optional[float] = 5.0):
+        self.criar_backend = criar_backend
+        self.processos = processos or os.cpu_count() or 1
+        self.opcoes = opcoes or {}
+        self.timeout_batimento = timeout_batimento
+        self.espera_maxima = espera_maxima
+        self._contexto = multiprocessing.get_context("spawn")
+        self._resultados = self._contexto.Queue()
+        self._logs = self._contexto.Queue()
+        self._trabalhadores = [_Trabalhador(i) for i in range(self.processos)]
+        self._alvos: Dict[str, Alvo] = {}
+        self._host_trabalhador: Dict[str, int] = {}
+        self._cedendo: Dict[str, int] = {}  # alvo -> trabalhador de origem que ainda não confirmou a cessão
+        self._ouvintes: List[Callable[[EventoAlteracao], None]] = []
+        self._parada = threading.Event()
+
+    def ao_alterar(self, ouvinte: Callable[[EventoAlteracao], None]):
+        self._ouvintes.append(ouvinte)
+        return ouvinte
+
+    # === Distribuição ===
+
+    def _iniciar_processo(self, trabalhador: _Trabalhador):
+        trabalhador.comandos = self._contexto.Queue()
+        trabalhador.processo = self._contexto.Process(
+            target=_rodar_trabalhador,
+            args=(trabalhador.indice, trabalhador.comandos, self._resultados, self._logs,
+                  self.criar_backend, self.opcoes),
+            name=f"monitor-{trabalhador.indice}",
+            daemon=True,
+        )
+        trabalhador.processo.start()
+        trabalhador.ultimo_batimento = time.time()
+        for ids in trabalhador.hosts.values():
+            for alvo_id in ids:
+                if alvo_id not in self._cedendo:  # Os em cessão chegam quando a origem confirmar
+                    trabalhador.comandos.put(("adicionar", self._alvos[alvo_id]))
+
+    def _menos_carregado(self, excluir: Optional[int] = None) -> _Trabalhador:
+        candidatos = [t for t in self._trabalhadores if t.indice != excluir] or self._trabalhadores
+        return min(candidatos, key=lambda t: t.carga)
+
+    def adicionar(self, alvo: Alvo):
+        if alvo.id in self._cedendo and self._alvos[alvo.id].host == alvo.host:
+            self._alvos[alvo.id] = alvo  # Chega ao destino já atualizado quando a origem confirmar
+            return
+        if alvo.id in self._alvos:
+            self.remover(alvo.id)
+        self._alvos[alvo.id] = alvo
+        indice = self._host_trabalhador.get(alvo.host)
+        trabalhador = self._trabalhadores[indice] if indice is not None else self._menos_carregado()
+        self._host_trabalhador[alvo.host] = trabalhador.indice
+        trabalhador.hosts.setdefault(alvo.host, []).append(alvo.id)
+        if trabalhador.comandos is not None:
+            trabalhador.comandos.put(("adicionar", alvo))
+
+    def remover(self, alvo_id: str):
+        alvo = self._alvos.pop(alvo_id, None)
+        if alvo is None:
+            return
+        self._cedendo.pop(alvo_id, None)
+        trabalhador = self._trabalhadores[self._host_trabalhador[alvo.host]]
+        ids = trabalhador.hosts.get(alvo.host, [])
+        if alvo_id in ids:
+            ids.remove(alvo_id)
+        if not ids:
+            trabalhador.hosts.pop(alvo.host, None)
+            self._host_trabalhador.pop(alvo.host, None)
+        if trabalhador.comandos is not None:
+            trabalhador.comandos.put(("remover", alvo_id))
+
+    def _mover_host(self, origem: _Trabalhador, host: str, destino: _Trabalhador):
+        """
+        Cede os alvos do host à origem; cada um só é enviado ao destino quando a origem confirma
+        ("cedido") que gravou o estado dele, para o destino não restaurar um checkpoint antigo.
+        """
+        ids = origem.hosts.pop(host)
+        destino.hosts[host] = ids
+        self._host_trabalhador[host] = destino.indice
+        for alvo_id in ids:
+            self._cedendo[alvo_id] = origem.indice
+            origem.comandos.put(("ceder", alvo_id))
+        logging.info(f"Supervisor: host {host} ({len(ids)} alvo(s)) movido do trabalhador "
+                     f"{origem.indice} para o {destino.indice}.")
+
+    # === Supervisão ===
+
+    def _verificar(self):
+        agora = time.time()
+        for trabalhador in self._trabalhadores:
+            vivo = trabalhador.processo.is_alive()
+            if not vivo or agora - trabalhador.ultimo_batimento > self.timeout_batimento:
+                motivo = "encerrou" if not vivo else "parou de responder"
+                logging.error(f"Supervisor: trabalhador {trabalhador.indice} {motivo}; recriando com "
+                              f"{trabalhador.carga} alvo(s).")
+                if vivo:
+                    trabalhador.processo.terminate()
+                trabalhador.processo.join(5)
+                for alvo_id, origem in list(self._cedendo.items()):
+                    if origem == trabalhador.indice:  # A confirmação não virá: o estado gravado é o que há
+                        self._entregar_cedido(alvo_id)
+                self._iniciar_processo(trabalhador)
+            elif (not self._cedendo and self.espera_maxima and trabalhador.espera_media > self.espera_maxima
+                  and len(trabalhador.hosts) > 1):
+                destino = self._menos_carregado(excluir=trabalhador.indice)
+                host = min(trabalhador.hosts, key=lambda h: len(trabalhador.hosts[h]))
+                if destino.carga + len(trabalhador.hosts[host]) < trabalhador.carga:
+                    self._mover_host(trabalhador, host, destino)
+                    trabalhador.espera_media = 0.0  # Aguarda nova medição antes de mover outro host
+
+    def _entregar_cedido(self, alvo_id: str):
+        """
+        Envia o alvo cedido ao trabalhador que agora é dono do host dele.
+        """
+        self._cedendo.pop(alvo_id, None)
+        alvo = self._alvos.get(alvo_id)
+        if alvo is None:
+            return  # Removido durante a cessão
+        destino = self._trabalhadores[self._host_trabalhador[alvo.host]]
+        if destino.comandos is not None:
+            destino.comandos.put(("adicionar", alvo))
+
+    def _tratar(self, mensagem):
+        tipo, indice = mensagem[0], mensagem[1]
+        trabalhador = self._trabalhadores[indice]
+        if tipo == "batimento":
+            _, _, instante, espera, _ = mensagem
+            trabalhador.ultimo_batimento = instante
+            trabalhador.espera_media = espera
+        elif tipo == "cedido":
+            if self._cedendo.get(mensagem[2]) == indice:
+                self._entregar_cedido(mensagem[2])
+        elif tipo == "evento":
+            _, _, alvo_id, anterior, atual, instante, campo = mensagem
+            alvo = self._alvos.get(alvo_id)
+            if alvo is None:
+                return  # Alvo removido enquanto o evento estava na fila
+            evento = EventoAlteracao(alvo, anterior, atual, instante, campo)
+            for ouvinte in self._ouvintes:
+                try:
+                    ouvinte(evento)
+                except Exception as e:
+                    logging.error(f"Erro no tratamento do evento {evento}: {e}")
+
+    def _repassar_logs(self):
+        while not self._parada.is_set():
+            try:
+                registro = self._logs.get(timeout=1.0)
+            except queue.Empty:
+                continue
+            logging.getLogger(registro.name).handle(registro)
+
+    def executar(self, intervalo_verificacao: float = 5.0):
+        """
+        Inicia os trabalhadores e distribui os eventos até `parar()` ser chamado.
+        """
+        threading.Thread(target=self._repassar_logs, name="logs-trabalhadores", daemon=True).start()
+        for trabalhador in self._trabalhadores:
+            self._iniciar_processo(trabalhador)
+        logging.info(f"Supervisor iniciado: {len(self._alvos)} alvo(s) em {self.processos} processo(s).")
+        proxima_verificacao = time.monotonic() + intervalo_verificacao
+        try:
+            while not self._parada.is_set():
+                try:
+                    self._tratar(self._resultados.get(timeout=1.0))
+                except queue.Empty:
+                    pass
+                if time.monotonic() >= proxima_verificacao:
+                    self._verificar()
+                    proxima_verificacao = time.monotonic() + intervalo_verificacao
+        finally:
+            self._encerrar()
+
+    def parar(self):
+        self._parada.set()
+
+    def _encerrar(self):
+        self._parada.set()
+        for trabalhador in self._trabalhadores:
+            if trabalhador.comandos is not None:
+                trabalhador.comandos.put(("parar",))
+        for trabalhador in self._trabalhadores:
+            if trabalhador.processo is not None:
+                trabalhador.processo.join(10)
+                if trabalhador.processo.is_alive():
+                    trabalhador.processo.terminate()
@@ -13,21 +13,20 @@ import time
 import sys
 from datetime import datetime
 import os
+from pagina_persistente import LeitorPersistente, PoliticaRecarga
+from observador_mutacao import ObservadorSelenium
+from cache_localizadores import CacheLocalizadores
+from serie_temporal import SerieTemporal
+from numeros import para_float
+from config_log import configurar_log
+from agendador import IntervaloAdaptativo
+from estado_persistente import EstadoPersistente
+from servidor_eventos import ServidorEventos
+from bloqueio_recursos import PERFIS, aplicar_selenium
 
-# Configuração do sistema de logs para registrar eventos e mudanças de valores
-logging.basicConfig(level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("log_acontecimentos.log"),
-        logging.StreamHandler(sys.stdout)
-    ])
-
-# Logger específico para mudanças de valores
+# Logger específico para mudanças de valores ("valores_atualizados.log"); o sistema de
+# logs é configurado por config_log.configurar_log ao executar o script
 valor_logger = logging.getLogger("valores_logger")
-valor_handler = logging.FileHandler("valores_atualizados.log")
-valor_handler.setFormatter(logging.Formatter('%(asctime)s - %(message)s'))
-valor_logger.addHandler(valor_handler)
-valor_logger.propagate = False
 
 # Validação do nome do usuário
 def validar_nome(nome):
@@ -39,6 +38,18 @@ def validar_nome(nome):
 def limpar_valor(valor):
     return re.sub(r'[<>"\']', '', valor.strip())
 
+# Converte o texto exibido (ex: 134.580,43, R$ 5,00 ou 1,2K) em número para a série temporal
+def valor_numerico(texto):
+    return para_float(texto)
+
+# Registra a mudança no log de valores e, quando numérica, na série temporal
+def registrar_alteracao(serie, usuario, url, valor_anterior, texto_atual):
+    logging.info(f"Valor alterado! De {valor_anterior} para {texto_atual}")
+    valor_logger.info(f"Usuário: {usuario} | Site: {url} | {valor_anterior} -> {texto_atual}")
+    numero = valor_numerico(texto_atual)
+    if serie is not None and numero is not None:
+        serie.registrar(url, numero)
+
 # Função para gerar o XPath completo de um elemento encontrado
 # Utiliza JavaScript para percorrer a árvore DOM
 def gerar_xpath_completo(driver, elemento):
@@ -118,73 +129,142 @@ def encontrar_elemento_por_valor(driver, valor_exato):
         logging.error(f"Erro ao encontrar elemento: {e}")
     return None
 
-# Monitora continuamente o valor localizado por um XPath e registra mudanças
-def monitorar_xpath(driver, xpath, valor_anterior, usuario, url):
+# Monitora continuamente o valor localizado por um XPath e registra mudanças.
+# A página já carregada é mantida aberta; a recarga completa segue a política informada.
+# Sem alteração nada é gravado: o histórico fica na série temporal (ver SerieTemporal.linhas_log).
+# A espera parte de 10 segundos e se adapta ao ritmo de mudança do valor (com backoff em falhas).
+# Com `estado`, o ritmo aprendido sobrevive a reinícios do script (o valor inicial vem sempre da página).
+# Com `eventos` (ServidorEventos), cada alteração também é publicada por SSE/WebSocket no tópico da URL.
+def monitorar_xpath(driver, xpath, valor_anterior, usuario, url, politica=None, serie=None, intervalo=10,
+                    estado=None, eventos=None):
+    leitor = LeitorPersistente(driver, url, By.XPATH, xpath, politica or PoliticaRecarga(erros_para_recarregar=3),
+                               ja_carregada=True)
+    ritmo = IntervaloAdaptativo(intervalo)
+    chave = f"ultimo:{url}|{xpath}"
+    salvo = estado.ler(chave) if estado else None
+    if salvo:
+        ritmo.restaurar(salvo.get("intervalo", {}))
     while True:
+        mudou, erro = False, False
         try:
-            elemento = driver.find_element(By.XPATH, xpath)
-            texto_atual = elemento.text.strip()
-            if texto_atual != valor_anterior:
-                logging.info(f"Valor alterado! De {valor_anterior} para {texto_atual}")
-                valor_logger.info(f"Usuário: {usuario} | Site: {url} | {valor_anterior} -> {texto_atual}")
+            texto_atual = leitor.ler()
+            if texto_atual is None:  # Falha já registrada pelo leitor; tenta de novo no próximo ciclo
+                erro = True
+            elif texto_atual != valor_anterior:
+                registrar_alteracao(serie, usuario, url, valor_anterior, texto_atual)
+                if eventos:
+                    eventos.publicar(url, {"usuario": usuario, "anterior": valor_anterior, "atual": texto_atual})
                 valor_anterior = texto_atual
+                mudou = True
             else:
                 logging.info("Nenhuma alteração detectada.")
-            valor_logger.info(f"Usuário: {usuario} | Site: {url} | Valor atual: {texto_atual}")
         except Exception as e:
+            erro = True
             logging.error(f"Erro ao monitorar valor por XPath: {e}")
-        time.sleep(10)
-
-# Bloco principal do programa com tratamento de exceções
-try:
-    # Coleta de entrada do usuário
-    nome_usuario = input("Digite seu nome: ")
-    nome_usuario = validar_nome(nome_usuario)
-
-    url = input("Digite o link do site: ").strip()
-    valor_desejado = input("Digite o valor a ser monitorado (ex: R$5.000,00 ou 5,00): ").strip()
-
-    if not valor_desejado:
-        raise ValueError("Valor não pode ser vazio.")
-    valor_limpo = limpar_valor(valor_desejado)
-
-    # Registro inicial das informações
-    logging.info(f"Usuário: {nome_usuario}")
-    logging.info(f"URL: {url}")
-    logging.info(f"Valor exato a buscar: {valor_limpo}")
-
-    # Configurações do navegador (headless)
-    options = Options()
-    options.add_argument('--headless')
-    options.add_argument('--disable-gpu')
-    options.add_argument('--no-sandbox')
-    options.add_argument("--window-size=1920,1080")
-    options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/113 Safari/537.36")
-
-    # Caminho do ChromeDriver e inicialização
-    service = ChromeService(executable_path=os.path.join(os.getcwd(), 'chromedriver.exe'))
-    driver = webdriver.Chrome(service=service, options=options)
-    driver.get(url)
-
-    # Aguarda o carregamento da página
-    WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-    logging.info("Página carregada com sucesso.")
-
-    # Encontra o elemento correspondente ao valor e gera o XPath
-    elemento = encontrar_elemento_por_valor(driver, valor_limpo)
-    if not elemento:
-        raise Exception("Valor não encontrado na página.")
-
-    xpath = gerar_xpath_completo(driver, elemento)
-    if not xpath:
-        raise Exception("XPath não pôde ser gerado.")
-    logging.info(f"XPath gerado: {xpath}")
-
-    # Inicia o monitoramento do valor
-    logging.info("Iniciando monitoramento do valor...")
-    monitorar_xpath(driver, xpath, valor_limpo, nome_usuario, url)
-
-except Exception as e:
-    logging.critical(f"Erro crítico: {e}")
-    print(f"Erro: {e}")
-    sys.exit(1)
+        espera = ritmo.registrar(mudou, erro)
+        if estado:
+            estado.gravar(chave, {"intervalo": ritmo.exportar()})
+            estado.descarregar_se_preciso()
+        time.sleep(espera)
+
+# Monitora o valor por um MutationObserver instalado na página: o Python só acorda
+# quando o texto do elemento muda, sem consultar a página a cada 10 segundos.
+def monitorar_xpath_por_mutacao(driver, xpath, valor_anterior, usuario, url, serie=None, eventos=None):
+    observador = ObservadorSelenium(driver, xpath=xpath)
+    observador.instalar()
+    while True:
+        try:
+            for texto_atual, _ in observador.mudancas(timeout=30):
+                if texto_atual != valor_anterior:
+                    registrar_alteracao(serie, usuario, url, valor_anterior, texto_atual)
+                    if eventos:
+                        eventos.publicar(url, {"usuario": usuario, "anterior": valor_anterior, "atual": texto_atual})
+                    valor_anterior = texto_atual
+        except Exception as e:
+            logging.error(f"Erro ao observar valor por XPath: {e}")
+            time.sleep(10)
+            driver.get(url)  # Recarrega a página e reinstala o observador
+            observador.instalar()
+
+# Bloco principal do programa com tratamento de exceções.
+# Com `push`, o valor é acompanhado por MutationObserver em vez de consulta periódica.
+# Com `porta_eventos`, as alterações também são servidas por SSE/WebSocket nessa porta.
+def main(push=False, porta_eventos=None):
+    try:
+        # Coleta de entrada do usuário
+        nome_usuario = input("Digite seu nome: ")
+        nome_usuario = validar_nome(nome_usuario)
+
+        url = input("Digite o link do site: ").strip()
+        valor_desejado = input("Digite o valor a ser monitorado (ex: R$5.000,00 ou 5,00): ").strip()
+
+        if not valor_desejado:
+            raise ValueError("Valor não pode ser vazio.")
+        valor_limpo = limpar_valor(valor_desejado)
+
+        # Registro inicial das informações
+        logging.info(f"Usuário: {nome_usuario}")
+        logging.info(f"URL: {url}")
+        logging.info(f"Valor exato a buscar: {valor_limpo}")
+
+        # Configurações do navegador (headless)
+        options = Options()
+        options.add_argument('--headless')
+        options.add_argument('--disable-gpu')
+        options.add_argument('--no-sandbox')
+        options.add_argument("--window-size=1920,1080")
+        options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/113 Safari/537.36")
+
+        # Caminho do ChromeDriver e inicialização
+        service = ChromeService(executable_path=os.path.join(os.getcwd(), 'chromedriver.exe'))
+        driver = webdriver.Chrome(service=service, options=options)
+        aplicar_selenium(driver, PERFIS["padrao"])  # Sem imagens, fontes, anúncios e rastreadores
+        driver.get(url)
+
+        # Aguarda o carregamento da página
+        WebDriverWait(driver, 30).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
+        logging.info("Página carregada com sucesso.")
+
+        # Reaproveita os localizadores salvos para esta URL/valor; se nenhum funcionar,
+        # o cache procura o valor a partir do último ancestral conhecido e só então no DOM todo
+        cache = CacheLocalizadores()
+        elemento, candidatos = cache.resolver(driver, url, valor_limpo)
+        if not elemento:
+            raise Exception("Valor não encontrado na página.")
+        logging.info(f"Cache de localizadores: {cache.estatisticas()}")
+
+        # Prefere o XPath curto (relativo a um id/data-test) ao absoluto, que quebra com mudanças de layout
+        xpath = next((c["valor"] for c in candidatos if c["tipo"] == "xpath"), None) \
+            or gerar_xpath_completo(driver, elemento)
+        if not xpath:
+            raise Exception("XPath não pôde ser gerado.")
+        logging.info(f"XPath gerado: {xpath}")
+
+        # Inicia o monitoramento do valor; o valor inicial também entra na série
+        logging.info("Iniciando monitoramento do valor...")
+        serie = SerieTemporal()
+        estado = EstadoPersistente()
+        eventos = ServidorEventos(porta=porta_eventos).iniciar() if porta_eventos else None
+        if valor_numerico(valor_limpo) is not None:
+            serie.registrar(url, valor_numerico(valor_limpo))
+        try:
+            if push:
+                monitorar_xpath_por_mutacao(driver, xpath, valor_limpo, nome_usuario, url, serie, eventos)
+            else:
+                monitorar_xpath(driver, xpath, valor_limpo, nome_usuario, url, serie=serie, estado=estado,
+                                eventos=eventos)
+        finally:
+            serie.fechar()
+            estado.fechar()
+            if eventos:
+                eventos.parar()
+
+    except Exception as e:
+        logging.critical(f"Erro crítico: {e}")
+        print(f"Erro: {e}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    configurar_log("log_acontecimentos.log", loggers_dedicados={"valores_logger": "valores_atualizados.log"})
+    porta_eventos = int(sys.argv[sys.argv.index("--eventos") + 1]) if "--eventos" in sys.argv[:-1] else None
+    main(push="--push" in sys.argv, porta_eventos=porta_eventos)